@@ -35,6 +35,10 @@ The :func:`load_cube` and :func:`load_cubes` functions are similar to
 what was expected. They are more useful in scripts, where they can
 provide an early sanity check on incoming data.
 
+The :func:`load_stream` function is similar to :func:`load`, but it
+generates the merged cubes one group at a time, so that very long series
+of files can be processed without holding all of their cubes at once.
+
 The :func:`load_raw` function is provided for those occasions where the
 automatic combination of cubes into higher-dimensional cubes is
 undesirable. However, it is intended as a tool of last resort! If you
@@ -112,8 +116,8 @@ import iris.io
 __version__ = '1.2.0-dev'
 
 # Restrict the names imported when using "from iris import *"
-__all__ = ['load', 'load_cube', 'load_cubes', 'load_raw', 'load_strict', 'save',
-           'Constraint', 'AttributeConstraint']
+__all__ = ['load', 'load_cube', 'load_cubes', 'load_raw', 'load_stream',
+           'load_strict', 'save', 'Constraint', 'AttributeConstraint']
 
 
 # When required, log the usage of Iris.
@@ -125,8 +129,8 @@ Constraint = iris._constraints.Constraint
 AttributeConstraint = iris._constraints.AttributeConstraint
 
 
-def _generate_cubes(uris, callback):
-    """Returns a generator of cubes given the URIs and a callback."""
+def _generate_cubes(uris, callback, constraints=None):
+    """Returns a generator of cubes given the URIs, a callback and any constraints."""
     if isinstance(uris, basestring):
         uris = [uris] 
     
@@ -139,14 +143,14 @@ def _generate_cubes(uris, callback):
     
         # Call each scheme handler with the approriate uris
         if scheme == 'file':
-            for cube in iris.io.load_files(part_names, callback):
+            for cube in iris.io.load_files(part_names, callback, constraints):
                 yield cube
         else:
             raise ValueError('Iris cannot handle the URI scheme: %s' % scheme)
 
 
 def _load_collection(uris, constraints=None, callback=None):
-    cubes = _generate_cubes(uris, callback)
+    cubes = _generate_cubes(uris, callback, constraints)
     return iris.cube._CubeFilterCollection.from_cubes(cubes, constraints)
 
 
@@ -280,6 +284,85 @@ def load_raw(uris, constraints=None, callback=None):
     return _load_collection(uris, constraints, callback).cubes()
 
 
+def _merge_key_function(merge_key):
+    """
+    Returns a function which gives the merge group of a cube, from either
+    a function or the name of a coordinate.
+
+    """
+    if callable(merge_key):
+        return merge_key
+
+    def key(cube):
+        coords = cube.coords(merge_key)
+        if not coords:
+            return None
+        coord, = coords
+        bounds = None
+        if coord.bounds is not None:
+            bounds = tuple(coord.bounds.flat)
+        return tuple(coord.points.flat), bounds
+    return key
+
+
+def load_stream(uris, merge_key, constraints=None, callback=None):
+    """
+    Generates merged Cubes incrementally, one group of cubes at a time.
+
+    The cubes are grouped by the given merge key as they are loaded, and
+    each group is merged, and its merged cubes generated, as soon as a
+    cube with a different key is loaded. Only the cubes of a single group
+    are held at once, so the cubes loaded from a long series of files, such
+    as a file for each day, can be processed in bounded memory.
+
+    Cubes are only merged with the others of their group, so the files
+    should be given in an order in which the cubes of each group are
+    loaded consecutively. The files are loaded one filename or pattern at
+    a time, in the given order, and the files which match a pattern are
+    loaded in sorted filename order. A group which is split by the cubes
+    of another gives a separate set of merged cubes for each part.
+
+    For a full description of the other arguments, please see the module
+    documentation for :mod:`iris`.
+
+    Args:
+
+    * uris:
+        One or more filenames.
+    * merge_key:
+        Either the name of a coordinate, such as 'time', whose points and
+        bounds give the group of each cube, or a function which returns a
+        hashable group for a given cube. Cubes without the named
+        coordinate are grouped together.
+
+    Kwargs:
+
+    * constraints:
+        One or more constraints.
+    * callback:
+        A modifier/filter function.
+
+    Returns:
+        A generator of :class:`iris.cube.Cube` instances.
+
+    For example::
+
+        for cube in iris.load_stream(filenames, 'time'):
+            process(cube)
+
+    """
+    if isinstance(uris, basestring):
+        uris = [uris]
+    key = _merge_key_function(merge_key)
+    cubes = itertools.chain.from_iterable(_generate_cubes(uri, callback, constraints)
+                                          for uri in uris)
+    for _, group in itertools.groupby(cubes, key):
+        collection = iris.cube._CubeFilterCollection.from_cubes(group,
+                                                                constraints)
+        for cube in collection.merged().cubes():
+            yield cube
+
+
 def load_strict(uris, constraints=None, callback=None):
     """
     Loads exactly one Cube for each constraint.
@@ -145,6 +145,32 @@ class Constraint(object):
                 resultant_CIM = resultant_CIM & coord_constraint.extract(cube)
                 
         return resultant_CIM
+
+    def _may_match(self, attributes, coord_cells):
+        """
+        Return whether this constraint may match a cube which is only known
+        through some of its attributes and scalar coordinate cells, e.g. as
+        derived from the header of a field before it is loaded.
+        
+        Args:
+        
+        * attributes (dict):
+            The known attributes of the cube.
+        * coord_cells:
+            An object whose ``get`` method returns the :class:`iris.coords.Cell`
+            of the named scalar coordinate of the cube, or None if not known.
+        
+        Only returns False when no such cube can match this constraint. Any
+        part of the constraint which cannot be judged is assumed to match.
+        
+        """
+        match = True
+        for coord_constraint in self._coord_constraints:
+            cell = coord_cells.get(coord_constraint.coord_name)
+            if cell is not None and not coord_constraint._call_func(cell):
+                match = False
+                break
+        return match
                 
     def __and__(self, other):
         return ConstraintCombination(self, other, operator.__and__)
@@ -176,6 +202,13 @@ class ConstraintCombination(Constraint):
     def _CIM_extract(self, cube):
         return self.operator(self.lhs._CIM_extract(cube), self.rhs._CIM_extract(cube)) 
 
+    def _may_match(self, attributes, coord_cells):
+        match = True
+        if self.operator is operator.__and__:
+            match = (self.lhs._may_match(attributes, coord_cells) and
+                     self.rhs._may_match(attributes, coord_cells))
+        return match
+
 
 class _CoordConstraint(object):
     """Represents the atomic elements which might build up a Constraint."""
@@ -367,10 +400,15 @@ class AttributeConstraint(Constraint):
         Constraint.__init__(self, cube_func=self._cube_func) 
     
     def _cube_func(self, cube): 
+        return self._attributes_match(cube.attributes, missing_match=False)
+
+    def _attributes_match(self, attributes, missing_match):
+        # Returns whether the given attributes match, where missing_match
+        # gives the result for a constrained attribute which is not present.
         match = True 
         for name, value in self._attributes.iteritems():
-            if name in cube.attributes:
-                cube_attr = cube.attributes.get(name)
+            if name in attributes:
+                cube_attr = attributes.get(name)
                 # if we have a callable, then call it with the value, otherwise, assert equality
                 if callable(value):
                     if not value(cube_attr):
@@ -380,10 +418,13 @@ class AttributeConstraint(Constraint):
                     if cube_attr != value: 
                         match = False 
                         break
-            else:
+            elif not missing_match:
                 match = False 
                 break  
         return match 
+
+    def _may_match(self, attributes, coord_cells):
+        return self._attributes_match(attributes, missing_match=True)
     
     def __repr__(self): 
         return 'AttributeConstraint(%r)' % self._attributes
@@ -22,6 +22,7 @@ Typically the cube merge process is handled by :method:`iris.cube.CubeList.merge
 """
 from collections import namedtuple, Iterable
 from copy import deepcopy
+import numbers
 
 import numpy
 
@@ -302,11 +303,94 @@ def _is_combination(name):
     return _COMBINATION_JOIN in str(name)
 
 
+class _Indexes(object):
+    """
+    The cross-reference of the scalar values of each candidate dimension
+    over the source-cubes.
+
+    The scalar values of each candidate dimension are held as a column of
+    integer codes, with a row for each source-cube, where each code is the
+    position of the value within the distinct values of that candidate
+    dimension, in order of first appearance. The relationships between the
+    candidate dimensions are found from the distinct combinations of their
+    codes, with array operations rather than per source-cube.
+
+    """
+    def __init__(self, positions):
+        self.size = len(positions)
+        self._values = {}
+        self._codes = {}
+        for name in positions[0]:
+            code_by_value = {}
+            codes = [code_by_value.setdefault(position[name], len(code_by_value))
+                     for position in positions]
+            values = [None] * len(code_by_value)
+            for value, code in code_by_value.iteritems():
+                values[code] = value
+            self._values[name] = values
+            self._codes[name] = numpy.array(codes, dtype=numpy.int64)
+
+    def __iter__(self):
+        return iter(self._values)
+
+    def __getitem__(self, name):
+        """Returns the distinct scalar values of the candidate dimension."""
+        return self._values[name]
+
+    def codes(self, name):
+        """Returns the column of codes of the scalar values of the candidate dimension."""
+        return self._codes[name]
+
+    def value(self, name, row):
+        """Returns the scalar value of the candidate dimension for the source-cube of the given row."""
+        return self._values[name][self._codes[name][row]]
+
+    def combine(self, codes, count, name):
+        """
+        Returns the codes, and the number of distinct codes, which enumerate
+        the distinct combinations of the given codes with the values of the
+        candidate dimension.
+
+        """
+        codes = codes * len(self._values[name]) + self._codes[name]
+        distinct, codes = numpy.unique(codes, return_inverse=True)
+        return codes, len(distinct)
+
+    def group_codes(self, names):
+        """
+        Returns the codes, and the number of distinct codes, which enumerate
+        the distinct combinations of the values of the candidate dimensions.
+
+        """
+        codes = numpy.zeros(self.size, dtype=numpy.int64)
+        count = 1
+        for name in names:
+            codes, count = self.combine(codes, count, name)
+        return codes, count
+
+    def separable(self, name, other_name):
+        """
+        Determine whether the two candidate dimensions are separable.
+
+        A candidate dimension X and Y are separable if each scalar
+        value of X maps to the same set of scalar values of Y, that is,
+        if every combination of their values occurs.
+
+        """
+        count = len(self._values[name])
+        other_count = len(self._values[other_name])
+        if count == 1 or other_count == 1:
+            return True
+        if count * other_count > self.size:
+            return False
+        pairs = self._codes[name] * other_count + self._codes[other_name]
+        return len(numpy.unique(pairs)) == count * other_count
+
+
 def build_indexes(positions):
     """
-    Construct a mapping for each candidate dimension that maps for each
-    of its scalar values the set of values for each of the other candidate
-    dimensions.
+    Construct the cross-reference of the scalar values of each candidate
+    dimension over the source-cubes.
 
     For example:
 
@@ -317,24 +401,11 @@ def build_indexes(positions):
         ...
         >>> indexes = build_indexes(positions)
         >>> for k in sorted(indexes):
-        ...     print '%r:' % k
-        ...     for kk in sorted(indexes[k]):
-        ...         print '\t%r:' % kk,
-        ...         for kkk in sorted(indexes[k][kk]):
-        ...             print '%r: %r' % (kkk, indexes[k][kk][kkk]),
-        ...         print
+        ...     print '%r: %r' % (k, sorted(indexes[k]))
         ...
-        'a':
-             0: 'b': set([10]) 'c': set([100])
-             1: 'b': set([10]) 'c': set([200])
-             2: 'b': set([20]) 'c': set([300])
-        'b':
-             10: 'a': set([0, 1]) 'c': set([200, 100])
-             20: 'a': set([2]) 'c': set([300])
-        'c':
-             100: 'a': set([0]) 'b': set([10])
-             200: 'a': set([1]) 'b': set([10])
-             300: 'a': set([2]) 'b': set([20])
+        'a': [0, 1, 2]
+        'b': [10, 20]
+        'c': [100, 200, 300]
 
     Args:
 
@@ -343,88 +414,10 @@ def build_indexes(positions):
         scalar value pairs for each source-cube.
 
     Returns:
-        The cross-reference dictionary for each candidate dimension.
+        The cross-reference of each candidate dimension.
 
     """
-    names = positions[0].keys()
-    scalar_index_by_name = {name: {} for name in names}
-
-    for position in positions:
-        for name, value in position.iteritems():
-            name_index_by_scalar = scalar_index_by_name[name]
-
-            if value in name_index_by_scalar:
-                value_index_by_name = name_index_by_scalar[value]
-                for other_name in names:
-                    if other_name != name:
-                        value_index_by_name[other_name].add(position[other_name])
-            else:
-                name_index_by_scalar[value] = {other_name: set((position[other_name],)) for other_name in names if other_name != name}
-
-    return scalar_index_by_name
-
-
-def _separable_pair(name, index):
-    """
-    Determine whether the candidate dimension is separable.
-
-    A candidate dimension X and Y are separable if each scalar
-    value of X maps to the same set of scalar values of Y.
-
-    Args:
-
-    * name1:
-        The first candidate dimension to be compared.
-
-    * name2:
-        The second candidate dimension to be compared.
-
-    * index:
-        The cross-reference dictionary for the first candidate
-        dimension.
-
-    Returns:
-        Boolean.
-
-    """
-    items = index.itervalues()
-    reference = next(items)[name]
-
-    return all([item[name] == reference for item in items])
-
-def _separable(name, indexes):
-    """
-    Determine the candidate dimensions that are separable and
-    inseparable relative to the provided candidate dimension.
-
-    A candidate dimension X and Y are separable if each scalar
-    value of X maps to the same set of scalar values of Y.
-
-    Args:
-    
-    * name:
-        The candidate dimension that requires its separable and
-        inseparable relationship to be determined.
-
-    * indexes:
-        The cross-reference dictionary for each candidate dimension.
-
-    Returns:
-        A tuple containing the set of separable and inseparable
-        candidate dimensions.
-
-    """
-    separable = set()
-    inseparable = set()
-
-    for target_name in indexes:
-        if name != target_name:
-            if _separable_pair(target_name, indexes[name]):
-                separable.add(target_name)
-            else:
-                inseparable.add(target_name)
-
-    return _Relation(separable, inseparable)
+    return _Indexes(positions)
 
 
 def derive_relation_matrix(indexes):
@@ -456,15 +449,24 @@ def derive_relation_matrix(indexes):
     Args:
     
     * indexes:
-        The cross-reference dictionary for each candidate dimension.
+        The cross-reference of each candidate dimension.
 
     Returns:
         The relation dictionary for each candidate dimension.
 
     """
-    # TODO: This takes twice as long as it could do because it doesn't
-    # account for the symmetric nature of the relationship.
-    relation_matrix = {name: _separable(name, indexes) for name in indexes}
+    names = list(indexes)
+    relation_matrix = {name: _Relation(set(), set()) for name in names}
+
+    # The relationship is symmetric, so each pair need only be judged once.
+    for i, name in enumerate(names):
+        for other_name in names[i + 1:]:
+            if indexes.separable(name, other_name):
+                relation_matrix[name].separable.add(other_name)
+                relation_matrix[other_name].separable.add(name)
+            else:
+                relation_matrix[name].inseparable.add(other_name)
+                relation_matrix[other_name].inseparable.add(name)
 
     return relation_matrix
 
@@ -531,7 +533,7 @@ def _derive_separable_group(relation_matrix, group):
     return result
 
 
-def _is_dependent(dependent, independent, positions, function_mapping=None):
+def _is_dependent(dependent, independent, indexes, function_mapping=None):
     """
     Determine whether there exists a one-to-one functional relationship
     between the independent candidate dimension/s and the dependent
@@ -547,9 +549,8 @@ def _is_dependent(dependent, independent, positions, function_mapping=None):
         A list of candidate dimension/s that require to act as the independent
         variables in a functional relationship.
 
-    * positions:
-        A list containing a dictionary of candidate dimension key to scalar value
-        pairs for each source-cube.
+    * indexes:
+        The cross-reference of each candidate dimension.
 
     Kwargs:
 
@@ -562,21 +563,17 @@ def _is_dependent(dependent, independent, positions, function_mapping=None):
         Boolean.
 
     """
-    valid = True
-    relation = {}
-
-    if isinstance(function_mapping, dict):
-        relation = function_mapping
-
-    for position in positions:
-        item = tuple([position[name] for name in independent])
-
-        if item in relation:
-            if position[dependent] != relation[item]:
-                valid = False
-                break
-        else:
-            relation[item] = position[dependent]
+    # The relationship is a function if each distinct combination of the
+    # independent values occurs with only one dependent value.
+    codes, count = indexes.group_codes(independent)
+    _, dependent_count = indexes.combine(codes, count, dependent)
+    valid = dependent_count == count
+
+    if valid and isinstance(function_mapping, dict):
+        _, rows = numpy.unique(codes, return_index=True)
+        for row in rows:
+            item = tuple([indexes.value(name, row) for name in independent])
+            function_mapping[item] = indexes.value(dependent, row)
 
     return valid
 
@@ -624,7 +621,7 @@ def _derive_separable_consistent_groups(relation_matrix, separable_group):
     return result
 
 
-def _build_separable_group(space, group, separable_consistent_groups, positions, function_matrix):
+def _build_separable_group(space, group, separable_consistent_groups, indexes, function_matrix):
     """
     Update the space with the first separable consistent group that satisfies a valid 
     functional relationship with all other candidate dimensions in the group.
@@ -646,9 +643,8 @@ def _build_separable_group(space, group, separable_consistent_groups, positions,
     * separable_consistent_groups:
         A list of candidate dimension groups that are consistently separable.
 
-    * positions:
-        A list containing a dictionary of candidate dimension key to scalar value 
-        pairs for each source-cube.
+    * indexes:
+        The cross-reference of each candidate dimension.
 
     * function_matrix:
         The function mapping dictionary for each candidate dimension that
@@ -666,7 +662,7 @@ def _build_separable_group(space, group, separable_consistent_groups, positions,
 
         for name in dependent:
             function_mapping = {}
-            valid = _is_dependent(name, independent, positions, function_mapping)
+            valid = _is_dependent(name, independent, indexes, function_mapping)
 
             if not valid:
                 break
@@ -686,7 +682,7 @@ def _build_separable_group(space, group, separable_consistent_groups, positions,
         raise iris.exceptions.NotYetImplementedError('No functional relationship between separable and inseparable candidate dimensions.')
 
 
-def _build_inseparable_group(space, group, positions, function_matrix):
+def _build_inseparable_group(space, group, indexes, function_matrix):
     """
     Update the space with the first valid scalar functional relationship between
     a candidate dimension within the group and all other candidate dimensions.
@@ -708,9 +704,8 @@ def _build_inseparable_group(space, group, positions, function_matrix):
     * group:
         A set of related (chained) inseparable candidate dimensions.
 
-    * positions:
-        A list containing a dictionary of candidate dimension key to scalar value
-        pairs for each source-cube.
+    * indexes:
+        The cross-reference of each candidate dimension.
 
     * function_matrix:
         The function mapping dictionary for each candidate dimension that
@@ -730,7 +725,7 @@ def _build_inseparable_group(space, group, positions, function_matrix):
 
         for name in dependent:
             function_mapping = {}
-            valid = _is_dependent(name, independent, positions, function_mapping)
+            valid = _is_dependent(name, independent, indexes, function_mapping)
                     
             if not valid:
                 break
@@ -750,7 +745,7 @@ def _build_inseparable_group(space, group, positions, function_matrix):
     return scalar
 
 
-def _build_combination_group(space, group, positions, function_matrix):
+def _build_combination_group(space, group, indexes, function_matrix):
     """
     Update the space with the new combined or invented dimension 
     that each member of this inseparable group depends on.
@@ -769,9 +764,8 @@ def _build_combination_group(space, group, positions, function_matrix):
     * group:
         A set of related (chained) inseparable candidate dimensions.
 
-    * positions:
-        A list containing a dictionary of candidate dimension key to scalar value
-        pairs for each source-cube.
+    * indexes:
+        The cross-reference of each candidate dimension.
 
     * function_matrix:
         The function mapping dictionary for each candidate dimension that
@@ -790,15 +784,18 @@ def _build_combination_group(space, group, positions, function_matrix):
     for name in group:
         function_matrix[name] = {}
 
-    for position in positions:
+    members = [int(member) if member.isdigit() else member for member in members]
+    codes, _ = indexes.group_codes(members)
+    _, rows = numpy.unique(codes, return_index=True)
+    for row in rows:
         # Note, the cell double-tuple! This ensures that the cell value for
         # each member of the group is kept bound together as one key.
-        cell = (tuple([position[int(member) if member.isdigit() else member] for member in members]),)
+        cell = (tuple([indexes.value(member, row) for member in members]),)
         for name in group:
-            function_matrix[name][cell] = position[name]
+            function_matrix[name][cell] = indexes.value(name, row)
 
 
-def derive_space(groups, relation_matrix, positions, function_matrix=None):
+def derive_space(groups, relation_matrix, indexes, function_matrix=None):
     """
     Determine the relationship between all the candidate dimensions.
 
@@ -809,9 +806,8 @@ def derive_space(groups, relation_matrix, positions, function_matrix=None):
       * relation_matrix:
           The relation dictionary for each candidate dimension.
 
-      * positions:
-          A list containing a dictionary of candidate dimension key to
-          scalar value pairs for each source-cube.
+      * indexes:
+          The cross-reference of each candidate dimension.
 
     Kwargs:
       * function_matrix:
@@ -835,19 +831,53 @@ def derive_space(groups, relation_matrix, positions, function_matrix=None):
             # Determine the largest combination of the candidate dimensions 
             # in the separable group that are consistently separable.
             separable_consistent_groups = _derive_separable_consistent_groups(relation_matrix, separable_group)
-            _build_separable_group(space, group, separable_consistent_groups, positions, function_matrix)
+            _build_separable_group(space, group, separable_consistent_groups, indexes, function_matrix)
         else:
             # Determine whether there is a scalar relationship between one of
             # the candidate dimensions and each of the other candidate dimensions 
             # in this inseparable group.
-            if not _build_inseparable_group(space, group, positions, function_matrix):
+            if not _build_inseparable_group(space, group, indexes, function_matrix):
                 # There is no relationship between any of the candidate dimensions in this 
                 # inseparable group, so merge them together into a new combined dimension of the space.
-                _build_combination_group(space, group, positions, function_matrix)
+                _build_combination_group(space, group, indexes, function_matrix)
 
     return space
 
 
+def merge_keys(cube):
+    """
+    Returns the hashable keys with which to find the :class:`ProtoCube`
+    of a cube, as a (group_key, type_key, key) tuple.
+
+    The group key depends only on the names and shapes of the cube and its
+    coordinates, and the names of its attributes, so is equal for any cubes
+    with equal signatures. The key further depends on the attribute values,
+    where string and numeric values are used as they are, and other values
+    by their repr, and the type key on the types of the other values. Cubes
+    with equal signatures and equal type keys have equal keys, but an
+    attribute value may equal a value of a different type, such as a STASH
+    code and its string, so cubes with different type keys must still be
+    compared.
+
+    """
+    coords = tuple(sorted((coord.name(), tuple(cube.coord_dims(coord)))
+                          for coord in cube.coords()))
+    attributes = sorted(cube.attributes.iteritems())
+    group_key = (cube.standard_name, cube.long_name,
+                 tuple([name for name, _ in attributes]),
+                 cube._data.shape, coords)
+    values = []
+    types = []
+    for _, value in attributes:
+        if isinstance(value, (basestring, numbers.Number)):
+            values.append(value)
+            types.append(None)
+        else:
+            values.append(repr(value))
+            types.append(type(value))
+    return group_key, tuple(types), (group_key, tuple(values))
+
+
 class ProtoCube(object):
     """Framework for merging source-cubes into one or more higher dimensional cubes."""
 
@@ -901,7 +931,7 @@ class ProtoCube(object):
         groups = derive_groups(relation_matrix)
 
         function_matrix = {}
-        space = derive_space(groups, relation_matrix, positions, function_matrix=function_matrix)
+        space = derive_space(groups, relation_matrix, indexes, function_matrix=function_matrix)
         self._define_space(space, positions, indexes, function_matrix)
         self._build_coordinates()
 
@@ -910,8 +940,8 @@ class ProtoCube(object):
 
         # Collate source-cubes by the nd-index.
         group_by_nd_index = {}
-        for index, position in enumerate(positions):
-            group = group_by_nd_index.setdefault(self._nd_index(position), [])
+        for index, nd_index in enumerate(self._nd_indexes(indexes).tolist()):
+            group = group_by_nd_index.setdefault(tuple(nd_index), [])
             group.append(index)
 
         # Determine the largest group of source-cubes that want to occupy
@@ -1036,7 +1066,7 @@ class ProtoCube(object):
             scalar value pairs for each source-cube.
 
         * indexes:
-            A cross-reference dictionary for each candidate dimension.
+            The cross-reference of each candidate dimension.
 
         * function_matrix:
             The function mapping dictionary for each candidate dimension that
@@ -1169,21 +1199,27 @@ class ProtoCube(object):
 
         return cube
 
-    def _nd_index(self, position):
-        """Returns the n-dimensional index of this source-cube (position), within the merged cube."""
+    def _nd_indexes(self, indexes):
+        """Returns the n-dimensional index of each source-cube (position), within the merged cube, as the rows of an array."""
 
-        index = []
+        columns = []
 
-        # Determine the index of the source-cube cell for each dimension.
+        # Determine the index of the source-cube cells for each dimension.
         for name in self._nd_names:
+            cache = self._cache_by_name[name]
             if _is_combination(name):
-                members = name.split(_COMBINATION_JOIN)
-                cell = tuple([position[int(member) if member.isdigit() else member] for member in members])
-                index.append(self._cache_by_name[name][cell])
+                members = [int(member) if member.isdigit() else member for member in name.split(_COMBINATION_JOIN)]
+                codes, _ = indexes.group_codes(members)
+                _, rows = numpy.unique(codes, return_index=True)
+                lookup = [cache[tuple([indexes.value(member, row) for member in members])] for row in rows]
             else:
-                index.append(self._cache_by_name[name][position[name]])
+                codes = indexes.codes(name)
+                lookup = [cache[value] for value in indexes[name]]
+            columns.append(numpy.array(lookup, dtype=numpy.int64)[codes])
 
-        return tuple(index)
+        if not columns:
+            return numpy.empty((indexes.size, 0), dtype=numpy.int64)
+        return numpy.column_stack(columns)
 
     def _build_coordinates(self):
         """
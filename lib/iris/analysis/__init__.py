@@ -36,10 +36,12 @@ import numpy
 import scipy.stats.mstats
 
 import iris.coords
+import iris.util
 
 
-__all__ = ('COUNT', 'GMEAN', 'HMEAN', 'MAX', 'MEAN', 'MEDIAN', 'MIN',
-           'PERCENTILE', 'PROPORTION', 'RMS', 'STD_DEV', 'SUM', 'VARIANCE',
+__all__ = ('APPROX_MEDIAN', 'APPROX_PERCENTILE', 'COUNT', 'GMEAN', 'HMEAN', 'MAX',
+           'MEAN', 'MEDIAN', 'MIN', 'PERCENTILE', 'PROPORTION', 'RMS', 'STD_DEV',
+           'SUM', 'VARIANCE',
             'coord_comparison', 'Aggregator', 'clear_phenomenon_identity')
 
 
@@ -303,6 +305,13 @@ class Aggregator(object):
         '''Cube cell method string.'''
         self.call_func = call_func
         '''Data aggregation function.'''
+        self.decomposition = None
+        '''
+        Optional :class:`_Decomposition` of the aggregation into partial
+        results which can be combined, allowing the aggregation to be
+        performed a chunk of the data at a time.
+
+        '''
 
         self._kwargs = kwargs
 
@@ -322,6 +331,178 @@ class Aggregator(object):
         kwargs = dict(self._kwargs.items() + kwargs.items())
         return self.call_func(data, axis=axis, **kwargs)
         
+    def aggregate_chunks(self, chunks, axis, concatenate=False, **kwargs):
+        """
+        Perform the aggregation function over a sequence of chunks of the
+        data, holding only the partial result of the chunks so far in
+        memory. Only applicable when the aggregator has a
+        :attr:`decomposition`.
+
+        Args:
+
+        * chunks:
+            An iterable of (data, weights) pairs, where the weights are
+            None for an unweighted aggregation.
+        * axis:
+            The axis of each chunk of data to aggregate over.
+
+        Kwargs:
+
+        * concatenate:
+            Whether each chunk describes the next index of the first axis of
+            the result, rather than contributing to every point of the
+            result. Defaults to False.
+        * kwargs:
+            As for :meth:`aggregate`.
+
+        Returns:
+            The aggregated data.
+
+        """
+        kwargs = dict(self._kwargs.items() + kwargs.items())
+        kwargs.pop('weights', None)
+        decomposition = self.decomposition
+
+        state = None
+        states = []
+        for data, weights in chunks:
+            chunk_kwargs = kwargs
+            if weights is not None:
+                chunk_kwargs = dict(kwargs, weights=weights)
+            partial = decomposition.partial(data, axis, **chunk_kwargs)
+            if concatenate:
+                states.append(partial)
+            elif state is None:
+                state = partial
+            else:
+                state = decomposition.combine(state, partial)
+
+        if concatenate:
+            state = decomposition.concatenate(states)
+
+        return decomposition.finalise(state, **kwargs)
+
+    def aggregate_groups(self, data, axis, groups, **kwargs):
+        """
+        Perform the aggregation function over each group of indices of an
+        axis of the data.
+
+        The data is put into group order along the axis once. Aggregators
+        with a :attr:`decomposition` then reduce all of the groups together,
+        while other aggregators reduce a view of each group in turn.
+
+        Args:
+
+        * data:
+            The data to aggregate.
+        * axis:
+            The axis of the data to aggregate over.
+        * groups:
+            The slice, or tuple of indices, of the axis of each group, which
+            together cover the whole axis. See :meth:`_Groupby.group`.
+
+        Kwargs:
+
+        * kwargs:
+            As for :meth:`aggregate`.
+
+        Returns:
+            The aggregated data, with one index of the axis for each group.
+            This has the data type of the aggregation of a single group. When
+            the data is masked, the results of an aggregator with a
+            :attr:`decomposition` are masked where a group has too few
+            unmasked values, such as where they are all masked.
+
+        """
+        indices = []
+        for group in groups:
+            if isinstance(group, slice):
+                indices.append(numpy.arange(group.start, group.stop))
+            else:
+                indices.append(numpy.asarray(group))
+        sizes = numpy.array([len(group_indices) for group_indices in indices])
+        starts = numpy.cumsum(sizes) - sizes
+
+        # Order the data by group, unless it is already.
+        order = numpy.concatenate(indices)
+        if not numpy.array_equal(order, numpy.arange(data.shape[axis])):
+            data = data.take(order, axis=axis)
+
+        decomposition = self.decomposition
+        if decomposition is not None and decomposition.group_partial is not None:
+            all_kwargs = dict(self._kwargs.items() + kwargs.items())
+            state = decomposition.group_partial(data, axis, starts, **all_kwargs)
+            result = decomposition.finalise(state, **all_kwargs)
+            # As for other aggregators, the result has the data type of the
+            # aggregation of a single group, and is unmasked unless both the
+            # data and the result have masked points.
+            key = [slice(None)] * data.ndim
+            key[axis] = slice(0, sizes[0])
+            group_result = self.aggregate(data[tuple(key)], axis=axis, **kwargs)
+            result = result.astype(numpy.asarray(group_result).dtype)
+            if not (numpy.ma.is_masked(data) and numpy.ma.is_masked(result)):
+                result = numpy.ma.getdata(result)
+        else:
+            shape = list(data.shape)
+            shape[axis] = len(sizes)
+            key = [slice(None)] * data.ndim
+            for i, (start, size) in enumerate(zip(starts, sizes)):
+                key[axis] = slice(start, start + size)
+                group_result = self.aggregate(data[tuple(key)], axis=axis, **kwargs)
+                # Determine the result data type on the first group.
+                if i == 0:
+                    result = numpy.zeros(shape, dtype=group_result.dtype)
+                key[axis] = i
+                result[tuple(key)] = group_result
+
+        return result
+
+    def aggregate_rolling(self, data, axis, window, **kwargs):
+        """
+        Perform the aggregation function over each window of consecutive
+        indices of an axis of the data.
+
+        Aggregators with a :attr:`decomposition` aggregate all of the
+        windows in a single pass of the data, regardless of the window
+        length, while other aggregators aggregate a rolling window view of
+        the data.
+
+        Args:
+
+        * data:
+            The data to aggregate.
+        * axis:
+            The axis of the data to aggregate over.
+        * window:
+            The number of indices of each window.
+
+        Kwargs:
+
+        * kwargs:
+            As for :meth:`aggregate`.
+
+        Returns:
+            The aggregated data, with one index of the axis for each window.
+
+        """
+        if window < 1:
+            raise ValueError("`window` must be at least 1.")
+        if window > data.shape[axis]:
+            raise ValueError("`window` is too long.")
+
+        decomposition = self.decomposition
+        if decomposition is not None and decomposition.rolling_partial is not None:
+            all_kwargs = dict(self._kwargs.items() + kwargs.items())
+            state = decomposition.rolling_partial(data, axis, window, **all_kwargs)
+            result = decomposition.finalise(state, **all_kwargs)
+        else:
+            # Take a view of the data with an extra dimension, at axis + 1,
+            # which represents the rolled window.
+            rolling_window_data = iris.util.rolling_window(data, window=window, axis=axis)
+            result = self.aggregate(rolling_window_data, axis=axis + 1, **kwargs)
+
+        return result
+
     def update_metadata(self, cube, coords, **kwargs):
         """
         Update cube history and cell method metadata w.r.t the aggregation function.
@@ -393,6 +574,27 @@ class WeightedAggregator(Aggregator):
         self._weighting_keywords = ["returned", "weights"]
         '''A list of keywords that trigger weighted behaviour.'''
 
+    def aggregate(self, data, axis, **kwargs):
+        """
+        Perform the aggregation function given the data.
+
+        As :meth:`Aggregator.aggregate`, except that weights with the
+        dimensionality of the data need only be broadcastable to the shape of
+        the data. When the aggregator has a :attr:`decomposition` such weights
+        are contracted with the data without being expanded to its shape.
+
+        Returns:
+            The aggregated data.
+
+        """
+        weights = kwargs.get('weights')
+        if weights is not None and numpy.ndim(weights) == numpy.ndim(data) and \
+                numpy.shape(weights) != numpy.shape(data):
+            if self.decomposition is not None:
+                return self.aggregate_chunks([(data, weights)], axis, **kwargs)
+            kwargs['weights'] = numpy.broadcast_arrays(weights, data)[0]
+        return Aggregator.aggregate(self, data, axis, **kwargs)
+
     def uses_weighting(self, **kwargs):
         """Does this aggregator use weighting with the given keywords?"""
         result = False 
@@ -428,6 +630,512 @@ class WeightedAggregator(Aggregator):
         return result
 
 
+class _Decomposition(object):
+    """
+    Describes an aggregation as the combination of the partial results of
+    aggregating chunks of the data, each of which is a tuple of arrays with
+    the shape of the aggregated data.
+
+    """
+    def __init__(self, partial, combine, finalise, group_partial=None,
+                 rolling_partial=None, concatenate=None):
+        """
+        Args:
+
+        * partial (callable):
+            Function returning the partial result of a chunk of data, given
+            the data, the axis to aggregate over, and the aggregation
+            keywords.
+        * combine (callable):
+            Function returning the partial result of the data of two
+            partial results.
+        * finalise (callable):
+            Function returning the aggregated data from a partial result,
+            given the partial result and the aggregation keywords.
+
+        Kwargs:
+
+        * group_partial (callable):
+            Function returning the partial result of each group of
+            consecutive indices of an axis of the data, given the data, the
+            axis, the start index of each group, and the aggregation
+            keywords.
+        * rolling_partial (callable):
+            Function returning the partial result of each window of
+            consecutive indices of an axis of the data, given the data, the
+            axis, the window length, and the aggregation keywords.
+        * concatenate (callable):
+            Function returning the partial result of a list of partial
+            results of consecutive parts of the data along its first axis.
+            Defaults to concatenating each of the arrays of the partial
+            results.
+
+        """
+        self.partial = partial
+        self.combine = combine
+        self.finalise = finalise
+        self.group_partial = group_partial
+        self.rolling_partial = rolling_partial
+        self.concatenate = concatenate or _concatenate_partials
+
+
+def _float_dtype(data):
+    # The dtype of the statistics of the data, as numpy computes them.
+    dtype = numpy.asarray(data).dtype
+    if dtype.kind != 'f':
+        dtype = numpy.dtype('f8')
+    return dtype
+
+
+def _masked_result(result):
+    # A masked array, or a scalar in place of a 0-d array, as the numpy.ma
+    # aggregation of the data in full would return.
+    result = numpy.ma.asarray(result)
+    if result.ndim == 0:
+        result = result[()]
+    return result
+
+
+def _sum_dtype(data):
+    # The dtype of the sum of the data, as numpy computes it.
+    return numpy.zeros(0, dtype=data.dtype).sum().dtype
+
+
+def _group_sizes(data, axis, starts):
+    # The number of indices of each group, broadcastable to the grouped data.
+    sizes = numpy.diff(numpy.append(starts, data.shape[axis]))
+    shape = [1] * data.ndim
+    shape[axis] = len(sizes)
+    return sizes.reshape(shape)
+
+
+def _group_count(data, axis, starts):
+    # The number of unmasked values of each group.
+    if numpy.ma.getmask(data) is numpy.ma.nomask:
+        shape = list(data.shape)
+        shape[axis] = len(starts)
+        count = numpy.zeros(shape, dtype=int) + _group_sizes(data, axis, starts)
+    else:
+        count = numpy.add.reduceat(~data.mask, starts, axis=axis, dtype=int)
+    return count
+
+
+def _rolling_sum(data, axis, window, dtype=None):
+    # The sum of each window of the data. As for _rolling_extreme, divided
+    # into blocks of the window length, each window is the sum of the end of
+    # one block and the start of the next, accumulated in double precision.
+    # Each sum is of the values of its own window alone, so neither rounding
+    # errors nor non-finite values spread to the sums of other windows.
+    if dtype is None:
+        dtype = numpy.asarray(data).dtype
+    accumulator = numpy.float64 if dtype.kind == 'f' else dtype
+    values = numpy.rollaxis(numpy.asarray(data), axis)
+    length = values.shape[0]
+    padding = numpy.zeros(((-length) % window,) + values.shape[1:], dtype=values.dtype)
+    blocks = numpy.concatenate([values, padding])
+    blocks = blocks.reshape((-1, window) + values.shape[1:])
+    from_start = numpy.add.accumulate(blocks, axis=1, dtype=accumulator)
+    from_end = numpy.add.accumulate(blocks[:, ::-1], axis=1, dtype=accumulator)[:, ::-1]
+    # A window which starts a block lies wholly within it.
+    from_end[:, 0] = 0
+    from_start = from_start.reshape((-1,) + values.shape[1:])
+    from_end = from_end.reshape((-1,) + values.shape[1:])
+    total = from_end[:length - window + 1] + from_start[window - 1:length]
+    return numpy.rollaxis(total, 0, axis + 1).astype(dtype)
+
+
+def _rolling_count(data, axis, window):
+    # The number of unmasked values of each window.
+    if numpy.ma.getmask(data) is numpy.ma.nomask:
+        shape = list(data.shape)
+        shape[axis] -= window - 1
+        count = numpy.empty(shape, dtype=int)
+        count.fill(window)
+    else:
+        count = _rolling_sum(~data.mask, axis, window, numpy.dtype(int))
+    return count
+
+
+def _rolling_extreme(ufunc, data, axis, window, fill_value):
+    # The van Herk/Gil-Werman algorithm: divided into blocks of the window
+    # length, each window spans the end of one block and the start of the
+    # next, so is the extreme of the accumulation of each block from its
+    # end and from its start.
+    values = numpy.rollaxis(data, axis)
+    length = values.shape[0]
+    padding = numpy.empty(((-length) % window,) + values.shape[1:], dtype=values.dtype)
+    padding.fill(fill_value)
+    blocks = numpy.concatenate([values, padding])
+    blocks = blocks.reshape((-1, window) + values.shape[1:])
+    from_start = ufunc.accumulate(blocks, axis=1).reshape((-1,) + values.shape[1:])
+    from_end = ufunc.accumulate(blocks[:, ::-1], axis=1)[:, ::-1].reshape((-1,) + values.shape[1:])
+    extreme = ufunc(from_end[:length - window + 1], from_start[window - 1:length])
+    return numpy.rollaxis(extreme, 0, axis + 1)
+
+
+def _concatenate_partials(states):
+    return tuple(numpy.ma.concatenate(parts) for parts in zip(*states))
+
+
+def _add_partials(state, other):
+    return tuple(total + other_total for total, other_total in zip(state, other))
+
+
+def _extreme_decomposition(function, ufunc, fill_value):
+    # The decomposition of an aggregation which chooses one of the values.
+    def partial(data, axis, **kwargs):
+        return (numpy.ma.asarray(function(data, axis=axis)),)
+
+    def combine(state, other):
+        pair = numpy.ma.concatenate([state[0][numpy.newaxis], other[0][numpy.newaxis]])
+        return (numpy.ma.asarray(function(pair, axis=0)),)
+
+    def finalise(state, **kwargs):
+        return _masked_result(state[0])
+
+    def group_partial(data, axis, starts, **kwargs):
+        data = numpy.ma.asarray(data)
+        extreme = ufunc.reduceat(data.filled(fill_value(data)), starts, axis=axis)
+        count = _group_count(data, axis, starts)
+        return (numpy.ma.masked_where(count == 0, extreme),)
+
+    def rolling_partial(data, axis, window, **kwargs):
+        data = numpy.ma.asarray(data)
+        extreme = _rolling_extreme(ufunc, data.filled(fill_value(data)), axis, window,
+                                   fill_value(data))
+        count = _rolling_count(data, axis, window)
+        return (numpy.ma.masked_where(count == 0, extreme),)
+
+    return _Decomposition(partial, combine, finalise, group_partial, rolling_partial)
+
+
+def _sum_partial(data, axis, **kwargs):
+    data = numpy.ma.asarray(data)
+    total = numpy.ma.filled(numpy.ma.sum(data, axis=axis), 0)
+    return total, numpy.ma.count(data, axis=axis)
+
+
+def _sum_group_partial(data, axis, starts, **kwargs):
+    data = numpy.ma.asarray(data)
+    total = numpy.add.reduceat(data.filled(0), starts, axis=axis, dtype=_sum_dtype(data))
+    return total, _group_count(data, axis, starts)
+
+
+def _sum_rolling_partial(data, axis, window, **kwargs):
+    data = numpy.ma.asarray(data)
+    total = _rolling_sum(data.filled(0), axis, window, _sum_dtype(data))
+    return total, _rolling_count(data, axis, window)
+
+
+def _sum_finalise(state, **kwargs):
+    total, count = state
+    return _masked_result(numpy.ma.masked_where(count == 0, total))
+
+
+def _count_partial(data, axis, function, **kwargs):
+    return _sum_partial(function(numpy.ma.asarray(data)), axis)
+
+
+def _count_group_partial(data, axis, starts, function, **kwargs):
+    return _sum_group_partial(function(numpy.ma.asarray(data)), axis, starts)
+
+
+def _count_rolling_partial(data, axis, window, function, **kwargs):
+    return _sum_rolling_partial(function(numpy.ma.asarray(data)), axis, window)
+
+
+def _mean_partial(data, axis, weights=None, **kwargs):
+    data = numpy.ma.asarray(data)
+    if weights is None:
+        dtype = _float_dtype(data)
+        total = numpy.ma.filled(numpy.ma.sum(data, axis=axis, dtype=dtype), 0)
+        weight_total = numpy.ma.count(data, axis=axis).astype(dtype)
+    else:
+        # Contract the data with the weights, which need only be broadcastable
+        # to the data, rather than multiplying the two out in full.
+        data = numpy.rollaxis(data, axis, data.ndim)
+        weights = numpy.rollaxis(numpy.asarray(weights), axis, data.ndim)
+        if weights.shape[-1] != data.shape[-1]:
+            weights = weights * numpy.ones(data.shape[-1:], dtype=weights.dtype)
+        dtype = numpy.result_type(data.dtype, weights.dtype)
+        total = numpy.einsum('...i,...i->...', data.filled(0), weights, dtype=dtype)
+        if data.mask is numpy.ma.nomask:
+            weight_total = weights.sum(axis=-1, dtype=dtype) + numpy.zeros(total.shape, dtype=dtype)
+        else:
+            weight_total = numpy.einsum('...i,...i->...', ~data.mask, weights, dtype=dtype)
+    return total, weight_total
+
+
+def _mean_group_partial(data, axis, starts, **kwargs):
+    data = numpy.ma.asarray(data)
+    dtype = _float_dtype(data)
+    total = numpy.add.reduceat(data.filled(0), starts, axis=axis, dtype=dtype)
+    return total, _group_count(data, axis, starts).astype(dtype)
+
+
+def _mean_rolling_partial(data, axis, window, weights=None, **kwargs):
+    data = numpy.ma.asarray(data)
+    if weights is None:
+        dtype = _float_dtype(data)
+        total = _rolling_sum(data.filled(0), axis, window, dtype)
+        weight_total = _rolling_count(data, axis, window).astype(dtype)
+    else:
+        weights = weights * ~numpy.ma.getmaskarray(data)
+        dtype = numpy.result_type(data.dtype, weights.dtype)
+        total = _rolling_sum(numpy.multiply(data.filled(0), weights, dtype=dtype),
+                             axis, window)
+        weight_total = _rolling_sum(weights.astype(dtype), axis, window)
+    return total, weight_total
+
+
+def _mean_finalise(state, returned=False, **kwargs):
+    total, weight_total = state
+    # Only the means of no values are masked, not those which are not finite.
+    with numpy.errstate(divide='ignore', invalid='ignore'):
+        result = total / weight_total
+    result = _masked_result(numpy.ma.masked_array(result, mask=weight_total == 0))
+    if returned:
+        result = (result, weight_total)
+    return result
+
+
+def _rms_partial(data, axis, **kwargs):
+    total, count = _sum_partial(numpy.square(numpy.ma.asarray(data)), axis)
+    size = numpy.empty(count.shape, dtype=int)
+    size.fill(data.shape[axis])
+    return total, count, size
+
+
+def _rms_group_partial(data, axis, starts, **kwargs):
+    total, count = _sum_group_partial(numpy.square(numpy.ma.asarray(data)), axis, starts)
+    return total, count, numpy.zeros(count.shape, dtype=int) + _group_sizes(data, axis, starts)
+
+
+def _rms_rolling_partial(data, axis, window, **kwargs):
+    total, count = _sum_rolling_partial(numpy.square(numpy.ma.asarray(data)), axis, window)
+    size = numpy.empty(count.shape, dtype=int)
+    size.fill(window)
+    return total, count, size
+
+
+def _rms_finalise(state, **kwargs):
+    total, count, size = state
+    result = numpy.ma.masked_array(numpy.sqrt(total / size), mask=count == 0)
+    result = _masked_result(result.astype(_float_dtype(total)))
+    if (count == size).all():
+        # Unmasked data gives an unmasked result.
+        result = numpy.ma.getdata(result)[()]
+    return result
+
+
+def _variance_partial(data, axis, **kwargs):
+    # The count, mean and sum of squared deviations from the mean.
+    data = numpy.ma.asarray(data)
+    dtype = _float_dtype(data)
+    count = numpy.ma.count(data, axis=axis)
+    mean = numpy.ma.mean(data, axis=axis, dtype=dtype)
+    deviations = data - numpy.ma.expand_dims(mean, axis)
+    squares = numpy.ma.filled(numpy.ma.sum(deviations * deviations, axis=axis), 0)
+    return count, numpy.ma.filled(mean, 0), squares, data.mask is not numpy.ma.nomask
+
+
+def _variance_group_partial(data, axis, starts, **kwargs):
+    data = numpy.ma.asarray(data)
+    dtype = _float_dtype(data)
+    count = _group_count(data, axis, starts)
+    total = numpy.add.reduceat(data.filled(0), starts, axis=axis, dtype=dtype)
+    mean = (total / numpy.maximum(count, 1)).astype(dtype)
+    # Subtract the mean of its group from each value.
+    sizes = numpy.diff(numpy.append(starts, data.shape[axis]))
+    deviations = data - mean.take(numpy.repeat(numpy.arange(len(starts)), sizes), axis=axis)
+    squares = numpy.add.reduceat((deviations * deviations).filled(0), starts, axis=axis, dtype=dtype)
+    return count, mean, squares, data.mask is not numpy.ma.nomask
+
+
+def _variance_combine(state, other):
+    # The parallel algorithm of Chan et al. for combining the variance of
+    # two sets of values.
+    count, mean, squares, masked = state
+    other_count, other_mean, other_squares, other_masked = other
+    total_count = count + other_count
+    divisor = numpy.maximum(total_count, 1)
+    delta = other_mean - mean
+    mean = mean + delta * (other_count / divisor)
+    squares = squares + other_squares + delta * delta * (count * other_count / divisor)
+    return total_count, mean.astype(delta.dtype), squares.astype(delta.dtype), masked or other_masked
+
+
+def _variance_concatenate(states):
+    return (_concatenate_partials([state[:3] for state in states]) +
+            (any(state[3] for state in states),))
+
+
+def _variance_finalise(state, ddof=0, **kwargs):
+    # As numpy.ma.var, the variances of too few values are masked when the
+    # data has a mask, and are NaN otherwise.
+    count, mean, squares, masked = state
+    with numpy.errstate(divide='ignore', invalid='ignore'):
+        variance = squares / numpy.maximum(count - ddof, 0)
+    # Cast before masking, as the masked scalar cannot be cast.
+    variance = numpy.asarray(variance).astype(squares.dtype)
+    if masked:
+        variance = numpy.ma.masked_array(variance, mask=count <= ddof)
+    return _masked_result(variance)
+
+
+def _std_dev_finalise(state, **kwargs):
+    return numpy.ma.sqrt(_variance_finalise(state, **kwargs))
+
+
+def _sketch_gamma(accuracy):
+    # The ratio of the bounds of the magnitudes of each bucket of a sketch.
+    if not 0 < accuracy < 1:
+        raise ValueError('The accuracy must be between 0 and 1, got %r.' % accuracy)
+    return (1 + accuracy) / (1 - accuracy)
+
+
+def _sketch_store(cells, magnitudes, n_cells, accuracy, max_buckets):
+    # The (counts, offset) of the buckets of the magnitudes of each cell,
+    # where bucket key k holds the magnitudes in (gamma**(k-1), gamma**k]
+    # and the counts of each cell start at the bucket key of the offset.
+    # As in the collapsing store of DDSketch, there are at most max_buckets
+    # buckets, the lowest of which also holds any smaller magnitudes.
+    if not magnitudes.size:
+        return numpy.zeros((n_cells, 0), dtype=int), 0
+    if max_buckets < 1:
+        raise ValueError('The max_buckets must be at least 1, got %r.' % max_buckets)
+    keys = numpy.ceil(numpy.log(magnitudes) / numpy.log(_sketch_gamma(accuracy))).astype(int)
+    keys = numpy.maximum(keys, keys.max() - max_buckets + 1)
+    offset = keys.min()
+    width = keys.max() - offset + 1
+    counts = numpy.bincount(cells * width + (keys - offset), minlength=n_cells * width)
+    return counts.reshape(n_cells, width), offset
+
+
+def _sketch_partial(data, axis, labels, n_labels, accuracy, max_buckets):
+    # The sketch of the values of the data along the axis of each label,
+    # as (zeros, (negative counts, offset), (positive counts, offset)),
+    # with the axis of the labels last but for the bucket axis.
+    values = numpy.ma.asarray(data)
+    values = numpy.rollaxis(values, axis, values.ndim)
+    shape = values.shape[:-1] + (n_labels,)
+    n_cells = int(numpy.prod(shape))
+
+    # The cell of each value, excluding masked and non-finite values.
+    cells = numpy.arange(n_cells // n_labels).reshape(values.shape[:-1] + (1,)) * n_labels + labels
+    cells = numpy.broadcast_to(cells, values.shape).ravel()
+    flat = numpy.ma.getdata(values).ravel()
+    valid = ~numpy.ma.getmaskarray(values).ravel() & numpy.isfinite(flat)
+    cells = cells[valid]
+    flat = flat[valid]
+
+    zeros = numpy.bincount(cells[flat == 0], minlength=n_cells).reshape(shape)
+    negative = flat < 0
+    negative_counts, negative_offset = _sketch_store(cells[negative], -flat[negative],
+                                                     n_cells, accuracy, max_buckets)
+    positive = flat > 0
+    positive_counts, positive_offset = _sketch_store(cells[positive], flat[positive],
+                                                     n_cells, accuracy, max_buckets)
+    return (zeros,
+            (negative_counts.reshape(shape + (-1,)), negative_offset),
+            (positive_counts.reshape(shape + (-1,)), positive_offset))
+
+
+def _sketch_align(stores, max_buckets):
+    # The counts of the stores over the same range of at most max_buckets
+    # bucket keys, with the counts of any lower keys added to the lowest,
+    # and the offset of that range.
+    ranges = [(offset, offset + counts.shape[-1]) for counts, offset in stores
+              if counts.shape[-1]]
+    if not ranges:
+        return [counts for counts, offset in stores], 0
+    highest = max(stop for start, stop in ranges)
+    lowest = max(min(start for start, stop in ranges), highest - max_buckets)
+    aligned = []
+    for counts, offset in stores:
+        result = numpy.zeros(counts.shape[:-1] + (highest - lowest,), dtype=counts.dtype)
+        stop = offset + counts.shape[-1] - lowest
+        if stop > 0:
+            start = max(offset, lowest)
+            result[..., start - lowest:stop] = counts[..., start - offset:]
+        if offset < lowest:
+            result[..., 0] += counts[..., :lowest - offset].sum(axis=-1)
+        aligned.append(result)
+    return aligned, lowest
+
+
+def _sketch_quantile_partial(data, axis, accuracy, max_buckets, **kwargs):
+    zeros, negative, positive = _sketch_partial(data, axis, numpy.zeros(data.shape[axis], dtype=int),
+                                                1, accuracy, max_buckets)
+    return (zeros[..., 0],
+            (negative[0][..., 0, :], negative[1]),
+            (positive[0][..., 0, :], positive[1]),
+            max_buckets)
+
+
+def _sketch_quantile_group_partial(data, axis, starts, accuracy, max_buckets, **kwargs):
+    sizes = numpy.diff(numpy.append(starts, data.shape[axis]))
+    labels = numpy.repeat(numpy.arange(len(starts)), sizes)
+    zeros, negative, positive = _sketch_partial(data, axis, labels, len(starts), accuracy,
+                                                max_buckets)
+    # Restore the axis of the groups to that of the data.
+    return (numpy.rollaxis(zeros, zeros.ndim - 1, axis),
+            (numpy.rollaxis(negative[0], negative[0].ndim - 2, axis), negative[1]),
+            (numpy.rollaxis(positive[0], positive[0].ndim - 2, axis), positive[1]),
+            max_buckets)
+
+
+def _sketch_quantile_combine(state, other):
+    max_buckets = state[3]
+    (negative, other_negative), negative_offset = _sketch_align([state[1], other[1]], max_buckets)
+    (positive, other_positive), positive_offset = _sketch_align([state[2], other[2]], max_buckets)
+    return (state[0] + other[0],
+            (negative + other_negative, negative_offset),
+            (positive + other_positive, positive_offset),
+            max_buckets)
+
+
+def _sketch_quantile_concatenate(states):
+    max_buckets = states[0][3]
+    negative, negative_offset = _sketch_align([state[1] for state in states], max_buckets)
+    positive, positive_offset = _sketch_align([state[2] for state in states], max_buckets)
+    return (numpy.concatenate([state[0] for state in states]),
+            (numpy.concatenate(negative), negative_offset),
+            (numpy.concatenate(positive), positive_offset),
+            max_buckets)
+
+
+def _sketch_quantile_finalise(state, percent, accuracy, **kwargs):
+    zeros, (negative, negative_offset), (positive, positive_offset), max_buckets = state
+    gamma = _sketch_gamma(accuracy)
+
+    # The counts of the buckets, and the value which best represents each
+    # bucket, in increasing order of value.
+    counts = numpy.concatenate([negative[..., ::-1], zeros[..., numpy.newaxis], positive], axis=-1)
+    negative_keys = numpy.arange(negative_offset, negative_offset + negative.shape[-1])
+    positive_keys = numpy.arange(positive_offset, positive_offset + positive.shape[-1])
+    values = numpy.concatenate([-2 * gamma ** negative_keys[::-1] / (gamma + 1), [0],
+                                2 * gamma ** positive_keys / (gamma + 1)])
+
+    # Interpolate between the values of the ranks either side of the
+    # percentile, as numpy.percentile does.
+    total = counts.sum(axis=-1)
+    rank = numpy.maximum(total - 1, 0) * (percent / 100)
+    lower = numpy.floor(rank)
+    cumulative = numpy.cumsum(counts, axis=-1)
+    lower_index = numpy.minimum((cumulative <= lower[..., numpy.newaxis]).sum(axis=-1),
+                                len(values) - 1)
+    upper_index = numpy.minimum((cumulative <= numpy.ceil(rank)[..., numpy.newaxis]).sum(axis=-1),
+                                len(values) - 1)
+    result = values[lower_index] + (values[upper_index] - values[lower_index]) * (rank - lower)
+    return _masked_result(numpy.ma.masked_where(total == 0, result))
+
+
+def _approx_percentile(data, axis, percent, accuracy, max_buckets, **kwargs):
+    state = _sketch_quantile_partial(data, axis, accuracy, max_buckets)
+    return _sketch_quantile_finalise(state, percent, accuracy)
+
+
 def _percentile(data, axis, percent, **kwargs):
     # NB. scipy.stats.mstats.scoreatpercentile always works across just the first
     # dimension of its input data, and  returns a result that has one fewer
@@ -464,6 +1172,69 @@ def _rms(array, axis, **kwargs):
 #
 # Common partial Aggregation class constructors.
 #
+APPROX_MEDIAN = Aggregator('Approximate median of {standard_name:s} {action:s} {coord_names:s}',
+                           'median',
+                           _approx_percentile,
+                           percent=50,
+                           accuracy=0.01,
+                           max_buckets=1024)
+"""
+An approximate median, as for :const:`APPROX_PERCENTILE` with a percent of 50.
+
+For example, to compute an approximate ensemble median::
+
+    result = cube.collapsed('realization', iris.analysis.APPROX_MEDIAN)
+
+"""
+
+
+APPROX_PERCENTILE = Aggregator('Approximate percentile ({percent}%) of {standard_name:s} {action:s} {coord_names:s}',
+                               'percentile ({percent}%)',
+                               _approx_percentile,
+                               accuracy=0.01,
+                               max_buckets=1024)
+"""
+An approximate percentile, from a mergeable sketch of the distribution of
+the values at each point, which counts the values in buckets of
+logarithmically increasing magnitude (the DDSketch of Masson et al.).
+
+Unlike :const:`PERCENTILE`, the sketches of parts of the data can be
+combined, so a deferred cube is collapsed a chunk at a time and the groups
+of :meth:`iris.cube.Cube.aggregated_by` are sketched together, without a
+sort of the values at each point.
+
+The result is interpolated between the values of the ranks either side of
+the percentile, each of which is estimated within the relative accuracy.
+Masked and non-finite values are ignored.
+
+Required kwargs:
+
+* percent:
+    Percentile rank at which to extract value. No default.
+
+Additional kwargs available:
+
+* accuracy:
+    The relative accuracy of the estimate of each value. The number of
+    buckets of the sketch of each point grows with the logarithm of the
+    ratio of the largest to the smallest magnitude in the data, divided by
+    the accuracy. Defaults to 0.01.
+* max_buckets:
+    The most buckets of positive, and of negative, values in the sketch of
+    each point, which bounds its memory. Beyond this, the buckets of the
+    smallest magnitudes are merged, so that values very much closer to zero
+    than the largest magnitude in the data lose their accuracy. At the
+    default accuracy, the default of 1024 covers magnitudes within a factor
+    of almost 10**9 of the largest. A finer accuracy needs proportionally
+    more buckets to cover the same range.
+
+For example, to compute an approximate 90th percentile over an ensemble::
+
+    result = cube.collapsed('realization', iris.analysis.APPROX_PERCENTILE, percent=90)
+
+"""
+
+
 COUNT = Aggregator('Count of {standard_name:s} {action:s} {coord_names:s}',
                                        'count',
                                        _count)
@@ -539,7 +1310,8 @@ For example, to compute zonal means::
 Additional kwargs available:
 
 * weights
-    Optional array of floats. If supplied, the shape must match the cube.
+    Optional array of floats. If supplied, the shape must match the cube, or
+    have a length of one in the dimensions the weights do not vary over.
 
     LatLon area weights can be calculated using :func:`iris.analysis.cartography.area_weights`.
 * returned
@@ -708,6 +1480,33 @@ For example, to obtain the biased variance::
 """
 
 
+# Decompose the aggregations which may be performed a chunk of the data
+# at a time.
+APPROX_MEDIAN.decomposition = _Decomposition(_sketch_quantile_partial, _sketch_quantile_combine,
+                                             _sketch_quantile_finalise,
+                                             _sketch_quantile_group_partial,
+                                             concatenate=_sketch_quantile_concatenate)
+APPROX_PERCENTILE.decomposition = APPROX_MEDIAN.decomposition
+COUNT.decomposition = _Decomposition(_count_partial, _add_partials, _sum_finalise,
+                                     _count_group_partial, _count_rolling_partial)
+MAX.decomposition = _extreme_decomposition(numpy.ma.max, numpy.maximum,
+                                           numpy.ma.maximum_fill_value)
+MEAN.decomposition = _Decomposition(_mean_partial, _add_partials, _mean_finalise,
+                                    _mean_group_partial, _mean_rolling_partial)
+MIN.decomposition = _extreme_decomposition(numpy.ma.min, numpy.minimum,
+                                           numpy.ma.minimum_fill_value)
+RMS.decomposition = _Decomposition(_rms_partial, _add_partials, _rms_finalise,
+                                   _rms_group_partial, _rms_rolling_partial)
+STD_DEV.decomposition = _Decomposition(_variance_partial, _variance_combine, _std_dev_finalise,
+                                       _variance_group_partial,
+                                       concatenate=_variance_concatenate)
+SUM.decomposition = _Decomposition(_sum_partial, _add_partials, _sum_finalise,
+                                   _sum_group_partial, _sum_rolling_partial)
+VARIANCE.decomposition = _Decomposition(_variance_partial, _variance_combine, _variance_finalise,
+                                        _variance_group_partial,
+                                        concatenate=_variance_concatenate)
+
+
 class _Groupby(object):
     """
     Convenience class to determine group slices over one or more group-by coordinates.
@@ -230,11 +230,26 @@ def _quadrant_area(radian_colat_bounds, radian_lon_bounds, radius_of_earth):
     return numpy.abs(areas)
 
 
+def _broadcastable_weights(weights, cube, dims):
+    # Reshape weights over the given dimensions of the cube to the
+    # dimensionality of the cube, with a length of one in its other
+    # dimensions, so that they broadcast over the cube without being
+    # expanded to its shape.
+    shape = [1] * cube.ndim
+    for dim in dims:
+        if dim is not None:
+            shape[dim] = cube.shape[dim]
+    return weights.reshape(shape)
+
+
 def area_weights(cube):
     """
-    Returns an array of area weights, with the same dimensions as the cube.
+    Returns an array of area weights, with the same dimensionality as the cube.
     
-    This is a 2D lat/lon area weights array, repeated over the non lat/lon dimensions.
+    This is a 2D lat/lon area weights array, with a length of one in the non lat/lon
+    dimensions, which broadcasts over them. The weights may be passed directly to a
+    weighted aggregator such as :data:`iris.analysis.MEAN`, and can be expanded to
+    the shape of the cube with :func:`iris.util.broadcast_weights` if required.
     
     The cube must have coordinates 'latitude' and 'longitude' with contiguous bounds.
     
@@ -305,21 +320,17 @@ def area_weights(cube):
     if lon_dim < lat_dim:
         ll_weights = ll_weights.transpose()
 
-    # Now we create an array of weights for each cell.
-    broad_weights = iris.util.broadcast_weights(ll_weights,
-                                                cube.data,
-                                                (lat_dim, lon_dim))
-
-    return broad_weights
+    # Now we create an array of weights which broadcasts over the cube.
+    return _broadcastable_weights(ll_weights, cube, (lat_dim, lon_dim))
 
 
 def cosine_latitude_weights(cube):
     """
-    Returns an array of latitude weights, with the same dimensions as
+    Returns an array of latitude weights, with the same dimensionality as
     the cube. The weights are the cosine of latitude.
 
-    This is a 1D latitude weights array, repeated over the non-latitude
-    dimensions.
+    This is a 1D latitude weights array, with a length of one in the
+    non-latitude dimensions, which broadcasts over them.
 
     The cube must have a coordinate with 'latitude' in the name. Out of
     range values (greater than 90 degrees or less than -90 degrees) will
@@ -382,12 +393,8 @@ def cosine_latitude_weights(cube):
                       UserWarning)
     l_weights = numpy.cos(lat.points).clip(0., 1.)
 
-    # Create weights for each grid point.
-    broad_weights = iris.util.broadcast_weights(l_weights,
-                                                cube.data,
-                                                (lat_dim,))
-
-    return broad_weights
+    # Create weights which broadcast over the cube.
+    return _broadcastable_weights(l_weights, cube, (lat_dim,))
 
 
 def project(cube, target_proj, nx=None, ny=None):
@@ -34,7 +34,8 @@ def geometry_area_weights(cube, geometry):
     Returns the array of weights corresponding to the area of overlap between
     the cells of cube's horizontal grid, and the given shapely geometry.
     
-    The returned array is suitable for use with :const:`iris.analysis.MEAN`.
+    The returned array has a length of one in the non-horizontal dimensions of
+    the cube, and is suitable for use with :const:`iris.analysis.MEAN`.
     
     The cube must have bounded horizontal coordinates.
     
@@ -90,8 +91,4 @@ def geometry_area_weights(cube, geometry):
         polygon = Polygon([(x0, y0), (x0, y1), (x1, y1), (x1, y0)])
         weights[nd_index] = polygon.intersection(geometry).area
 
-    # Fix for the limitation of iris.analysis.MEAN weights handling.
-    # Broadcast the array to the full shape of the cube
-    weights = numpy.broadcast_arrays(weights, cube.data)[0]
-
     return weights
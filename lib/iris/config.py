@@ -41,6 +41,19 @@ def get_option(section, option, default=None):
     return value
 
 
+# Returns boolean options
+def get_bool_option(section, option, default=False):
+    """
+    Returns the boolean option value for the given section, or the default
+    value if the section/option is not present.
+
+    """
+    value = default
+    if config.has_option(section, option):
+        value = config.getboolean(section, option)
+    return value
+
+
 # Returns directory path options
 def get_dir_option(section, option, default=None):
     """
@@ -119,3 +132,51 @@ RULE_LOG_IGNORE = get_option(_LOGGING_SECTION, 'rule_ignore')
 
 IMPORT_LOGGER = get_option(_LOGGING_SECTION, 'import_logger')
 """The [optional] name of the logger to notify when first imported."""
+
+
+#################
+# Loading options
+_LOADING_SECTION = 'Loading'
+
+
+PP_MEMMAP = get_bool_option(_LOADING_SECTION, 'pp_memmap')
+"""Whether the payloads of unpacked PP and FF fields are accessed through a
+shared, read-only memory-map of their file, rather than read in full each
+time they are loaded."""
+
+
+PP_MAX_MEMMAPS = int(get_option(_LOADING_SECTION, 'pp_max_memmaps', 8))
+"""The maximum number of PP and FF files whose memory-maps are held, for
+re-use by successive loads of deferred data from them, when
+:data:`PP_MEMMAP` is set. Zero maps the file afresh for each load."""
+
+
+LOAD_WORKERS = int(get_option(_LOADING_SECTION, 'workers', 0))
+"""The number of workers used to decode the payloads of deferred data
+concurrently when it is loaded. Values less than two load serially."""
+
+
+LOAD_POOL = get_option(_LOADING_SECTION, 'pool', 'thread')
+"""The kind of worker pool used when :data:`LOAD_WORKERS` is two or more,
+either 'thread' or 'process'."""
+
+
+FILE_WORKERS = int(get_option(_LOADING_SECTION, 'file_workers', 0))
+"""The number of worker processes used to convert the fields of several PP or
+GRIB files to cubes concurrently. The cubes are gathered, and their
+references between files resolved, in the loading process. The load rules
+are not thread-safe, so the workers are always processes, whatever the
+:data:`LOAD_POOL`. The load callback and constraints must be picklable,
+otherwise the files are loaded serially. Values less than two load
+serially."""
+
+
+PP_INDEX_DIR = get_dir_option(_LOADING_SECTION, 'pp_index_dir')
+"""The [optional] directory of the persistent header indexes of PP files,
+which allow reloads of unchanged files to skip scanning their headers."""
+
+
+NETCDF_MAX_OPEN = int(get_option(_LOADING_SECTION, 'netcdf_max_open', 8))
+"""The maximum number of netCDF files which are held open, for re-use by
+successive loads of deferred data from them. Zero closes each file as soon
+as its data has been read."""
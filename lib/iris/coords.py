@@ -21,7 +21,7 @@ Definitions of coordinates.
 from __future__ import division
 
 from abc import ABCMeta, abstractmethod, abstractproperty
-from copy import deepcopy
+from copy import copy, deepcopy
 import collections
 from itertools import izip, chain, izip_longest
 import operator
@@ -374,6 +374,14 @@ class Coord(CFVariableMixin):
             
         return new_coord
 
+    def _shared_copy(self):
+        """
+        Returns a copy of this coordinate for another cube, which may share
+        any of its state that cannot be changed in place.
+
+        """
+        return self.copy()
+
     @abstractproperty
     def points(self):
         """Property containing the points values as a numpy array"""
@@ -978,6 +986,13 @@ class DimCoord(Coord):
         coord.circular = False
         return coord
     
+    def _shared_copy(self):
+        # The points and bounds are read-only, so they are shared with the
+        # copy, along with its units and coordinate system.
+        new_coord = copy(self)
+        new_coord.attributes = self.attributes.copy()
+        return new_coord
+
     def _format_metadata(self):
         result = Coord._format_metadata(self)
         if self.circular:
@@ -282,11 +282,15 @@ class CubeList(list):
             duplicate cubes are detected.
 
         """
-        # Register each of our cubes with its appropriate ProtoCube.
+        # Register each of our cubes with its appropriate ProtoCube, which
+        # is found by the keys of the cube, rather than by trying each of
+        # the ProtoCubes in turn.
         proto_cubes_by_name = {}
+        proto_cubes_by_key = {}
+        proto_cubes_by_type_key_by_group_key = {}
         for cube in self:
-            name = cube.standard_name
-            proto_cubes = proto_cubes_by_name.setdefault(name, [])
+            group_key, type_key, key = iris._merge.merge_keys(cube)
+            proto_cubes = proto_cubes_by_key.setdefault(key, [])
             proto_cube = None
 
             for target_proto_cube in proto_cubes:
@@ -295,7 +299,25 @@ class CubeList(list):
                     break
 
             if proto_cube is None:
-                proto_cube = iris._merge.ProtoCube(cube)
+                proto_cubes_by_type_key = \
+                    proto_cubes_by_type_key_by_group_key.setdefault(group_key, {})
+                # Attribute values may equal values of other types, so try
+                # the ProtoCubes whose attribute values are of other types.
+                for other_type_key, others in proto_cubes_by_type_key.iteritems():
+                    if other_type_key != type_key:
+                        for target_proto_cube in others:
+                            if target_proto_cube.register(cube):
+                                proto_cube = target_proto_cube
+                                break
+                    if proto_cube is not None:
+                        break
+
+                if proto_cube is None:
+                    proto_cube = iris._merge.ProtoCube(cube)
+                    proto_cubes_by_name.setdefault(cube.standard_name,
+                                                   []).append(proto_cube)
+                    proto_cubes_by_type_key.setdefault(type_key,
+                                                       []).append(proto_cube)
                 proto_cubes.append(proto_cube)
 
         # Extract all the merged cubes from the ProtoCubes.
@@ -1776,6 +1798,10 @@ class Cube(CFVariableMixin):
         Returns:
             Collapsed cube.
 
+        When the data of the cube has not yet been loaded and the aggregator has a
+        :attr:`~iris.analysis.Aggregator.decomposition`, the data is aggregated a
+        single index of the outermost dimension at a time, rather than loaded in full.
+
         For example:
 
             >>> import iris
@@ -1847,20 +1873,57 @@ class Cube(CFVariableMixin):
                 local_dims = [coord_dims.index(dim) for dim in dimensions_to_collapse if dim in coord_dims]
                 collapsed_cube.replace_coord(coord.collapsed(local_dims))
 
+        # Weights need only be broadcastable to the cube. Expand them over just the dimensions
+        # being collapsed, as these are flattened together below.
+        weights = kwargs.get("weights")
+        if weights is not None:
+            weights = self._broadcastable_weights(weights)
+            if any(weights.shape[dim] != self.shape[dim] for dim in dimensions_to_collapse):
+                shape = [self.shape[dim] if dim in dimensions_to_collapse else 1 for dim in range(self.ndim)]
+                weights = weights * numpy.ones(shape, dtype=weights.dtype)
+            kwargs["weights"] = weights
+
         # Perform the aggregation over the cube data
-        # First reshape the data so that the dimensions being aggregated over are grouped 'at the end'.
-        new_shape = [self.shape[dim] for dim in sorted(untouched_dimensions)] + [reduce(operator.mul, (self.shape[dim] for dim in dimensions_to_collapse))]
-        unrolled_data = numpy.transpose(self.data, sorted(untouched_dimensions) + sorted(dimensions_to_collapse)).reshape(new_shape)
-        # Perform the same operation on the weights if applicable
-        if kwargs.get("weights") is not None:
-            weights = kwargs["weights"].view() 
-            kwargs["weights"] = numpy.transpose(weights, sorted(untouched_dimensions) + sorted(dimensions_to_collapse)).reshape(new_shape)
-
-        data_result = aggregator.aggregate(unrolled_data, axis=-1, **kwargs)
+        def unroll(array):
+            # Reshape the array so that the dimensions being aggregated over are grouped 'at the end'.
+            new_shape = [array.shape[dim] for dim in sorted(untouched_dimensions)] + [reduce(operator.mul, (array.shape[dim] for dim in dimensions_to_collapse))]
+            return numpy.transpose(array, sorted(untouched_dimensions) + sorted(dimensions_to_collapse)).reshape(new_shape)
+
+        if self._data_manager is not None and self._data.ndim and aggregator.decomposition is not None:
+            # Aggregate the deferred data a single index of the outermost dimension at a time,
+            # so that only that part of the data need be held in memory at once.
+            def chunks():
+                for index in xrange(self.shape[0]):
+                    keys = (slice(index, index + 1),)
+                    proxy_array, data_manager = self._data_manager.getitem(self._data, keys)
+                    chunk_weights = None
+                    if weights is not None:
+                        chunk_weights = unroll(weights[keys] if weights.shape[0] > 1 else weights)
+                    yield unroll(data_manager.load(proxy_array)), chunk_weights
+
+            # Chunks of an outermost dimension which is not collapsed are consecutive parts of the result.
+            data_result = aggregator.aggregate_chunks(chunks(), axis=-1, concatenate=0 not in dimensions_to_collapse, **kwargs)
+        else:
+            unrolled_data = unroll(self.data)
+            # Perform the same operation on the weights if applicable
+            if kwargs.get("weights") is not None:
+                kwargs["weights"] = unroll(kwargs["weights"].view())
+
+            data_result = aggregator.aggregate(unrolled_data, axis=-1, **kwargs)
+
         aggregator.update_metadata(collapsed_cube, coords, axis=-1, **kwargs)
         result = aggregator.post_process(collapsed_cube, data_result, **kwargs)
         return result
 
+    def _broadcastable_weights(self, weights):
+        # The weights of an aggregation as an array with the dimensionality of the cube, each
+        # dimension of which either has the length of that of the cube, or is broadcast over it.
+        weights = numpy.asanyarray(weights)
+        if weights.ndim != self.ndim or \
+                any(length not in (1, cube_length) for length, cube_length in zip(weights.shape, self.shape)):
+            raise ValueError('Invalid Aggregation, the weights must be broadcastable to the shape of the cube.')
+        return weights
+
     def aggregated_by(self, coords, aggregator, **kwargs):
         """
         Perform aggregation over the cube given one or more "group coordinates".
@@ -1951,27 +2014,8 @@ class Cube(CFVariableMixin):
         for coord in groupby_coords + shared_coords:
             aggregateby_cube.remove_coord(coord) 
         
-        # Determine the group-by cube data shape.
-        data_shape = list(self.shape)
-        data_shape[dimension_to_groupby] = len(groupby)
-
-        # Aggregate the group-by data.
-        cube_slice = [slice(None, None)] * len(data_shape)
-
-        for i, groupby_slice in enumerate(groupby.group()):
-            # Slice the cube with the group-by slice to create a group-by sub-cube.
-            cube_slice[dimension_to_groupby] = groupby_slice
-            groupby_sub_cube = self[tuple(cube_slice)]
-            # Perform the aggregation over the group-by sub-cube and
-            # repatriate the aggregated data into the aggregate-by cube data.
-            cube_slice[dimension_to_groupby] = i
-            # Determine aggregation result data type for the aggregate-by cube data on first pass.
-            if i == 0:
-                result = aggregator.aggregate(groupby_sub_cube.data, axis=dimension_to_groupby, **kwargs)
-                aggregateby_data = numpy.zeros(data_shape, dtype=result.dtype)
-                aggregateby_data[tuple(cube_slice)] = result
-            else:
-                aggregateby_data[tuple(cube_slice)] = aggregator.aggregate(groupby_sub_cube.data, axis=dimension_to_groupby, **kwargs)
+        # Aggregate the group-by data over all of the groups together.
+        aggregateby_data = aggregator.aggregate_groups(self.data, dimension_to_groupby, list(groupby.group()), **kwargs)
 
         # Add the aggregation meta data to the aggregate-by cube.
         aggregator.update_metadata(aggregateby_cube, groupby_coords, aggregate=True, **kwargs)
@@ -1999,11 +2043,16 @@ class Cube(CFVariableMixin):
         Kwargs:
 
         * kwargs:
-            Aggregator and aggregation function keyword arguments.
+            Aggregator and aggregation function keyword arguments. The weights of
+            a weighted aggregation must be broadcastable to the shape of the cube.
 
         Returns:
             :class:`iris.cube.Cube`.
 
+        Aggregators with a :attr:`~iris.analysis.Aggregator.decomposition`, such as
+        MEAN, SUM, COUNT, RMS, MIN and MAX, aggregate all of the windows in a single
+        pass of the data, whatever the window size.
+
         For example:
 
             >>> import iris, iris.analysis
@@ -2050,9 +2099,11 @@ class Cube(CFVariableMixin):
             Notice that the forecast_period dimension now represents the 4 possible windows of size 3 from the original cube. 
 
         """
-        # We can't handle weights
-        if isinstance(aggregator, iris.analysis.WeightedAggregator) and aggregator.uses_weighting(**kwargs):
-            raise ValueError('Invalid Aggregation, rolling_window() cannot use weights.')
+        # We can't return the weights of the windows.
+        if kwargs.get('returned', False):
+            raise ValueError('Invalid Aggregation, rolling_window() cannot return weights.')
+        if kwargs.get('weights') is not None:
+            kwargs['weights'] = self._broadcastable_weights(kwargs['weights'])
 
         coord = self._as_list_of_coords(coord)[0]
 
@@ -2081,11 +2132,6 @@ class Cube(CFVariableMixin):
         key[dimension] = slice(None, self.shape[dimension] - window + 1)
         new_cube = self[tuple(key)]
 
-        # take a view of the original data using the rolling_window function
-        # this will add an extra dimension to the data at dimension + 1 which represents the rolled window (i.e. will
-        # have a length of window)
-        rolling_window_data = iris.util.rolling_window(self.data, window=window, axis=dimension)
-
         # now update all of the coordinates to reflect the aggregation
         for coord_ in self.coords(dimensions=dimension):
             if coord_.has_bounds():
@@ -2110,7 +2156,7 @@ class Cube(CFVariableMixin):
         # update the metadata of the cube itself
         aggregator.update_metadata(new_cube, [coord], action='with a rolling window of length %s over' % window, **kwargs)
         # and perform the data transformation
-        new_cube.data = aggregator.aggregate(rolling_window_data, axis=dimension + 1)
+        new_cube.data = aggregator.aggregate_rolling(self.data, dimension, window, **kwargs)
 
         return new_cube
     
@@ -51,7 +51,8 @@ FORMAT_AGENT.add_spec(FormatSpec('UM Post Processing file (PP)',
                                  fp.MAGIC_NUMBER_32_BIT,
                                  0x00000100,
                                  pp.load_cubes,
-                                 priority=5))
+                                 priority=5,
+                                 constraint_aware=True))
 
 
 FORMAT_AGENT.add_spec(FormatSpec('UM Post Processing file (PP) little-endian',
@@ -103,21 +104,24 @@ FORMAT_AGENT.add_spec(FormatSpec('UM Fieldsfile (FF) pre v3.1',
                                  fp.MAGIC_NUMBER_64_BIT,
                                  0x000000000000000F,
                                  ff.load_cubes,
-                                 priority=4))
+                                 priority=4,
+                                 constraint_aware=True))
 
 
 FORMAT_AGENT.add_spec(FormatSpec('UM Fieldsfile (FF) post v5.2',
                                  fp.MAGIC_NUMBER_64_BIT,
                                  0x0000000000000014,
                                  ff.load_cubes,
-                                 priority=4))
+                                 priority=4,
+                                 constraint_aware=True))
 
 
 FORMAT_AGENT.add_spec(FormatSpec('UM Fieldsfile (FF) ancillary',
                                  fp.MAGIC_NUMBER_64_BIT,
                                  0xFFFFFFFFFFFF8000,
                                  ff.load_cubes,
-                                 priority=4))
+                                 priority=4,
+                                 constraint_aware=True))
 
 #
 # NIMROD files.
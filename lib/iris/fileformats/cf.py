@@ -26,6 +26,7 @@ References:
 """
 
 from abc import ABCMeta, abstractmethod
+import collections
 import os
 import re
 import UserDict
@@ -218,7 +219,6 @@ class CFAncillaryDataVariable(CFVariable):
     def identify(cls, variables, ignore=None, target=None, warn=True):
         result = {}
         ignore, target = cls._identify_common(variables, ignore, target)
-        netcdf_variable_names = variables.keys()
 
         # Identify all CF ancillary data variables.
         for nc_var_name, nc_var in target.iteritems():
@@ -228,7 +228,7 @@ class CFAncillaryDataVariable(CFVariable):
             if nc_var_att is not None:
                 for name in nc_var_att.split():
                     if name not in ignore:
-                        if name not in netcdf_variable_names:
+                        if name not in variables:
                             if warn:
                                 message = 'Missing CF-netCDF ancillary data variable %r, referenced by netCDF variable %r'
                                 warnings.warn(message % (name, nc_var_name))
@@ -259,7 +259,6 @@ class CFAuxiliaryCoordinateVariable(CFVariable):
     def identify(cls, variables, ignore=None, target=None, warn=True):
         result = {}
         ignore, target = cls._identify_common(variables, ignore, target)
-        netcdf_variable_names = variables.keys()
 
         # Identify all CF auxiliary coordinate variables.
         for nc_var_name, nc_var in target.iteritems():
@@ -269,7 +268,7 @@ class CFAuxiliaryCoordinateVariable(CFVariable):
             if nc_var_att is not None:
                 for name in nc_var_att.split():
                     if name not in ignore:
-                        if name not in netcdf_variable_names:
+                        if name not in variables:
                             if warn:
                                 message = 'Missing CF-netCDF auxiliary coordinate variable %r, referenced by netCDF variable %r'
                                 warnings.warn(message % (name, nc_var_name))
@@ -302,7 +301,6 @@ class CFBoundaryVariable(CFVariable):
     def identify(cls, variables, ignore=None, target=None, warn=True):
         result = {}
         ignore, target = cls._identify_common(variables, ignore, target)
-        netcdf_variable_names = variables.keys()
 
         # Identify all CF boundary variables.
         for nc_var_name, nc_var in target.iteritems():
@@ -313,7 +311,7 @@ class CFBoundaryVariable(CFVariable):
                 name = nc_var_att.strip()
 
                 if name not in ignore:
-                    if name not in netcdf_variable_names:
+                    if name not in variables:
                         if warn:
                             message = 'Missing CF-netCDF boundary variable %r, referenced by netCDF variable %r'
                             warnings.warn(message % (name, nc_var_name))
@@ -344,7 +342,6 @@ class CFClimatologyVariable(CFVariable):
     def identify(cls, variables, ignore=None, target=None, warn=True):
         result = {}
         ignore, target = cls._identify_common(variables, ignore, target)
-        netcdf_variable_names = variables.keys()
 
         # Identify all CF climatology variables.
         for nc_var_name, nc_var in target.iteritems():
@@ -355,7 +352,7 @@ class CFClimatologyVariable(CFVariable):
                 name = nc_var_att.strip()
 
                 if name not in ignore:
-                    if name not in netcdf_variable_names:
+                    if name not in variables:
                         if warn:
                             message = 'Missing CF-netCDF climatology variable %r, referenced by netCDF variable %r'
                             warnings.warn(message % (name, nc_var_name))
@@ -442,7 +439,6 @@ class _CFFormulaTermsVariable(CFVariable):
     def identify(cls, variables, ignore=None, target=None, warn=True):
         result = {}
         ignore, target = cls._identify_common(variables, ignore, target)
-        netcdf_variable_names = variables.keys()
 
         # Identify all CF formula terms variables.
         for nc_var_name, nc_var in target.iteritems():
@@ -456,7 +452,7 @@ class _CFFormulaTermsVariable(CFVariable):
                     variable_name = match_group['rhs']
 
                     if variable_name not in ignore:
-                        if variable_name not in netcdf_variable_names:
+                        if variable_name not in variables:
                             if warn:
                                 message = 'Missing CF-netCDF formula term variable %r, referenced by netCDF variable %r'
                                 warnings.warn(message % (variable_name, nc_var_name))
@@ -495,7 +491,6 @@ class CFGridMappingVariable(CFVariable):
     def identify(cls, variables, ignore=None, target=None, warn=True):
         result = {}
         ignore, target = cls._identify_common(variables, ignore, target)
-        netcdf_variable_names = variables.keys()
 
         # Identify all grid mapping variables.
         for nc_var_name, nc_var in target.iteritems():
@@ -506,7 +501,7 @@ class CFGridMappingVariable(CFVariable):
                 name = nc_var_att.strip()
                 
                 if name not in ignore:
-                    if name not in netcdf_variable_names:
+                    if name not in variables:
                         if warn:
                             message = 'Missing CF-netCDF grid mapping variable %r, referenced by netCDF variable %r'
                             warnings.warn(message % (name, nc_var_name))
@@ -533,7 +528,6 @@ class CFLabelVariable(CFVariable):
     def identify(cls, variables, ignore=None, target=None, warn=True):
         result = {}
         ignore, target = cls._identify_common(variables, ignore, target)
-        netcdf_variable_names = variables.keys()
 
         # Identify all CF label variables.
         for nc_var_name, nc_var in target.iteritems():
@@ -543,7 +537,7 @@ class CFLabelVariable(CFVariable):
             if nc_var_att is not None:
                 for name in nc_var_att.split():
                     if name not in ignore:
-                        if name not in netcdf_variable_names:
+                        if name not in variables:
                             if warn:
                                 message = 'Missing CF-netCDF label variable %r, referenced by netCDF variable %r'
                                 warnings.warn(message % (name, nc_var_name))
@@ -647,7 +641,6 @@ class CFMeasureVariable(CFVariable):
     def identify(cls, variables, ignore=None, target=None, warn=True):
         result = {}
         ignore, target = cls._identify_common(variables, ignore, target)
-        netcdf_variable_names = variables.keys()
 
         # Identify all CF measure variables.
         for nc_var_name, nc_var in target.iteritems():
@@ -661,7 +654,7 @@ class CFMeasureVariable(CFVariable):
                     variable_name = match_group['rhs']
                     
                     if variable_name not in ignore:
-                        if variable_name not in netcdf_variable_names:
+                        if variable_name not in variables:
                             if warn:
                                 message = 'Missing CF-netCDF measure variable %r, referenced by netCDF variable %r'
                                 warnings.warn(message % (variable_name, nc_var_name))
@@ -817,7 +810,7 @@ class CFReader(object):
         coords = CFCoordinateVariable.identify(self._dataset.variables,
                                                monotonic=self._check_monotonic)
         self.cf_group.update(coords)
-        coordinate_names = self.cf_group.coordinates.keys()
+        coordinate_names = frozenset(self.cf_group.coordinates)
 
         # Identify all CF variables EXCEPT for the "special cases".
         for variable_type in self._variable_types:
@@ -849,19 +842,27 @@ class CFReader(object):
     def _build_cf_groups(self):
         """Build the first order relationships between CF-netCDF variables."""
         
-        coordinate_names = self.cf_group.coordinates.keys()
+        variables = self._dataset.variables
+        coordinate_names = frozenset(self.cf_group.coordinates)
+
+        # Index the variables referenced by each variable, in a single pass
+        # over the identifying attributes which each variable carries.
+        references = collections.defaultdict(set)
+        for variable_type in self._variable_types:
+            # Prevent grid mapping variables being mis-identified as
+            # CF coordinate variables.
+            ignore = None if issubclass(variable_type, CFGridMappingVariable) else coordinate_names
+            for cf_variable in self.cf_group.itervalues():
+                if variable_type.cf_identity in cf_variable._nc_attrs:
+                    match = variable_type.identify(variables, ignore=ignore,
+                                                   target=cf_variable.cf_name, warn=False)
+                    references[cf_variable.cf_name].update(match.iterkeys())
 
         for cf_variable in self.cf_group.itervalues():
             cf_group = CFGroup()
 
             # Build CF variable relationships.
-            for variable_type in self._variable_types:
-                # Prevent grid mapping variables being mis-identified as
-                # CF coordinate variables.
-                ignore = None if issubclass(variable_type, CFGridMappingVariable) else coordinate_names
-                match = variable_type.identify(self._dataset.variables, ignore=ignore,
-                                               target=cf_variable.cf_name, warn=False)
-                cf_group.update({name: self.cf_group[name] for name in match.iterkeys()})
+            cf_group.update({name: self.cf_group[name] for name in references[cf_variable.cf_name]})
 
             # Build CF data variable relationships.
             if isinstance(cf_variable, CFDataVariable):
@@ -870,12 +871,12 @@ class CFReader(object):
                 # Add appropriate "dimensioned" CF coordinate variables.
                 cf_group.update({cf_name: self.cf_group[cf_name] for cf_name
                                     in cf_variable.dimensions if cf_name in
-                                    self.cf_group.coordinates})
+                                    coordinate_names})
                 # Add appropriate "dimensionless" CF coordinate variables.
                 coordinates_attr = getattr(cf_variable, 'coordinates', '')
                 cf_group.update({cf_name: self.cf_group[cf_name] for cf_name
                                     in coordinates_attr.split() if cf_name in
-                                    self.cf_group.coordinates})
+                                    coordinate_names})
 
             # Add the CF group to the variable.
             cf_variable.cf_group = cf_group
@@ -330,7 +330,7 @@ class FF2PP(object):
         return self._extract_field()
 
 
-def load_cubes(filenames, callback):
+def load_cubes(filenames, callback, constraints=None):
     """
     Loads cubes from a list of fields files filenames.
     
@@ -342,9 +342,13 @@ def load_cubes(filenames, callback):
     
     * callback - a function which can be passed on to :func:`iris.io.run_callback`
     
+    * constraints - the load constraints, with which the fields that cannot
+      match any of them are skipped, see :func:`iris.fileformats.pp.load_cubes`
+    
     .. note:: 
         The resultant cubes may not be in the order that they are in the file (order 
         is not preserved when there is a field with orography references).
          
     """
-    return pp._load_cubes_variable_loader(filenames, callback, FF2PP)
+    return pp._load_cubes_variable_loader(filenames, callback, FF2PP,
+                                          constraints)
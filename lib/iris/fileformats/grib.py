@@ -24,6 +24,7 @@ See also: `ECMWF GRIB API <http://www.ecmwf.int/publications/manuals/grib_api/in
 import datetime
 import math  #for fmod
 import os
+import re
 import warnings
 
 import numpy
@@ -33,6 +34,8 @@ iris.proxy.apply_proxy('gribapi', globals())
 
 import iris.coords as coords
 import iris.coord_systems as coord_systems
+import iris.fileformats.manager
+import iris.fileformats.pp
 import iris.unit
 import grib_save_rules
 
@@ -41,6 +44,12 @@ import grib_save_rules
 _load_rules = None
 _cross_reference_rules = None
 
+# The names of the message keys which the load rules refer to.
+_rule_keys = None
+
+# Matches a reference to a message key in a rule, e.g. "grib.edition".
+_RULE_KEY = re.compile(r'\b(?:grib|f|field)\.([A-Za-z]\w*)')
+
 CENTRE_TITLES = {'egrr': 'U.K. Met Office - Exeter',
                  'ecmf': 'European Centre for Medium Range Weather Forecasts',
                  'rjtd': 'Tokyo, Japan Meteorological Agency',
@@ -116,6 +125,25 @@ def _ensure_load_rules_loaded():
             rule_type=iris.fileformats.rules.ObjectReturningRule)
 
 
+def _ensure_rule_keys():
+    """Returns the names of the message keys which the load rules refer to."""
+
+    # Uses this module-level variable
+    global _rule_keys
+
+    if _rule_keys is None:
+        _ensure_load_rules_loaded()
+        names = set()
+        for rule in _load_rules._rules:
+            for line in rule._conditions + rule._actions:
+                names.update(_RULE_KEY.findall(line))
+        # Leave out our own methods and the (large) message values.
+        names.discard('values')
+        _rule_keys = tuple(sorted(name for name in names
+                                  if not hasattr(GribWrapper, name)))
+    return _rule_keys
+
+
 def add_load_rules(filename):
     """
     Registers a rules file for use during the GRIB load process.
@@ -124,17 +152,22 @@ def add_load_rules(filename):
     they were registered.
     
     """
+    # Uses this module-level variable
+    global _rule_keys
+
     _ensure_load_rules_loaded()
     _load_rules.import_rules(filename)
+    _rule_keys = None
 
 
 def reset_load_rules():
     """Resets the GRIB load process to use only the standard conversion rules."""
     
-    # Uses this module-level variable
-    global _load_rules
+    # Uses these module-level variables
+    global _load_rules, _rule_keys
     
     _load_rules = None
+    _rule_keys = None
 
 
 class GribWrapper(object):
@@ -142,30 +175,57 @@ class GribWrapper(object):
     Contains a pygrib object plus some extra keys of our own.
     
     """
-    def __init__(self, grib_message):
-        """Store the grib message and compute our extra keys."""
+    def __init__(self, grib_message, grib_fh=None):
+        """
+        Store the grib message and compute our extra keys.
+
+        If the open file which the message was read from is given, the
+        message values are not decoded, but are loaded on demand from the
+        file through a :class:`GribDataProxy`.
+
+        """
         self.grib_message = grib_message
 
-        # Initialise the key-extension dictionary.
-        # NOTE: this attribute *must* exist, or the the __getattr__ overload
+        # Initialise the key-value cache and the key-extension dictionary.
+        # NOTE: these attributes *must* exist, or the the __getattr__ overload
         # can hit an infinite loop.
+        self._key_values = {}
         self.extra_keys = {}
+        self._data = None
+        self._data_manager = None
+
+        # Fetch all the keys which the load rules refer to in one pass, so
+        # that the rules are answered from the cache.
+        for key in _ensure_rule_keys():
+            self._key_values[key] = self._get_key(key)
 
         self._confirm_in_scope()
         
         self._compute_extra_keys()
 
-        #this is something pygrib did for us - reshape,
-        #but it flipped the data - which we don't want
-        ni = self.Ni
-        nj = self.Nj
-        self.data = self.values
-        j_fast = gribapi.grib_get_long(grib_message, "jPointsAreConsecutive")
-        if j_fast == 0:
-            self.data = self.data.reshape(nj, ni)
+        data_shape = _data_shape(grib_message)
+        if grib_fh is None:
+            self.data = _message_values(grib_message, data_shape)
         else:
-            self.data = self.data.reshape(ni, nj)
-            
+            # The file is positioned at the end of the message.
+            offset = grib_fh.tell() - gribapi.grib_get_message_size(grib_message)
+            self._data = numpy.array(GribDataProxy(grib_fh.name, offset))
+            self._data_manager = iris.fileformats.manager.DataManager(
+                data_shape, numpy.dtype('f8'), None)
+
+    @property
+    def data(self):
+        """The :class:`numpy.ndarray` of the values of the message."""
+        # Cache the real data on first use
+        if self._data_manager is not None:
+            self._data = self._data_manager.load(self._data)
+            self._data_manager = None
+        return self._data
+
+    @data.setter
+    def data(self, value):
+        self._data = value
+        self._data_manager = None
         
     def _confirm_in_scope(self):
         """Ensure we have a grib flavour that we choose to support."""
@@ -193,6 +253,26 @@ class GribWrapper(object):
         """Return a grib key, or one of our extra keys."""
         
         # is it in the grib message?
+        try:
+            res = self._key_values[key]
+        except KeyError:
+            res = self._get_key(key)
+            # Don't hold on to the (large) message values.
+            if key != 'values':
+                self._key_values[key] = res
+        
+        #...or is it in our list of extras?
+        if res == None:
+            if key in self.extra_keys:
+                res = self.extra_keys[key]
+            else:
+                #must raise an exception for the hasattr() mechanism to work
+                raise AttributeError("Cannot find GRIB key %s" % key)
+
+        return res
+
+    def _get_key(self, key):
+        """Return the value of a key of the grib message, or None if it is not present."""
         try:
             # we just get <type 'float'> as the type of the "values" array...special case here...
             if key in ["values", "pv"]:
@@ -213,15 +293,6 @@ class GribWrapper(object):
                     raise ValueError("Unknown type for %s : %s" % (key, str(key_type)))
         except gribapi.GribInternalError:
             res = None
-        
-        #...or is it in our list of extras?
-        if res == None:
-            if key in self.extra_keys:
-                res = self.extra_keys[key]
-            else:
-                #must raise an exception for the hasattr() mechanism to work
-                raise AttributeError("Cannot find GRIB key %s" % key)
-
         return res
 
     def _timeunit_detail(self):
@@ -524,15 +595,90 @@ class GribWrapper(object):
                 unit.date2num(self._periodEndDateTime)]
 
 
+def _data_shape(grib_message):
+    """Return the shape of the values of the given grib message."""
+    #this is something pygrib did for us - reshape,
+    #but it flipped the data - which we don't want
+    ni = gribapi.grib_get_long(grib_message, "Ni")
+    nj = gribapi.grib_get_long(grib_message, "Nj")
+    j_fast = gribapi.grib_get_long(grib_message, "jPointsAreConsecutive")
+    if j_fast == 0:
+        shape = (nj, ni)
+    else:
+        shape = (ni, nj)
+    return shape
+
+
+def _message_values(grib_message, data_shape):
+    """Return the decoded values of the given grib message, in the given shape."""
+    values = gribapi.grib_get_double_array(grib_message, "values")
+    return values.reshape(data_shape)
+
+
+class GribDataProxy(object):
+    """A reference to the data payload of a single GRIB message."""
+
+    __slots__ = ('path', 'offset')
+
+    def __init__(self, path, offset):
+        self.path = path
+        self.offset = offset
+
+    # NOTE: Pickle cannot use an object dictionary, due to the __slots__.
+    def __getstate__(self):
+        return dict([(k, getattr(self, k)) for k in GribDataProxy.__slots__])
+
+    def __setstate__(self, state):
+        for key, val in state.items():
+            setattr(self, key, val)
+
+    def __repr__(self):
+        return '%s(%r, %r)' % (self.__class__.__name__, self.path, self.offset)
+
+    def load(self, data_shape, data_type, mdi, deferred_slice):
+        """
+        Load the corresponding proxy data item and perform any deferred slicing.
+        
+        Args:
+        
+        * data_shape (tuple of int):
+            The data shape of the proxy data item.
+        * data_type (:class:`numpy.dtype`):
+            The data type of the proxy data item.
+        * mdi (float):
+            The missing data indicator value.
+        * deferred_slice (tuple):
+            The deferred slice to be applied to the proxy data item.
+        
+        Returns:
+            :class:`numpy.ndarray`
+        
+        """
+        with open(self.path, 'rb') as grib_fh:
+            grib_fh.seek(self.offset, os.SEEK_SET)
+            grib_message = gribapi.grib_new_from_file(grib_fh)
+            try:
+                data = _message_values(grib_message, data_shape)
+            finally:
+                gribapi.grib_release(grib_message)
+        return iris.fileformats.pp._apply_deferred_slice(data, deferred_slice)
+
+
 def grib_generator(filename):
-    """Returns a generator of GribWrapper fields from the given filename."""
+    """
+    Returns a generator of GribWrapper fields from the given filename.
+
+    The values of each message are not decoded until the data of the field
+    is used.
+
+    """
     with open(filename, 'rb') as grib_file:
         while True:
             grib_message = gribapi.grib_new_from_file(grib_file)
             if grib_message is None:
                 break
 
-            grib_wrapper = GribWrapper(grib_message)
+            grib_wrapper = GribWrapper(grib_message, grib_file)
 
             yield grib_wrapper
 
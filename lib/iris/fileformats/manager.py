@@ -19,12 +19,16 @@ Provides support for virtual cube data and deferred loading.
 
 """
 
+import collections
 from copy import deepcopy
+import multiprocessing
+import multiprocessing.pool
 import types
 
 import numpy
 import numpy.ma
 
+import iris.config
 import iris.util
 
 
@@ -241,6 +245,43 @@ class DataManager(iris.util._OrderedHashable):
         
         return tuple(merged_slice)
 
+    def _load_payloads(self, proxy_array, deferred_slice):
+        """
+        Generate the (index, payload) pairs for each of the proxies in the
+        given proxy array.
+
+        Proxies whose class provides a ``load_batch`` class method are loaded
+        together through that method, which allows the proxy class to share
+        and order the work, e.g. by reading each file in a single pass.
+
+        """
+        batches = collections.OrderedDict()
+        for index, proxy in numpy.ndenumerate(proxy_array):
+            if proxy not in [None, 0]:  # 0 can come from slicing masked proxy; numpy.array(masked_constant).
+                batches.setdefault(type(proxy), []).append((index, proxy))
+
+        # Only bother with the worker pool when there is more than one payload.
+        pool = None
+        if sum(len(indexed_proxies) for indexed_proxies in batches.itervalues()) > 1:
+            pool = _worker_pool()
+
+        for proxy_type, indexed_proxies in batches.iteritems():
+            load_batch = getattr(proxy_type, 'load_batch', None)
+            if load_batch is not None:
+                for index, payload in load_batch(indexed_proxies, self._orig_data_shape,
+                                                 self.data_type, self.mdi, deferred_slice,
+                                                 pool=pool):
+                    yield index, payload
+            elif pool is not None:
+                tasks = [(index, proxy, self._orig_data_shape, self.data_type,
+                          self.mdi, deferred_slice) for index, proxy in indexed_proxies]
+                for index, payload in pool.imap_unordered(_load_proxy, tasks):
+                    yield index, payload
+            else:
+                for index, proxy in indexed_proxies:
+                    yield index, proxy.load(self._orig_data_shape, self.data_type,
+                                            self.mdi, deferred_slice)
+
     def load(self, proxy_array):
         """Returns the real data array that corresponds to the given array of proxies."""
         
@@ -260,16 +301,13 @@ class DataManager(iris.util._OrderedHashable):
                     ' memory. Consider using indexing to select a subset of'
                     ' the Cube.'.format(array_shape))
 
-        for index, proxy in numpy.ndenumerate(proxy_array):
-            if proxy not in [None, 0]:  # 0 can come from slicing masked proxy; numpy.array(masked_constant).
-                payload = proxy.load(self._orig_data_shape, self.data_type, self.mdi, deferred_slice)
-
-                # Explicitly set the data fill value when no mdi value has been specified
-                # in order to override default masked array fill value behaviour.
-                if self.mdi is None and numpy.ma.isMaskedArray(payload):
-                    data.fill_value = payload.fill_value
+        for index, payload in self._load_payloads(proxy_array, deferred_slice):
+            # Explicitly set the data fill value when no mdi value has been specified
+            # in order to override default masked array fill value behaviour.
+            if self.mdi is None and numpy.ma.isMaskedArray(payload):
+                data.fill_value = payload.fill_value
 
-                data[index] = payload
+            data[index] = payload
 
         # we can turn the masked array into a normal array if it's full.
         if numpy.ma.count_masked(data) == 0:
@@ -287,3 +325,72 @@ class DataManager(iris.util._OrderedHashable):
         pass
 
 
+# The shared (configuration, pool) pairs used to load concurrently, by use.
+_WORKER_POOLS = {}
+
+
+def _shared_pool(use, workers, kind):
+    """
+    Return the shared worker pool for the given use, with the given number
+    and kind of workers, or None when there are too few workers to need one.
+
+    """
+    if workers < 2:
+        return None
+
+    current = _WORKER_POOLS.get(use)
+    if current is None or current[0] != (kind, workers):
+        if kind == 'thread':
+            pool = multiprocessing.pool.ThreadPool(workers)
+        elif kind == 'process':
+            pool = multiprocessing.Pool(workers)
+        else:
+            raise ValueError('Unknown worker pool kind %r, expected '
+                             '\'thread\' or \'process\'.' % kind)
+        if current is not None:
+            current[1].terminate()
+        current = ((kind, workers), pool)
+        _WORKER_POOLS[use] = current
+
+    return current[1]
+
+
+def _worker_pool():
+    """
+    Return the shared worker pool used to load payloads concurrently, as
+    configured by :data:`iris.config.LOAD_WORKERS` and
+    :data:`iris.config.LOAD_POOL`, or None when payloads are to be loaded
+    serially.
+
+    """
+    return _shared_pool('payloads', iris.config.LOAD_WORKERS,
+                        iris.config.LOAD_POOL)
+
+
+def _file_pool():
+    """
+    Return the shared process pool used to load files concurrently, as
+    configured by :data:`iris.config.FILE_WORKERS`, or None when files are
+    to be loaded serially.
+
+    The load rules convert units through udunits, and memoise their
+    results, neither of which is thread-safe, so the files are always
+    loaded by processes rather than threads.
+
+    The pool is distinct from the one which loads payloads, so that a file
+    being loaded by a worker may itself load payloads concurrently.
+
+    """
+    return _shared_pool('files', iris.config.FILE_WORKERS, 'process')
+
+
+def _load_proxy(task):
+    """
+    Load the payload of a single proxy within a worker, returning the
+    (index, payload) pair.
+
+    """
+    index, proxy, data_shape, data_type, mdi, deferred_slice = task
+    return index, proxy.load(data_shape, data_type, mdi, deferred_slice)
+
+
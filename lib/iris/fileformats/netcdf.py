@@ -24,9 +24,12 @@ Also refer to document 'NetCDF Climate and Forecast (CF) Metadata Conventions',
 """
 
 import collections
+import contextlib
+import copy
 import itertools
 import os
 import os.path
+import threading
 import warnings
 
 import iris.proxy
@@ -35,6 +38,7 @@ import numpy as np
 from pyke import knowledge_engine
 
 import iris.analysis
+import iris.config
 import iris.coord_systems
 import iris.coords
 import iris.cube
@@ -88,6 +92,31 @@ _FACTORY_DEFNS = {
 }
 
 
+# The attributes of a CF-netCDF data variable which the rules translate.
+_CF_RULE_ATTRS = ('standard_name', 'long_name', 'units', 'calendar', 'cell_methods',
+                  'ukmo__um_stash_source', 'ukmo__process_flags')
+
+# The outcome of translating a CF-netCDF data variable, for re-use with
+# other data variables of the same file which share its signature.
+_Translation = collections.namedtuple('_Translation',
+                                      ('metadata', 'coords', 'requires', 'touched_attrs'))
+
+# The Pyke inference engine, which is built on first use.
+_ENGINE = None
+
+# Serialises the use of the Pyke inference engine, which holds the state
+# of a single translation.
+_ENGINE_LOCK = threading.Lock()
+
+
+def _pyke_engine():
+    """Return the module-level PyKE knowledge engine for CF->cube conversion."""
+    global _ENGINE
+    if _ENGINE is None:
+        _ENGINE = _pyke_kb_engine()
+    return _ENGINE
+
+
 def _pyke_kb_engine():
     """Return the PyKE knowledge engine for CF->cube conversion."""
 
@@ -140,15 +169,89 @@ class NetCDFDataProxy(object):
             :class:`numpy.ndarray`
         
         """
-        dataset = netCDF4.Dataset(self.path)
-        variable = dataset.variables[self.variable_name]
-        # Get the NetCDF variable data and slice.
-        payload = variable[deferred_slice]
-        dataset.close()
+        with _DATASET_POOL.dataset(self.path) as dataset:
+            variable = dataset.variables[self.variable_name]
+            # Get the NetCDF variable data and slice.
+            payload = variable[deferred_slice]
 
         return payload
 
 
+class _DatasetPool(object):
+    """
+    A process-wide, least recently used, pool of open netCDF4 datasets,
+    keyed by path.
+
+    The pool holds at most :data:`iris.config.NETCDF_MAX_OPEN` datasets.
+    A dataset is re-opened when the size, modification time or inode of its
+    file have changed since it was opened. Access to the datasets is
+    serialised, as the netCDF library is not thread-safe.
+
+    """
+    def __init__(self):
+        self._datasets = collections.OrderedDict()
+        self._lock = threading.RLock()
+        self._pid = os.getpid()
+
+    @contextlib.contextmanager
+    def dataset(self, path):
+        """
+        A context manager which provides the open :class:`netCDF4.Dataset`
+        of the given path, for exclusive use within the context.
+
+        """
+        with self._lock:
+            max_open = iris.config.NETCDF_MAX_OPEN
+            if max_open < 1:
+                self.clear()
+                dataset = netCDF4.Dataset(path)
+                try:
+                    yield dataset
+                finally:
+                    dataset.close()
+            else:
+                yield self._open(os.path.abspath(path), max_open)
+
+    def _open(self, path, max_open):
+        if self._pid != os.getpid():
+            # Never share the datasets inherited from a parent process.
+            self._datasets.clear()
+            self._pid = os.getpid()
+
+        stat = os.stat(path)
+        signature = (stat.st_size, stat.st_mtime, stat.st_ino)
+        entry = self._datasets.pop(path, None)
+        if entry is not None and entry[0] != signature:
+            # The file has changed since it was opened.
+            entry[1].close()
+            entry = None
+        if entry is None:
+            entry = (signature, netCDF4.Dataset(path))
+        self._datasets[path] = entry
+
+        while len(self._datasets) > max_open:
+            _, (_, dataset) = self._datasets.popitem(last=False)
+            dataset.close()
+        return entry[1]
+
+    def discard(self, path):
+        """Close the dataset of the given path, if it is open."""
+        with self._lock:
+            entry = self._datasets.pop(os.path.abspath(path), None)
+            if entry is not None:
+                entry[1].close()
+
+    def clear(self):
+        """Close all the open datasets."""
+        with self._lock:
+            while self._datasets:
+                _, (_, dataset) = self._datasets.popitem()
+                dataset.close()
+
+
+_DATASET_POOL = _DatasetPool()
+
+
 def _assert_case_specific_facts(engine, cf, cf_group):
     # Initialise pyke engine "provides" hooks.
     engine.provides['coordinates'] = []
@@ -216,8 +319,76 @@ def _set_attributes(attributes, key, value):
         attributes[str(key)] = value
 
 
-def _load_cube(engine, cf, cf_var, filename):
-    """Create the cube associated with the CF-netCDF data variable."""
+def _hashable(value):
+    """Return a hashable equivalent of the given netCDF attribute value."""
+    if isinstance(value, np.ndarray):
+        value = (value.dtype.str, value.shape, value.tostring())
+    return value
+
+
+def _translation_signature(cf_var):
+    """
+    Return the signature of the given CF-netCDF data variable which
+    determines its translation by the rules.
+
+    The signature combines the dimensions and data type of the variable, the
+    names and kinds of the CF-netCDF variables in its CF group, and the
+    values of its translated attributes.
+
+    """
+    # NB. Read the attributes directly, so that they are not marked as used.
+    attrs = tuple((name, _hashable(cf_var.cf_data.getncattr(name)))
+                  for name in _CF_RULE_ATTRS if name in cf_var._nc_attrs)
+    group = tuple(sorted((name, type(cf_group_var).__name__)
+                         for name, cf_group_var in cf_var.cf_group.iteritems()))
+    return (tuple(cf_var.dimensions), cf_var.cf_data.dtype.str, group, attrs)
+
+
+def _record_translation(engine, cf_var, cube, rule_attributes):
+    """Return the :class:`_Translation` of the given cube from the engine."""
+    dim_coord_ids = set(id(coord) for coord in cube.dim_coords)
+    coords = [(coord._shared_copy(), cube.coord_dims(coord), id(coord) in dim_coord_ids, cf_var_name)
+              for coord, cf_var_name in engine.provides.get('coordinates', [])]
+    metadata = (cube.standard_name, cube.long_name, cube.units, cube.cell_methods,
+                rule_attributes)
+    return _Translation(metadata, coords, copy.deepcopy(engine.requires),
+                        frozenset(cf_var._cf_attrs))
+
+
+def _apply_translation(engine, cf_var, cube, translation):
+    """Add the recorded :class:`_Translation` to the given cube, in place of running the engine."""
+    standard_name, long_name, units, cell_methods, rule_attributes = translation.metadata
+    cube.standard_name = standard_name
+    cube.long_name = long_name
+    cube.units = units
+    cube.cell_methods = cell_methods
+    cube.attributes.update(rule_attributes)
+
+    coordinates = []
+    for coord, dims, dim_coord, cf_var_name in translation.coords:
+        coord = coord._shared_copy()
+        if dim_coord:
+            cube.add_dim_coord(coord, dims[0])
+        else:
+            cube.add_aux_coord(coord, dims)
+        coordinates.append((coord, cf_var_name))
+
+    # Mark the attributes which the rules would have used.
+    cf_var._cf_attrs.update(translation.touched_attrs)
+
+    engine.provides = {'coordinates': coordinates}
+    engine.requires = copy.deepcopy(translation.requires)
+
+
+def _load_cube(engine, cf, cf_var, filename, translations=None):
+    """
+    Create the cube associated with the CF-netCDF data variable.
+
+    If a dictionary of translations is given, the translation of an earlier
+    data variable with the same signature is re-used in place of running
+    the engine, and the translation of a new signature is added to it.
+
+    """
      
     # Figure out what the eventual data type will be after any scale/offset transforms.
     dummy_data = np.zeros(1, dtype=cf_var.dtype)
@@ -231,37 +402,52 @@ def _load_cube(engine, cf, cf_var, filename):
     data_manager = iris.fileformats.manager.DataManager(cf_var.shape, dummy_data.dtype, None)
     cube = iris.cube.Cube(data_proxies, data_manager=data_manager)
     
-    # Reset the pyke inference engine.
-    engine.reset()
-
     # Initialise pyke engine rule processing hooks.
     engine.cf_var = cf_var
     engine.cube = cube
-    engine.provides = {}
-    engine.requires = {}
-    engine.rule_triggered = set()
     engine.filename = filename
 
-    # Assert any case-specific facts.
-    _assert_case_specific_facts(engine, cf, cf_var.cf_group)
+    attribute_predicate = lambda item: item[0] not in _CF_ATTRS
 
-    # Run pyke inference engine with forward chaining rules.
-    engine.activate(_PYKE_RULE_BASE)
+    signature = None
+    translation = None
+    if translations is not None:
+        signature = _translation_signature(cf_var)
+        translation = translations.get(signature)
 
-    # Populate coordinate attributes with the untouched attributes from the associated CF-netCDF variable.
-    coordinates = engine.provides.get('coordinates', [])
-    attribute_predicate = lambda item: item[0] not in _CF_ATTRS
- 
-    for coord, cf_var_name in coordinates:
-        for attr_name, attr_value in itertools.ifilter(attribute_predicate, cf.cf_group[cf_var_name].cf_attrs_unused()):
-            _set_attributes(coord.attributes, attr_name, attr_value)
+    if translation is not None:
+        _apply_translation(engine, cf_var, cube, translation)
+    else:
+        # Reset the pyke inference engine.
+        engine.reset()
+
+        engine.provides = {}
+        engine.requires = {}
+        engine.rule_triggered = set()
+
+        # Assert any case-specific facts.
+        _assert_case_specific_facts(engine, cf, cf_var.cf_group)
+
+        # Run pyke inference engine with forward chaining rules.
+        engine.activate(_PYKE_RULE_BASE)
+        rule_attributes = cube.attributes.copy()
+
+        # Populate coordinate attributes with the untouched attributes from the associated CF-netCDF variable.
+        coordinates = engine.provides.get('coordinates', [])
+     
+        for coord, cf_var_name in coordinates:
+            for attr_name, attr_value in itertools.ifilter(attribute_predicate, cf.cf_group[cf_var_name].cf_attrs_unused()):
+                _set_attributes(coord.attributes, attr_name, attr_value)
+
+        if translations is not None:
+            translations[signature] = _record_translation(engine, cf_var, cube, rule_attributes)
+
+        # Show pyke session statistics.
+        _pyke_stats(engine, cf_var.cf_name)
                 
     # Attach untouched attributes of the associated CF-netCDF data variable to the cube.
     for attr_name, attr_value in itertools.ifilter(attribute_predicate, cf_var.cf_attrs_unused()):
         _set_attributes(cube.attributes, attr_name, attr_value)
-
-    # Show pyke session statistics.
-    _pyke_stats(engine, cf_var.cf_name)
     
     return cube
 
@@ -307,8 +493,8 @@ def load_cubes(filenames, callback=None):
         Generator of loaded NetCDF :class:`iris.cubes.Cube`.
     
     """
-    # Initialise the pyke inference engine.
-    engine = _pyke_kb_engine()
+    # Get the pyke inference engine.
+    engine = _pyke_engine()
 
     if isinstance(filenames, basestring):
         filenames = [filenames]
@@ -317,18 +503,22 @@ def load_cubes(filenames, callback=None):
         # Ingest the netCDF file.
         cf = iris.fileformats.cf.CFReader(filename)
 
+        # The translations of the CF data variables of this file, by signature.
+        translations = {}
+
         # Process each CF data variable.
         for cf_var in cf.cf_group.data_variables.itervalues():
             # Only process CF data variables that do not participate in a formula term.
             if not cf_var.has_formula_terms():
-                cube = _load_cube(engine, cf, cf_var, filename)
+                with _ENGINE_LOCK:
+                    cube = _load_cube(engine, cf, cf_var, filename, translations)
                 
-                # Process any associated formula terms and attach
-                # the corresponding AuxCoordFactory.
-                _load_aux_factory(engine, cf, filename, cube)
+                    # Process any associated formula terms and attach
+                    # the corresponding AuxCoordFactory.
+                    _load_aux_factory(engine, cf, filename, cube)
 
                 # Perform any user registered callback function.
-                cube = iris.io.run_callback(callback, cube, engine.cf_var, filename)
+                cube = iris.io.run_callback(callback, cube, cf_var, filename)
 
                 # Callback mechanism may return None, which must not be yielded. 
                 if cube is None:
@@ -358,6 +548,20 @@ def _cf_coord_identity(coord):
     return coord.standard_name, coord.long_name, units
 
 
+def _unique_name(dataset, name):
+    """
+    Returns the given name, or failing that the name with the lowest
+    numeric suffix, which is not yet the name of a variable of the dataset.
+
+    """
+    unique_name = name
+    suffix = 0
+    while unique_name in dataset.variables:
+        suffix += 1
+        unique_name = '%s_%d' % (name, suffix)
+    return unique_name
+
+
 def _create_bounds(dataset, coord, cf_var, cf_name):
     if coord.has_bounds():
         n_bounds = coord.bounds.shape[-1]
@@ -400,7 +604,7 @@ def _create_cf_variable(dataset, cube, dimension_names, coord, factory_defn):
         The string name of the associated CF-netCDF variable saved.
     
     """
-    cf_name = coord.name()
+    cf_name = _unique_name(dataset, coord.name())
 
     # Derive the data dimension names for the coordinate.
     cf_dimensions = [dimension_names[dim] for dim in cube.coord_dims(coord)]
@@ -529,56 +733,75 @@ def _create_cf_cell_methods(cube, dimension_names):
     return ' '.join(cell_methods)
 
 
-def _create_cf_grid_mapping(dataset, cube, cf_var):
+def _create_cf_grid_mapping(dataset, cs):
     """
-    Create CF-netCDF grid mapping variable and associated CF-netCDF
-    data variable grid mapping attribute. 
+    Create CF-netCDF grid mapping variable for the coordinate system,
+    under a name not yet used in the dataset.
+
+    Returns:
+        The name of the newly created CF-netCDF grid mapping variable.
+
+    """
+    cf_name = _unique_name(dataset, cs.grid_mapping_name)
+    cf_var_grid = dataset.createVariable(cf_name, np.int32)
+    cf_var_grid.grid_mapping_name = cs.grid_mapping_name
+
+    # latlon
+    if isinstance(cs, iris.coord_systems.GeogCS):
+        cf_var_grid.longitude_of_prime_meridian = cs.longitude_of_prime_meridian
+        cf_var_grid.semi_major_axis = cs.semi_major_axis
+        cf_var_grid.semi_minor_axis = cs.semi_minor_axis
+
+    # rotated latlon
+    elif isinstance(cs, iris.coord_systems.RotatedGeogCS):
+        if cs.ellipsoid:
+            cf_var_grid.longitude_of_prime_meridian = cs.ellipsoid.longitude_of_prime_meridian
+            cf_var_grid.semi_major_axis = cs.ellipsoid.semi_major_axis
+            cf_var_grid.semi_minor_axis = cs.ellipsoid.semi_minor_axis
+        cf_var_grid.grid_north_pole_latitude = cs.grid_north_pole_latitude
+        cf_var_grid.grid_north_pole_longitude = cs.grid_north_pole_longitude
+        cf_var_grid.north_pole_grid_longitude = cs.north_pole_grid_longitude
+
+    # tmerc
+    elif isinstance(cs, iris.coord_systems.TransverseMercator):
+        warnings.warn('TransverseMercator coordinate system not yet handled')
+
+    # osgb (a specific tmerc)
+    elif isinstance(cs, iris.coord_systems.OSGB):
+        warnings.warn('OSGB coordinate system not yet handled')
     
+    # other
+    else:
+        warnings.warn('Unable to represent the horizontal coordinate system. The coordinate system type %r is not yet implemented.' % type(cs))
+
+    return cf_name
+
+
+def _data_chunks(cube):
     """
-    # TODO: What if there's more than one CoordSystem?
-    cs = cube.coord_system('CoordSystem')
-    if cs is not None:
-
-        # Grid var not yet created?
-        if cs.grid_mapping_name not in dataset.variables:
-            cf_var_grid = dataset.createVariable(cs.grid_mapping_name, np.int32)
-            cf_var_grid.grid_mapping_name = cs.grid_mapping_name
-
-            # latlon
-            if isinstance(cs, iris.coord_systems.GeogCS):
-                cf_var_grid.longitude_of_prime_meridian = cs.longitude_of_prime_meridian
-                cf_var_grid.semi_major_axis = cs.semi_major_axis
-                cf_var_grid.semi_minor_axis = cs.semi_minor_axis
-
-            # rotated latlon
-            elif isinstance(cs, iris.coord_systems.RotatedGeogCS):
-                if cs.ellipsoid:
-                    cf_var_grid.longitude_of_prime_meridian = cs.ellipsoid.longitude_of_prime_meridian
-                    cf_var_grid.semi_major_axis = cs.ellipsoid.semi_major_axis
-                    cf_var_grid.semi_minor_axis = cs.ellipsoid.semi_minor_axis
-                cf_var_grid.grid_north_pole_latitude = cs.grid_north_pole_latitude
-                cf_var_grid.grid_north_pole_longitude = cs.grid_north_pole_longitude
-                cf_var_grid.north_pole_grid_longitude = cs.north_pole_grid_longitude
-
-            # tmerc
-            elif isinstance(cs, iris.coord_systems.TransverseMercator):
-                warnings.warn('TransverseMercator coordinate system not yet handled')
-
-            # osgb (a specific tmerc)
-            elif isinstance(cs, iris.coord_systems.OSGB):
-                warnings.warn('OSGB coordinate system not yet handled')
-            
-            # other
-            else:
-                warnings.warn('Unable to represent the horizontal coordinate system. The coordinate system type %r is not yet implemented.' % type(cs))
+    Generate the (keys, data) pairs which make up the data of the cube.
+
+    Deferred data is loaded a single index of the outermost dimension of
+    the cube at a time, so that only that part of the data need be held in
+    memory at once. That is only done for the dimensions of the proxy
+    array, as the payload of each proxy is loaded in full.
 
-        # Refer to grid var
-        cf_var.grid_mapping = cs.grid_mapping_name
+    """
+    data_manager = cube._data_manager
+    if data_manager is None:
+        yield Ellipsis, cube.data
+    elif cube._data.ndim == 0:
+        yield Ellipsis, data_manager.load(cube._data)
+    else:
+        for index in xrange(cube.shape[0]):
+            keys = (slice(index, index + 1),)
+            proxy_array, chunk_manager = data_manager.getitem(cube._data, keys)
+            yield keys, chunk_manager.load(proxy_array)
 
 
-def _create_cf_data_variable(dataset, cube, dimension_names):
+def _create_cf_data_variable(dataset, cube, dimension_names, **kwargs):
     """
-    Create CF-netCDF data variable for the cube and any associated grid mapping.
+    Create CF-netCDF data variable for the cube.
     
     Args:
     
@@ -588,21 +811,43 @@ def _create_cf_data_variable(dataset, cube, dimension_names):
         The associated cube being saved to CF-netCDF file.
     * dimension_names:
         List of string names for each dimension of the cube.
+
+    Kwargs:
+
+    * kwargs:
+        The storage options of the variable, such as its compression, as
+        passed to :meth:`netCDF4.Dataset.createVariable`.
         
     Returns:
         The newly created CF-netCDF data variable. 
     
     """
-    cf_name = cube.name()
+    cf_name = _unique_name(dataset, cube.name())
     
-    # Determine whether there is a cube MDI value.
+    chunks = _data_chunks(cube)
+    keys, data = next(chunks)
+
+    # Determine whether there is a cube MDI value. Deferred data is only
+    # loaded as it is written, so its missing points may be in any chunk,
+    # and the fill value is removed at the end if there were none.
     fill_value = None
-    if isinstance(cube.data, np.ma.core.MaskedArray):
-        fill_value = cube.data.fill_value
+    masked = isinstance(data, np.ma.core.MaskedArray)
+    if masked:
+        fill_value = data.fill_value
+    elif cube._data_manager is not None:
+        fill_value = cube._data_manager.mdi
+        if fill_value is None:
+            fill_value = netCDF4.default_fillvals.get(data.dtype.str[1:])
         
     # Create the cube CF-netCDF data variable with data payload.
-    cf_var = dataset.createVariable(cf_name, cube.data.dtype, dimension_names, fill_value=fill_value)
-    cf_var[:] = cube.data
+    cf_var = dataset.createVariable(cf_name, data.dtype, dimension_names,
+                                    fill_value=fill_value, **kwargs)
+    cf_var[keys] = data
+    for keys, data in chunks:
+        masked = masked or isinstance(data, np.ma.core.MaskedArray)
+        cf_var[keys] = data
+    if fill_value is not None and not masked:
+        cf_var.delncattr('_FillValue')
     
     if cube.standard_name:
     	cf_var.standard_name = cube.standard_name
@@ -636,91 +881,315 @@ def _create_cf_data_variable(dataset, cube, dimension_names):
     
     if cell_methods:
         cf_var.cell_methods = cell_methods
-    
-    # Create the CF-netCDF grid mapping.
-    _create_cf_grid_mapping(dataset, cube, cf_var)
 
     return cf_var
 
 
-def save(cube, filename, netcdf_format='NETCDF4'):
+class _Saver(object):
+    """
+    Writes cubes to a CF-netCDF dataset, sharing the dimensions and the
+    coordinate variables which are identical between the cubes.
+
+    """
+    def __init__(self, dataset):
+        self.dataset = dataset
+        # The (length, dimension coordinate, factory terms) of each created
+        # dimension.
+        self._dimensions = {}
+        # The (coordinate, dimension names, factory role, variable name)
+        # of each created coordinate variable.
+        self._coord_variables = []
+        # The (coordinate system, variable name) of each created grid
+        # mapping variable.
+        self._grid_mappings = []
+
+    def _dimension_names(self, cube, factory_defn):
+        """
+        Returns the names of the CF-netCDF dimensions of the cube, creating
+        those which do not yet exist. The first dimension of the first cube
+        is made an unlimited dimension.
+
+        """
+        first_cube = not self._dimensions
+        # The dimension coordinate which is the primary coordinate of the
+        # factory is only shared when the other dependencies of the factory
+        # are equal, and on the same dimensions, so its dimension is named
+        # after all of the others. The new dimensions are then created in
+        # order.
+        primary_dims = ()
+        if factory_defn:
+            dependencies = cube.aux_factories[0].dependencies
+            primary = dependencies[factory_defn.primary]
+            if any(coord is primary for coord in cube.dim_coords):
+                primary_dims = cube.coord_dims(primary)
+
+        dimension_names = [None] * cube.ndim
+        new_dims = []
+        for dim in sorted(xrange(cube.ndim), key=lambda dim: dim in primary_dims):
+            coords = cube.coords(dimensions=dim, dim_coords=True)
+            if coords:
+                if len(coords) != 1:
+                    raise iris.exceptions.IrisError('Cube appears to have multiple dimension coordinates on dimension %d' % dim)
+                coord = coords[0]
+                name = coord.name()
+            else:
+                # There are no CF-netCDF coordinates describing this data dimension.
+                coord = None
+                name = 'dim%d' % dim
+            length = cube.shape[dim]
+            terms = None
+            if dim in primary_dims:
+                terms = (factory_defn,
+                         sorted((key, dependency,
+                                 tuple(None if dependency_dim == dim else dimension_names[dependency_dim]
+                                       for dependency_dim in cube.coord_dims(dependency)))
+                                for key, dependency in dependencies.iteritems()
+                                if key != factory_defn.primary))
+
+            # Re-use an existing dimension with the same length, dimension
+            # coordinate and factory terms, otherwise create a new dimension
+            # with a unique name.
+            dimension_name = name
+            suffix = 0
+            while True:
+                existing = self._dimensions.get(dimension_name)
+                if existing is not None:
+                    existing_length, existing_coord, existing_terms = existing
+                    if (dimension_name not in dimension_names and
+                            existing_length == length and
+                            (existing_coord is None) == (coord is None) and
+                            (coord is None or existing_coord == coord) and
+                            existing_terms == terms):
+                        break
+                elif (dimension_name not in dimension_names and
+                        dimension_name not in self.dataset.dimensions and
+                        dimension_name not in self.dataset.variables):
+                    new_dims.append((dim, (length, coord, terms)))
+                    break
+                suffix += 1
+                dimension_name = '%s_%d' % (name, suffix)
+
+            dimension_names[dim] = dimension_name
+
+        for dim, defn in sorted(new_dims):
+            dimension_name = dimension_names[dim]
+            if first_cube and dim == 0:
+                self.dataset.createDimension(dimension_name)
+            else:
+                self.dataset.createDimension(dimension_name, defn[0])
+            self._dimensions[dimension_name] = defn
+
+        return dimension_names
+
+    def _existing_coord_variable(self, cf_dimensions, coord, role):
+        """
+        Returns the name of the CF-netCDF variable already created for an
+        equal coordinate, on the same dimensions and with the same factory
+        role, or None if there is none.
+
+        """
+        for existing_coord, existing_dimensions, existing_role, cf_name in self._coord_variables:
+            if (existing_dimensions == cf_dimensions and existing_role == role and
+                    existing_coord == coord):
+                return cf_name
+
+    def _factory_role(self, cube, dimension_names, coord, factory_defn):
+        """
+        Returns the role of the coordinate in the factory of the cube. This
+        is None, or for the primary coordinate of the factory, the factory
+        definition and the names of the existing CF-netCDF variables of the
+        other dependencies, by term.
+
+        """
+        role = None
+        if factory_defn:
+            dependencies = cube.aux_factories[0].dependencies
+            if coord is dependencies[factory_defn.primary]:
+                terms = []
+                for key, dependency in dependencies.iteritems():
+                    if key != factory_defn.primary:
+                        cf_dimensions = tuple([dimension_names[dim] for dim in
+                                               cube.coord_dims(dependency)])
+                        terms.append((key, self._existing_coord_variable(cf_dimensions,
+                                                                         dependency, None)))
+                role = (factory_defn, sorted(terms))
+        return role
+
+    def _coord_variable(self, cube, dimension_names, coord, factory_defn):
+        """
+        Returns the name of the CF-netCDF variable of the coordinate,
+        re-using an identical coordinate variable where there is one.
+
+        """
+        cf_dimensions = tuple([dimension_names[dim] for dim in cube.coord_dims(coord)])
+        role = self._factory_role(cube, dimension_names, coord, factory_defn)
+        cf_name = self._existing_coord_variable(cf_dimensions, coord, role)
+        if cf_name is None:
+            cf_name = _create_cf_variable(self.dataset, cube, dimension_names, coord, factory_defn)
+            self._coord_variables.append((coord, cf_dimensions, role, cf_name))
+        return cf_name
+
+    def _formula_terms(self, cube, dimension_names, factory_defn, created):
+        """
+        Sets the formula terms of the CF-netCDF variable of the primary
+        coordinate of the factory, if it is one of the coordinate variables
+        created since the given count, from the names of the variables of
+        the other dependencies as written, which may have been made unique.
+
+        """
+        primary = cube.aux_factories[0].dependencies[factory_defn.primary]
+        for i in xrange(created, len(self._coord_variables)):
+            coord, cf_dimensions, role, cf_name = self._coord_variables[i]
+            if coord is primary:
+                role = self._factory_role(cube, dimension_names, coord, factory_defn)
+                names = dict(role[1])
+                names[factory_defn.primary] = cf_name
+                formula_terms = factory_defn.formula_terms_format.format(**names)
+                cf_var = self.dataset.variables[cf_name]
+                if cf_var.formula_terms != formula_terms:
+                    cf_var.formula_terms = formula_terms
+                self._coord_variables[i] = (coord, cf_dimensions, role, cf_name)
+
+    def _grid_mapping(self, cube, cf_var):
+        """
+        Sets the grid mapping attribute of the CF-netCDF data variable,
+        re-using the grid mapping variable of an equal coordinate system
+        where there is one.
+
+        """
+        # TODO: What if there's more than one CoordSystem?
+        cs = cube.coord_system('CoordSystem')
+        if cs is None:
+            return
+
+        for existing_cs, cf_name in self._grid_mappings:
+            if existing_cs == cs:
+                break
+        else:
+            cf_name = _create_cf_grid_mapping(self.dataset, cs)
+            self._grid_mappings.append((cs, cf_name))
+
+        cf_var.grid_mapping = cf_name
+
+    def add_cube(self, cube, **kwargs):
+        """
+        Write the cube to the dataset, with the given storage options of
+        its data variable.
+
+        """
+        factory_defn = None
+        if cube.aux_factories:
+            factory = cube.aux_factories[0]
+            factory_defn = _FACTORY_DEFNS.get(type(factory), None)
+
+        dimension_names = self._dimension_names(cube, factory_defn)
+
+        # Create the associated cube CF-netCDF data variable.
+        cf_var_cube = _create_cf_data_variable(self.dataset, cube, dimension_names, **kwargs)
+
+        # Create the CF-netCDF grid mapping.
+        self._grid_mapping(cube, cf_var_cube)
+
+        created = len(self._coord_variables)
+
+        # Ensure we create the netCDF coordinate variables first.
+        for coord in cube.dim_coords:
+            # Create the associated coordinate CF-netCDF variable.
+            self._coord_variable(cube, dimension_names, coord, factory_defn)
+
+        # List of CF-netCDF auxiliary coordinate variable names.
+        auxiliary_coordinate_names = []
+        for coord in sorted(cube.aux_coords, key=lambda coord: coord.name()):
+            # Create the associated coordinate CF-netCDF variable.
+            cf_name = self._coord_variable(cube, dimension_names, coord, factory_defn)
+
+            if cf_name is not None:
+                auxiliary_coordinate_names.append(cf_name)
+
+        if factory_defn:
+            self._formula_terms(cube, dimension_names, factory_defn, created)
+
+        # Add CF-netCDF auxiliary coordinate variable references to the CF-netCDF data variable.
+        if auxiliary_coordinate_names:
+            cf_var_cube.coordinates = ' '.join(sorted(auxiliary_coordinate_names))
+
+
+def save(cube, filename, netcdf_format='NETCDF4', zlib=False, complevel=4,
+         shuffle=True, chunksizes=None, least_significant_digit=None):
     """
-    Save a cube to a netCDF file, given the cube and the filename.
+    Save a cube, or a list of cubes, to a netCDF file, given the cube(s)
+    and the filename.
+
+    The cubes of a list are written to a single dataset, in which the
+    dimensions and coordinate variables which are identical between the
+    cubes are written only once, and shared by the data variables.
+
+    Deferred data is loaded and written a single index of the outermost
+    dimension of the cube at a time, so the data need not fit in memory.
     
     Args:
     
-    * cube (:class:`iris.cube.Cube`):
-        The :class:`iris.cube.Cube` to be saved to a netCDF file.
+    * cube (:class:`iris.cube.Cube` or :class:`iris.cube.CubeList`):
+        The :class:`iris.cube.Cube`, or list of cubes, to be saved to a
+        netCDF file.
 
     * filename (string):
-        Name of the netCDF file to save the cube.
+        Name of the netCDF file to save the cube(s).
+
+    Kwargs:
 
     * netcdf_format (string):
         Underlying netCDF file format, one of 'NETCDF4', 'NETCDF4_CLASSIC', 
         'NETCDF3_CLASSIC' or 'NETCDF3_64BIT'. Default is 'NETCDF4' format.
 
+    * zlib (bool):
+        Whether to compress the data variables with zlib. Default is False.
+        Only applicable to the 'NETCDF4' and 'NETCDF4_CLASSIC' formats.
+
+    * complevel (int):
+        The zlib compression level, from 1 (fastest) to 9 (smallest).
+        Default is 4.
+
+    * shuffle (bool):
+        Whether to apply the HDF5 shuffle filter before compression.
+        Default is True.
+
+    * chunksizes (tuple of int):
+        The HDF5 chunk size of each dimension of the data variables. Default
+        is None, which leaves the choice to the netCDF library.
+
+    * least_significant_digit (int):
+        The power of ten of the smallest significant decimal place of the
+        data, beyond which the data is quantized to improve compression.
+        Default is None, which retains the full precision.
+
     Returns:
         None.
     
     """
-    if not isinstance(cube, iris.cube.Cube):
-        raise TypeError('Expecting a single cube instance, got %r.' % type(cube))
+    if isinstance(cube, iris.cube.Cube):
+        cubes = [cube]
+    elif (isinstance(cube, (list, tuple)) and cube and
+            all(isinstance(item, iris.cube.Cube) for item in cube)):
+        cubes = cube
+    else:
+        raise TypeError('Expecting a single cube instance, or a list of cubes, got %r.' % type(cube))
 
     if netcdf_format not in ['NETCDF4', 'NETCDF4_CLASSIC', 'NETCDF3_CLASSIC', 'NETCDF3_64BIT']:
         raise ValueError('Unknown netCDF file format, got %r' % netcdf_format)
 
-    if len(cube.aux_factories) > 1:
+    if any(len(cube.aux_factories) > 1 for cube in cubes):
         raise ValueError('Multiple auxiliary factories are not supported.')
 
+    # Release any handle on a previous version of the file.
+    _DATASET_POOL.discard(filename)
     dataset = netCDF4.Dataset(filename, mode='w', format=netcdf_format)
-    
-    # Create the CF-netCDF data dimension names.
-    dimension_names = []
-    for dim in xrange(cube.ndim):
-        coords = cube.coords(dimensions=dim, dim_coords=True)
-        if coords:
-            if len(coords) != 1:
-                raise iris.exceptions.IrisError('Cube appears to have multiple dimension coordinates on dimension %d' % dim)
-            dimension_names.append(coords[0].name())
-        else:
-             # There are no CF-netCDF coordinates describing this data dimension.
-            dimension_names.append('dim%d' % dim)
-
-    # Create the CF-netCDF data dimensions.
-    # Make the outermost dimension an unlimited dimension.
-    if dimension_names:
-        dataset.createDimension(dimension_names[0])
-    for dim_name, dim_len in zip(dimension_names, cube.shape)[1:]:
-        dataset.createDimension(dim_name, dim_len)
-
-    # Identify the collection of coordinates that represent CF-netCDF coordinate variables.
-    cf_coordinates = cube.dim_coords
-
-    # Create the associated cube CF-netCDF data variable.
-    cf_var_cube = _create_cf_data_variable(dataset, cube, dimension_names)
 
-    factory_defn = None
-    if cube.aux_factories:
-        factory = cube.aux_factories[0]
-        factory_defn = _FACTORY_DEFNS.get(type(factory), None)
-
-    # Ensure we create the netCDF coordinate variables first.
-    for coord in cf_coordinates:
-        # Create the associated coordinate CF-netCDF variable.
-        _create_cf_variable(dataset, cube, dimension_names, coord, factory_defn)
-    
-    # List of CF-netCDF auxiliary coordinate variable names.
-    auxiliary_coordinate_names = []
-    for coord in sorted(cube.aux_coords, key=lambda coord: coord.name()):
-        # Create the associated coordinate CF-netCDF variable.
-        cf_name = _create_cf_variable(dataset, cube, dimension_names, coord, factory_defn)
-
-        if cf_name is not None:
-            auxiliary_coordinate_names.append(cf_name)
-
-    # Add CF-netCDF auxiliary coordinate variable references to the CF-netCDF data variable.
-    if auxiliary_coordinate_names:
-        cf_var_cube.coordinates = ' '.join(sorted(auxiliary_coordinate_names))
+    saver = _Saver(dataset)
+    for cube in cubes:
+        saver.add_cube(cube, zlib=zlib, complevel=complevel, shuffle=shuffle,
+                       chunksizes=chunksizes,
+                       least_significant_digit=least_significant_digit)
 
     # Flush any buffered data to the CF-netCDF file before closing.
     dataset.sync()
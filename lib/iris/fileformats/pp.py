@@ -22,19 +22,24 @@ Provides UK Met Office Post Process (PP) format specific capabilities.
 import abc
 import collections
 from copy import deepcopy
+import hashlib
 import itertools
 import operator
 import os
 import re
 import struct
 import sys
+import tempfile
 import warnings
+import zipfile
 
 import numpy
 import numpy.ma
 import netcdftime
 
+import iris._constraints
 import iris.config
+import iris.coords
 import iris.fileformats.rules
 import iris.io
 import iris.unit
@@ -45,7 +50,8 @@ iris.proxy.apply_proxy('iris.fileformats.pp_packing', globals())
 
 
 __all__ = ['load', 'save', 'PPField', 'add_load_rules', 'reset_load_rules', 
-           'add_save_rules', 'reset_save_rules', 'STASH', 'EARTH_RADIUS']
+           'add_save_rules', 'reset_save_rules', 'STASH', 'EARTH_RADIUS',
+           'PPFieldCollection']
 
 
 EARTH_RADIUS = 6371229.0
@@ -55,6 +61,8 @@ EARTH_RADIUS = 6371229.0
 _load_rules = None
 _cross_reference_rules = None
 _save_rules = None
+# Whether any user rules have been added to the load rules.
+_user_load_rules = False
 
 
 PP_HEADER_DEPTH = 256
@@ -655,49 +663,78 @@ class PPDataProxy(object):
             :class:`numpy.ndarray`
         
         """
-        # Load the appropriate proxy data conveniently with a context manager.
-        with open(self.path, 'rb') as pp_file:
-            pp_file.seek(self.offset, os.SEEK_SET)
-            data = _read_data(pp_file, self.lbpack, self.data_len, data_shape, data_type, mdi)
-                
-        # Identify which index items in the deferred slice are tuples. 
-        tuple_dims = [i for i, value in enumerate(deferred_slice) if isinstance(value, tuple)]
-        
-        # Whenever a slice consists of more than one tuple index item, numpy does not slice the
-        # data array as we want it to. We therefore require to split the deferred slice into 
-        # multiple slices and consistently slice the data with one slice per tuple.
-        if len(tuple_dims) > 1:
-            # Identify which index items in the deferred slice are single scalar values.
-            # Such dimensions will collapse in the sliced data shape.
-            collapsed_dims = [i for i, value in enumerate(deferred_slice) if isinstance(value, int)]
-
-            # Equate the first slice to be the original deferred slice.
-            tuple_slice = list(deferred_slice)
-            # Replace all tuple index items in the slice, except for the first,
-            # to be full slices over their dimension.
-            for dim in tuple_dims[1:]:
-                tuple_slice[dim] = slice(None)
-            
-            # Perform the deferred slice containing only the first tuple index item.
-            payload = data[tuple_slice]
-            
-            # Re-slice the data consistently with the next single tuple index item. 
-            for dim in tuple_dims[1:]:
-                # Identify all those pre-sliced collapsed dimensions less than
-                # the dimension of the current slice tuple index item.
-                ndims_collapsed = len(filter(lambda x: x < dim, collapsed_dims))
-                # Construct the single tuple slice.
-                tuple_slice = [slice(None)] * payload.ndim
-                tuple_slice[dim - ndims_collapsed] = deferred_slice[dim]
-                # Slice the data with this single tuple slice.
-                payload = payload[tuple_slice]
+        memmapped = iris.config.PP_MEMMAP and self.lbpack.n1 == 0
+        if memmapped:
+            # Take a zero-copy view of the unpacked payload, so that only the
+            # pages touched by the deferred slice are actually read.
+            data = _memmap_data(self.path, self.offset, data_shape, data_type)
         else:
-            # The deferred slice contains no more than one tuple index item, so
-            # it's safe to slice the data directly.
-            payload = data[deferred_slice]
+            # Load the appropriate proxy data conveniently with a context manager.
+            with open(self.path, 'rb') as pp_file:
+                pp_file.seek(self.offset, os.SEEK_SET)
+                data = _read_data(pp_file, self.lbpack, self.data_len, data_shape, data_type, mdi)
+                
+        payload = _apply_deferred_slice(data, deferred_slice)
+
+        if memmapped:
+            # Detach the sliced result from the file, in native byte order.
+            payload = _native_payload(payload, mdi)
         
         return payload
 
+    @classmethod
+    def load_batch(cls, indexed_proxies, data_shape, data_type, mdi, deferred_slice,
+                   pool=None):
+        """
+        Load the corresponding proxy data items of many proxies and perform
+        any deferred slicing.
+
+        The proxies are grouped by file and ordered by offset, so that each
+        file is opened once and read in a single sequential pass, with the
+        payloads which are (nearly) contiguous in the file coalesced into a
+        single read. Given a worker pool, the payloads are decoded
+        concurrently whilst the files are read.
+
+        Args:
+
+        * indexed_proxies (iterable):
+            The (index, proxy) pairs of the proxies to load.
+        * data_shape (tuple of int):
+            The data shape of each proxy data item.
+        * data_type (:class:`numpy.dtype`):
+            The data type of each proxy data item.
+        * mdi (float):
+            The missing data indicator value.
+        * deferred_slice (tuple):
+            The deferred slice to be applied to each proxy data item.
+
+        Kwargs:
+
+        * pool (:class:`multiprocessing.pool.Pool`):
+            The worker pool with which to decode the payloads. Defaults to
+            decoding serially.
+
+        Returns:
+            A generator of (index, :class:`numpy.ndarray`) pairs, in no
+            particular order.
+
+        """
+        path_proxies = collections.defaultdict(list)
+        for index, proxy in indexed_proxies:
+            if iris.config.PP_MEMMAP and proxy.lbpack.n1 == 0:
+                # Memory-mapped payloads gain nothing from batching.
+                yield index, proxy.load(data_shape, data_type, mdi, deferred_slice)
+            else:
+                path_proxies[proxy.path].append((index, proxy))
+
+        tasks = _payload_tasks(path_proxies, data_shape, data_type, mdi, deferred_slice)
+        if pool is None:
+            payloads = itertools.imap(_decode_payload, tasks)
+        else:
+            payloads = pool.imap_unordered(_decode_payload, tasks)
+        for index, payload in payloads:
+            yield index, payload
+
     def __eq__(self, other):
         result = NotImplemented
         if isinstance(other, PPDataProxy):
@@ -715,17 +752,178 @@ class PPDataProxy(object):
         return result
 
 
+# The shared read-only memory-maps of PP/FF files, keyed by path, in least
+# recently used order.
+_MEMMAPS = collections.OrderedDict()
+
+
+def _file_memmap(path):
+    """
+    Return a shared, read-only byte :class:`numpy.memmap` of the given file.
+
+    At most :data:`iris.config.PP_MAX_MEMMAPS` memory-maps are held, the
+    least recently used being dropped first. A memory-map is re-created
+    whenever the size, modification time or inode of the file change.
+
+    """
+    stat = os.stat(path)
+    signature = (stat.st_size, stat.st_mtime, stat.st_ino)
+    cached = _MEMMAPS.pop(path, None)
+    if cached is None or cached[0] != signature:
+        cached = (signature, numpy.memmap(path, dtype=numpy.uint8, mode='r'))
+    max_memmaps = iris.config.PP_MAX_MEMMAPS
+    if max_memmaps > 0:
+        _MEMMAPS[path] = cached
+        while len(_MEMMAPS) > max_memmaps:
+            _MEMMAPS.popitem(last=False)
+    else:
+        _MEMMAPS.clear()
+    return cached[1]
+
+
+def _memmap_data(path, offset, data_shape, data_type):
+    """
+    Return a view of the unpacked payload at the given offset of the file.
+
+    The view is in the byte order of the file, and no data is read until
+    the view (or a slice of it) is accessed.
+
+    """
+    return numpy.ndarray(data_shape, dtype=data_type,
+                         buffer=_file_memmap(path), offset=offset)
+
+
+def _native_payload(payload, mdi):
+    """
+    Return a native byte order copy of the given (memory-mapped) payload,
+    masked wherever it has the missing data indicator value.
+
+    """
+    payload = numpy.array(payload, dtype=payload.dtype.newbyteorder('='))
+    if mdi in payload:
+        payload = numpy.ma.masked_values(payload, mdi, copy=False)
+    return payload
+
+
+def _apply_deferred_slice(data, deferred_slice):
+    """Return the given data array sliced by the given deferred slice."""
+    # Identify which index items in the deferred slice are tuples. 
+    tuple_dims = [i for i, value in enumerate(deferred_slice) if isinstance(value, tuple)]
+
+    # Whenever a slice consists of more than one tuple index item, numpy does not slice the
+    # data array as we want it to. We therefore require to split the deferred slice into 
+    # multiple slices and consistently slice the data with one slice per tuple.
+    if len(tuple_dims) > 1:
+        # Identify which index items in the deferred slice are single scalar values.
+        # Such dimensions will collapse in the sliced data shape.
+        collapsed_dims = [i for i, value in enumerate(deferred_slice) if isinstance(value, int)]
+
+        # Equate the first slice to be the original deferred slice.
+        tuple_slice = list(deferred_slice)
+        # Replace all tuple index items in the slice, except for the first,
+        # to be full slices over their dimension.
+        for dim in tuple_dims[1:]:
+            tuple_slice[dim] = slice(None)
+
+        # Perform the deferred slice containing only the first tuple index item.
+        payload = data[tuple_slice]
+
+        # Re-slice the data consistently with the next single tuple index item. 
+        for dim in tuple_dims[1:]:
+            # Identify all those pre-sliced collapsed dimensions less than
+            # the dimension of the current slice tuple index item.
+            ndims_collapsed = len(filter(lambda x: x < dim, collapsed_dims))
+            # Construct the single tuple slice.
+            tuple_slice = [slice(None)] * payload.ndim
+            tuple_slice[dim - ndims_collapsed] = deferred_slice[dim]
+            # Slice the data with this single tuple slice.
+            payload = payload[tuple_slice]
+    else:
+        # The deferred slice contains no more than one tuple index item, so
+        # it's safe to slice the data directly.
+        payload = data[deferred_slice]
+
+    return payload
+
+
+# The largest gap (in bytes) between two payloads in a file which will be
+# read through, rather than skipped, when coalescing their reads.
+_COALESCE_GAP = 64 * 1024
+
+# The size (in bytes) beyond which a coalesced read will not be extended.
+_COALESCE_LIMIT = 64 * 1024 * 1024
+
+
+def _coalesce_extents(proxies):
+    """
+    Group the given (index, proxy) pairs, already sorted by offset, into
+    runs of nearby payloads that can be read from the file in one go.
+
+    Returns:
+        A generator of (start, stop, proxies) tuples, giving the byte range
+        to read and the (index, proxy) pairs whose payloads it contains.
+
+    """
+    start = stop = None
+    extent_proxies = []
+    for index, proxy in proxies:
+        proxy_stop = proxy.offset + proxy.data_len
+        if extent_proxies and (proxy.offset - stop > _COALESCE_GAP or
+                               proxy_stop - start > _COALESCE_LIMIT):
+            yield start, stop, extent_proxies
+            extent_proxies = []
+        if not extent_proxies:
+            start = proxy.offset
+            stop = proxy_stop
+        stop = max(stop, proxy_stop)
+        extent_proxies.append((index, proxy))
+    if extent_proxies:
+        yield start, stop, extent_proxies
+
+
+def _payload_tasks(path_proxies, data_shape, data_type, mdi, deferred_slice):
+    """
+    Generate the payload decoding tasks of the given proxies, grouped by
+    path, reading each file in a single sequential pass.
+
+    """
+    for path, proxies in path_proxies.iteritems():
+        proxies.sort(key=lambda item: item[1].offset)
+        with open(path, 'rb') as pp_file:
+            for start, stop, extent_proxies in _coalesce_extents(proxies):
+                pp_file.seek(start, os.SEEK_SET)
+                extent = pp_file.read(stop - start)
+                for index, proxy in extent_proxies:
+                    offset = proxy.offset - start
+                    data_bytes = extent[offset:offset + proxy.data_len]
+                    yield (index, data_bytes, proxy.lbpack, data_shape,
+                           data_type, mdi, deferred_slice)
+
+
+def _decode_payload(task):
+    """
+    Decode and slice a single payload task, returning the (index, payload)
+    pair. Used directly and by the workers of a pool.
+
+    """
+    index, data_bytes, lbpack, data_shape, data_type, mdi, deferred_slice = task
+    data = _decode_data(data_bytes, lbpack, data_shape, data_type, mdi)
+    return index, _apply_deferred_slice(data, deferred_slice)
+
+
 def _read_data(pp_file, lbpack, data_len, data_shape, data_type, mdi):
     """Read the data from the given file object given its precise location in the file."""
-    if lbpack.n1 == 0:
-        data = numpy.fromfile(pp_file, dtype=data_type, count=data_len / data_type.itemsize)
+    return _decode_data(pp_file.read(data_len), lbpack, data_shape, data_type, mdi)
+
+
+def _decode_data(data_bytes, lbpack, data_shape, data_type, mdi):
+    """Decode the data from the given string of payload bytes."""
+    if lbpack.n1 in (0, 2):
+        data = numpy.fromstring(data_bytes, dtype=data_type, count=len(data_bytes) / data_type.itemsize)
     elif lbpack.n1 == 1:
-        data = pp_file.read(data_len)
-        data = pp_packing.wgdos_unpack(data, data_shape[0], data_shape[1], mdi)
-    elif lbpack.n1 == 2:
-        data = numpy.fromfile(pp_file, dtype=data_type, count=data_len / data_type.itemsize)
+        data = pp_packing.wgdos_unpack(data_bytes, data_shape[0], data_shape[1], mdi)
     elif lbpack.n1 == 4:
-        data = numpy.fromfile(pp_file, dtype=data_type, count=data_len / data_type.itemsize)
+        data = numpy.fromstring(data_bytes, dtype=data_type, count=len(data_bytes) / data_type.itemsize)
         data = pp_packing.rle_decode(data, data_shape[0], data_shape[1], mdi)
     else:
         raise iris.exceptions.NotYetImplementedError('PP fields with LBPACK of %s are not supported.' % lbpack)
@@ -899,26 +1097,28 @@ class PPField(object):
         # TODO #577 What calendar to return when ibtim.ic in [0, 3]
         return iris.unit.CALENDAR_GREGORIAN if self.lbtim.ic != 2 else iris.unit.CALENDAR_360_DAY
 
-    def _read_extra_data(self, pp_file, file_reader, extra_len):
-        """Read the extra data section and update the self appropriately."""
+    def _read_extra_data(self, extra_data):
+        """Decode the given extra data bytes and update the self appropriately."""
         
         # While there is still extra data to decode run this loop
-        while extra_len > 0:
-            extra_int_code = struct.unpack_from('>L', file_reader(PP_WORD_DEPTH))[0]
-            extra_len -= PP_WORD_DEPTH
+        offset = 0
+        while offset < len(extra_data):
+            extra_int_code = struct.unpack_from('>L', extra_data, offset)[0]
+            offset += PP_WORD_DEPTH
             
             ib = extra_int_code % 1000
             ia = extra_int_code // 1000
             
             data_len = ia * PP_WORD_DEPTH
+            data_bytes = extra_data[offset:offset + data_len]
 
             if ib == 10:
-                self.field_title = ''.join(struct.unpack_from('>%dc' % data_len, file_reader(data_len))).rstrip('\00')
+                self.field_title = data_bytes.rstrip('\00')
             elif ib == 11:
-                self.domain_title = ''.join(struct.unpack_from('>%dc' % data_len, file_reader(data_len))).rstrip('\00')
+                self.domain_title = data_bytes.rstrip('\00')
             elif ib in EXTRA_DATA:
                 attr_name = EXTRA_DATA[ib]
-                values = numpy.fromfile(pp_file, dtype=numpy.dtype('>f%d' % PP_WORD_DEPTH), count=ia)
+                values = numpy.fromstring(data_bytes, dtype=numpy.dtype('>f%d' % PP_WORD_DEPTH))
                 # Ensure the values are in the native byte order
                 if not values.dtype.isnative:
                     values.byteswap(True)
@@ -927,7 +1127,7 @@ class PPField(object):
             else:
                 raise ValueError('Unknown IB value for extra data: %s' % ib)
             
-            extra_len -= data_len
+            offset += data_len
             
     @property
     def x_bounds(self):
@@ -1310,18 +1510,167 @@ PP_CLASSES = {
 }
 
 
+def _header_items(header_defn):
+    """
+    Returns the (name, index or slice) pairs which extract each header
+    value of the given zero-indexed header definition from the header values.
+
+    """
+    return [(name, loc[0] if len(loc) == 1 else slice(loc[0], loc[-1] + 1))
+            for name, loc in header_defn]
+
+
+# A map from header-release-number to the header items of its PP field class.
+_HEADER_ITEMS = {lbrel: _header_items(pp_class.HEADER_DEFN)
+                 for lbrel, pp_class in PP_CLASSES.iteritems()}
+
+
+def _header_columns():
+    """
+    Returns a map from header name to the index or slice of its value(s)
+    within the header values, for all header releases. The individual words
+    of multi-word headers are also mapped, by their name suffixed with their
+    zero-based index.
+
+    """
+    columns = {}
+    for um_header in UM_HEADERS.itervalues():
+        for name, positions in um_header:
+            indices = [position - UM_TO_PP_HEADER_OFFSET for position in positions]
+            if len(indices) == 1:
+                columns[name] = indices[0]
+            else:
+                columns[name] = slice(indices[0], indices[-1] + 1)
+                for i, index in enumerate(indices):
+                    columns['%s%d' % (name, i)] = index
+    return columns
+
+
+# A map from header name to the index or slice of its value(s).
+_HEADER_COLUMNS = _header_columns()
+
+
+class PPFieldCollection(object):
+    """
+    A collection of the fields of a PP file, held as a structured array of
+    their raw headers, which only creates a :class:`PPField` when it is
+    accessed.
+
+    The values of each header across the whole collection are available as
+    an array attribute named after the header, with the individual words of
+    multi-word headers also available by their zero-based index. Indexing a
+    collection with an integer returns a :class:`PPField`, whilst indexing
+    with a slice, index array or boolean array returns a sub-collection.
+
+    For example, to select the fields of STASH item 16203::
+
+        collection = PPFieldCollection.from_file(filename)
+        for field in collection[collection.lbuser3 == 16203]:
+            print field
+
+    """
+    def __init__(self, filename, headers, data_offsets, data_lens, extras):
+        """
+        Create a collection of the fields of a PP file.
+
+        Args:
+
+        * filename (string):
+            The name of the PP file.
+        * headers (:class:`numpy.ndarray`):
+            The structured array of raw headers, of :data:`_HEADER_DTYPE`.
+        * data_offsets (sequence of int):
+            The position of the payload of each field in bytes.
+        * data_lens (sequence of int):
+            The length of the payload of each field in bytes.
+        * extras (sequence of string):
+            The raw bytes of the extra data of each field.
+
+        """
+        self.filename = filename
+        self.headers = headers
+        self.data_offsets = numpy.asarray(data_offsets, dtype=numpy.int64)
+        self.data_lens = numpy.asarray(data_lens, dtype=numpy.int64)
+        self.extras = numpy.empty(len(headers), dtype=object)
+        self.extras[:] = list(extras)
+
+    @classmethod
+    def from_file(cls, filename):
+        """
+        Return the collection of the fields of the given PP file.
+
+        The header index of the file is used when
+        :data:`iris.config.PP_INDEX_DIR` is set.
+
+        """
+        if iris.config.PP_INDEX_DIR is not None:
+            records = _indexed_records(filename)
+            headers = numpy.empty(len(records), dtype=_HEADER_DTYPE)
+            for i, record in enumerate(records):
+                headers[i] = record[:2]
+            data_offsets = [record[2] for record in records]
+            data_lens = [record[3] for record in records]
+            extras = [record[4] for record in records]
+        else:
+            with open(filename, 'rb') as pp_file:
+                chunks = list(_scan_chunks(pp_file))
+            headers = numpy.concatenate([numpy.empty(0, dtype=_HEADER_DTYPE)] +
+                                        [chunk[0] for chunk in chunks])
+            data_offsets = list(itertools.chain.from_iterable(chunk[1] for chunk in chunks))
+            data_lens = list(itertools.chain.from_iterable(chunk[2] for chunk in chunks))
+            extras = list(itertools.chain.from_iterable(chunk[3] for chunk in chunks))
+        return cls(filename, headers, data_offsets, data_lens, extras)
+
+    def __len__(self):
+        return len(self.headers)
+
+    def __getattr__(self, name):
+        try:
+            item = _HEADER_COLUMNS[name]
+        except KeyError:
+            raise AttributeError('%r object has no attribute %r' % (type(self).__name__, name))
+        if isinstance(item, slice):
+            index = item.start
+        else:
+            index = item
+        if index < NUM_LONG_HEADERS:
+            values = self.headers['longs']
+        else:
+            values = self.headers['floats']
+            if isinstance(item, slice):
+                item = slice(item.start - NUM_LONG_HEADERS, item.stop - NUM_LONG_HEADERS)
+            else:
+                item -= NUM_LONG_HEADERS
+        values = values[:, item]
+        # Ensure the values are in the native byte order
+        return values.astype(values.dtype.newbyteorder('='))
+
+    def __getitem__(self, key):
+        if isinstance(key, (int, long, numpy.integer)):
+            record = (self.headers['longs'][key], self.headers['floats'][key],
+                      int(self.data_offsets[key]), int(self.data_lens[key]),
+                      self.extras[key])
+            return _make_field(self.filename, record)
+        return PPFieldCollection(self.filename, self.headers[key],
+                                 self.data_offsets[key], self.data_lens[key],
+                                 self.extras[key])
+
+    def __iter__(self):
+        for i in xrange(len(self)):
+            yield self[i]
+
+    def __repr__(self):
+        return '<PPFieldCollection of %d fields from %r>' % (len(self), self.filename)
+
+
 def make_pp_field(header_values):
     # Choose a PP field class from the value of LBREL
     lbrel = header_values[21]
     if lbrel not in PP_CLASSES:
         raise ValueError('Unsupported header release number: {}'.format(lbrel))
     pp_field = PP_CLASSES[lbrel]()
-    for name, loc in pp_field.HEADER_DEFN:
-        if len(loc) == 1:
-            value = header_values[loc[0]]
-        else:
-            value = header_values[loc[0]:loc[-1]+1]
-        setattr(pp_field, name, value)
+    for name, item in _HEADER_ITEMS[lbrel]:
+        setattr(pp_field, name, header_values[item])
     return pp_field
 
 
@@ -1344,78 +1693,301 @@ def load(filename, read_data=False):
         for field in iris.fileformats.pp.load(filename):
             print field
     
+    When :data:`iris.config.PP_INDEX_DIR` is set, the headers of a file loaded
+    without its data are read from a persistent index of the file, which is
+    (re-)built whenever the path, size or modification time of the file change.
+
     """
     
-    pp_file = open(filename, 'rb')
-        
-    # Get a reference to the seek method on the file
-    # (this is accessed 3* #number of headers so can provide a small performance boost)
-    pp_file_seek = pp_file.seek
-    pp_file_read = pp_file.read
-        
-    # Keep reading until we reach the end of file
+    if iris.config.PP_INDEX_DIR is not None and not read_data:
+        return _load_indexed(filename)
+    return _load_scanned(filename, read_data)
+
+
+# The positions, within the long header values, of the record length and
+# extra data length words (common to all header releases).
+_LBLREC = dict(UM_HEADER_3)['lblrec'][0] - UM_TO_PP_HEADER_OFFSET
+_LBEXT = dict(UM_HEADER_3)['lbext'][0] - UM_TO_PP_HEADER_OFFSET
+
+# The raw layout of a PP header.
+_HEADER_DTYPE = numpy.dtype([('longs', '>i%d' % PP_WORD_DEPTH, (NUM_LONG_HEADERS, )),
+                             ('floats', '>f%d' % PP_WORD_DEPTH, (NUM_FLOAT_HEADERS, ))])
+
+# The depth, in bytes, of the header record and the data record length word
+# which precede each payload.
+_FIELD_PREAMBLE_DEPTH = PP_WORD_DEPTH + PP_HEADER_DEPTH + 2 * PP_WORD_DEPTH
+
+# The depth, in bytes, of the chunks of a PP file read when scanning headers.
+_SCAN_CHUNK_DEPTH = 8 * 1024 * 1024
+
+
+def _scan_records(pp_file):
+    """
+    Generate a record of each field within the given open PP file, without
+    decoding the field payloads.
+
+    Each record is a (header_longs, header_floats, data_offset, data_len,
+    extra_data) tuple of the raw header arrays, the position and length of
+    the payload in bytes, and the raw bytes of any extra data.
+
+    """
+    for headers, data_offsets, data_lens, extras in _scan_chunks(pp_file):
+        longs = headers['longs']
+        floats = headers['floats']
+        for i, extra_data in enumerate(extras):
+            yield longs[i], floats[i], data_offsets[i], data_lens[i], extra_data
+
+
+def _scan_chunks(pp_file):
+    """
+    Generate the fields within the given open PP file, in runs which share
+    a chunk of the file.
+
+    Each chunk of the file is read in one go, and its Fortran record markers
+    walked to locate the fields which start within it. The headers of those
+    fields are then gathered into a structured array of :data:`_HEADER_DTYPE`
+    in a single step. Payloads which extend beyond the chunk are skipped by
+    starting the next chunk at the following field. A field too large to
+    share a chunk is read on its own, as just its header and extra data.
+
+    Each run is a (headers, data_offsets, data_lens, extras) tuple.
+
+    """
+    header_span = numpy.arange(PP_HEADER_DEPTH) + PP_WORD_DEPTH
+    chunk_position = pp_file.tell()
     while True:
-        # Move past the leading header length word
-        pp_file_seek(PP_WORD_DEPTH, os.SEEK_CUR)
-        # Get the LONG header entries
-        header_longs = numpy.fromfile(pp_file, dtype='>i%d' % PP_WORD_DEPTH, count=NUM_LONG_HEADERS)
-        # Nothing returned => EOF
-        if len(header_longs) == 0:
+        pp_file.seek(chunk_position, os.SEEK_SET)
+        chunk = pp_file.read(_FIELD_PREAMBLE_DEPTH)
+        if not chunk:
             break
-        # Get the FLOAT header entries
-        header_floats = numpy.fromfile(pp_file, dtype='>f%d' % PP_WORD_DEPTH, count=NUM_FLOAT_HEADERS)
-        # Ensure the values are in the native byte order
-        if False and not header_longs.dtype.isnative:
-            header_longs.byteswap(True)
-            header_longs.dtype = header_longs.dtype.newbyteorder('=')
-            header_floats.byteswap(True)
-            header_floats.dtype = header_floats.dtype.newbyteorder('=')
-        header = tuple(header_longs) + tuple(header_floats)
-
-        # Make a PPField of the appropriate sub-class (depends on header release number)
-        pp_field = make_pp_field(header)
-        
-        # Skip the trailing 4-byte word containing the header length
-        pp_file_seek(PP_WORD_DEPTH, os.SEEK_CUR)
-        
-        # Read the word telling me how long the data + extra data is
-        # This value is # of bytes
-        len_of_data_plus_extra = struct.unpack_from('>L', pp_file_read(PP_WORD_DEPTH))[0]
-        if len_of_data_plus_extra != pp_field.lblrec * PP_WORD_DEPTH:
-            raise ValueError('LBLREC has a different value to the integer recorded after the '
-                             'header in the file (%s and %s).' % (pp_field.lblrec * PP_WORD_DEPTH, 
-                                                                  len_of_data_plus_extra))
-        
-        # calculate the extra length in bytes
-        extra_len = pp_field.lbext * PP_WORD_DEPTH
-        
-        # Derive size and datatype of payload
-        data_len = len_of_data_plus_extra - extra_len
-        data_type = LBUSER_DTYPE_LOOKUP.get(pp_field.lbuser[0], LBUSER_DTYPE_LOOKUP['default'])
-        
-        data_shape = (pp_field.lbrow, pp_field.lbnpt)
+        if len(chunk) < _FIELD_PREAMBLE_DEPTH:
+            raise ValueError('Truncated PP field at byte %d.' % chunk_position)
+
+        # Only read a whole chunk when the first field does not fill it,
+        # otherwise its payload would be read just to be skipped.
+        lblrec, = struct.unpack_from('>i', chunk, PP_WORD_DEPTH * (1 + _LBLREC))
+        if _FIELD_PREAMBLE_DEPTH + (lblrec + 1) * PP_WORD_DEPTH < _SCAN_CHUNK_DEPTH:
+            pp_file.seek(chunk_position, os.SEEK_SET)
+            chunk = pp_file.read(_SCAN_CHUNK_DEPTH)
+
+        header_offsets = []
+        data_offsets = []
+        data_lens = []
+        extras = []
+        offset = 0
+        while offset + _FIELD_PREAMBLE_DEPTH <= len(chunk):
+            lblrec, = struct.unpack_from('>i', chunk, offset + PP_WORD_DEPTH * (1 + _LBLREC))
+            lbext, = struct.unpack_from('>i', chunk, offset + PP_WORD_DEPTH * (1 + _LBEXT))
+            # Read the word telling me how long the data + extra data is
+            # This value is # of bytes
+            len_of_data_plus_extra, = struct.unpack_from('>L', chunk,
+                                                         offset + _FIELD_PREAMBLE_DEPTH - PP_WORD_DEPTH)
+            if len_of_data_plus_extra != lblrec * PP_WORD_DEPTH:
+                raise ValueError('LBLREC has a different value to the integer recorded after the '
+                                 'header in the file (%s and %s).' % (lblrec * PP_WORD_DEPTH, 
+                                                                      len_of_data_plus_extra))
+            extra_len = lbext * PP_WORD_DEPTH
+            data_len = len_of_data_plus_extra - extra_len
+            data_offset = offset + _FIELD_PREAMBLE_DEPTH
+            extra_offset = data_offset + data_len
+            if extra_offset + extra_len <= len(chunk):
+                extra_data = chunk[extra_offset:extra_offset + extra_len]
+            else:
+                pp_file.seek(chunk_position + extra_offset, os.SEEK_SET)
+                extra_data = pp_file.read(extra_len)
 
-        if read_data:
-            pp_field._data = pp_field.read_data(pp_file, data_len, data_shape, data_type)
-            pp_field._data_manager = None
-        else:
-            # NB. This makes a 0-dimensional array
-            pp_field._data = numpy.array(PPDataProxy(filename, pp_file.tell(), data_len, pp_field.lbpack))
-            pp_field._data_manager = iris.fileformats.manager.DataManager(data_shape, data_type, pp_field.bmdi)
+            header_offsets.append(offset)
+            data_offsets.append(chunk_position + data_offset)
+            data_lens.append(data_len)
+            extras.append(extra_data)
 
-            # Skip the data
-            pp_file_seek(data_len, os.SEEK_CUR)
+            # Skip the trailing word containing the length of the field
+            offset = extra_offset + extra_len + PP_WORD_DEPTH
 
-        # Do we have any extra data to deal with?
-        if extra_len:
-            pp_field._read_extra_data(pp_file, pp_file_read, extra_len)
+        # Gather all the headers of the chunk at once.
+        header_bytes = numpy.frombuffer(chunk, dtype=numpy.uint8)
+        header_index = numpy.array(header_offsets)[:, numpy.newaxis] + header_span
+        headers = header_bytes[header_index].view(_HEADER_DTYPE)[:, 0]
+        yield headers, data_offsets, data_lens, extras
 
-        # Skip that last 4 byte record telling me the length of the field I have already read
-        pp_file_seek(PP_WORD_DEPTH, os.SEEK_CUR)
+        chunk_position += offset
+
+
+def _make_field(filename, record, pp_file=None):
+    """
+    Return the PPField described by the given record of the given file,
+    as generated by :func:`_scan_records`.
+
+    The payload is read from the open ``pp_file``, if given, otherwise it
+    is deferred.
+
+    """
+    header_longs, header_floats, data_offset, data_len, extra_data = record
+    header = tuple(header_longs) + tuple(header_floats)
+
+    # Make a PPField of the appropriate sub-class (depends on header release number)
+    pp_field = make_pp_field(header)
+
+    # Derive size and datatype of payload
+    data_type = LBUSER_DTYPE_LOOKUP.get(pp_field.lbuser[0], LBUSER_DTYPE_LOOKUP['default'])
+    data_shape = (pp_field.lbrow, pp_field.lbnpt)
+
+    if pp_file is not None:
+        position = pp_file.tell()
+        pp_file.seek(data_offset, os.SEEK_SET)
+        pp_field._data = pp_field.read_data(pp_file, data_len, data_shape, data_type)
+        pp_field._data_manager = None
+        pp_file.seek(position, os.SEEK_SET)
+    else:
+        # NB. This makes a 0-dimensional array
+        pp_field._data = numpy.array(PPDataProxy(filename, data_offset, data_len, pp_field.lbpack))
+        pp_field._data_manager = iris.fileformats.manager.DataManager(data_shape, data_type, pp_field.bmdi)
+
+    # Do we have any extra data to deal with?
+    if extra_data:
+        pp_field._read_extra_data(extra_data)
+
+    return pp_field
+
+
+def _load_scanned(filename, read_data):
+    """Generate the PPFields of the given file by scanning it."""
+    with open(filename, 'rb') as pp_file:
+        for record in _scan_records(pp_file):
+            yield _make_field(filename, record, pp_file if read_data else None)
 
-        yield pp_field
-        
-    pp_file.close()
+
+def _load_indexed(filename):
+    """
+    Generate the PPFields, with deferred data, of the given file from its
+    header index, first (re-)building the index if it is missing or out of
+    date.
+
+    """
+    for record in _indexed_records(filename):
+        yield _make_field(filename, record)
+
+
+def _indexed_records(filename):
+    """
+    Return the list of records of the given file from its header index,
+    first (re-)building the index if it is missing or out of date.
+
+    """
+    key = _index_key(filename)
+    records = _read_index(key)
+    if records is None:
+        with open(filename, 'rb') as pp_file:
+            records = list(_scan_records(pp_file))
+        _write_index(key, records)
+    return records
+
+
+def _index_key(filename):
+    """
+    Return the (path, size, modification time) which identifies the current
+    content of the given file.
+
+    """
+    path = os.path.abspath(filename)
+    stat = os.stat(path)
+    return path, stat.st_size, stat.st_mtime
+
+
+def _index_path(path):
+    """Return the path of the header index of the given absolute file path."""
+    digest = hashlib.md5(path).hexdigest()
+    return os.path.join(iris.config.PP_INDEX_DIR, digest + '.npz')
+
+
+def _read_index(key):
+    """
+    Return the list of records held by the header index of the file with
+    the given key, or None if there is no valid index for that key.
+
+    """
+    path, size, mtime = key
+    try:
+        with open(_index_path(path), 'rb') as index_file:
+            index = numpy.load(index_file)
+            if (index['path'] != path or index['size'] != size or
+                    index['mtime'] != mtime):
+                return None
+            extra_ends = numpy.cumsum(index['extra_lengths'])
+            extra = index['extra'].tostring()
+            records = []
+            for i, (header_longs, header_floats, data_offset, data_len) in \
+                    enumerate(itertools.izip(index['longs'], index['floats'],
+                                             index['offsets'], index['lengths'])):
+                extra_data = extra[extra_ends[i] - index['extra_lengths'][i]:extra_ends[i]]
+                records.append((header_longs, header_floats, int(data_offset),
+                                int(data_len), extra_data))
+    except (IOError, KeyError, ValueError, zipfile.BadZipfile):
+        return None
+    return records
+
+
+def _write_index(key, records):
+    """
+    Write the header index of the file with the given key, holding the
+    given records.
+
+    The index is written to a temporary file which is then renamed, so
+    concurrent readers never see a partial index. Failure to write the
+    index is reported as a warning, and the temporary file removed.
+
+    """
+    path, size, mtime = key
+    longs = numpy.empty((len(records), NUM_LONG_HEADERS), dtype='>i%d' % PP_WORD_DEPTH)
+    floats = numpy.empty((len(records), NUM_FLOAT_HEADERS), dtype='>f%d' % PP_WORD_DEPTH)
+    for i, record in enumerate(records):
+        longs[i], floats[i] = record[:2]
+    temp_path = None
+    try:
+        fd, temp_path = tempfile.mkstemp(dir=iris.config.PP_INDEX_DIR)
+        with os.fdopen(fd, 'wb') as index_file:
+            numpy.savez(index_file, path=path, size=size, mtime=mtime,
+                        longs=longs, floats=floats,
+                        offsets=numpy.array([record[2] for record in records], dtype=numpy.int64),
+                        lengths=numpy.array([record[3] for record in records], dtype=numpy.int64),
+                        extra=numpy.fromstring(''.join(record[4] for record in records), dtype=numpy.uint8),
+                        extra_lengths=numpy.array([len(record[4]) for record in records], dtype=numpy.int64))
+        os.rename(temp_path, _index_path(path))
+    except (IOError, OSError), e:
+        warnings.warn('Unable to write the header index of %r: %s' % (path, e))
+    finally:
+        if temp_path is not None and os.path.exists(temp_path):
+            os.remove(temp_path)
+
+
+# The field attributes which commonly vary between fields which otherwise
+# share the same header, such as the successive times of a time series, and
+# so are left out of the rule signature of a field.
+_VARYING_ATTRIBUTES = ('lbyr', 'lbmon', 'lbdat', 'lbhr', 'lbmin', 'lbday', 'lbsec',
+                       'lbyrd', 'lbmond', 'lbdatd', 'lbhrd', 'lbmind', 'lbdayd', 'lbsecd',
+                       'lbft', 'lblrec', 'lbegin', 'lbnrec', 't1', 't2',
+                       'data', '_data', '_data_manager')
+
+
+def _rule_signature(field):
+    """
+    Returns a hashable signature of all the header values and extra data
+    of the given PP field, other than its varying attributes.
+
+    """
+    signature = [type(field)]
+    for name, positions in field.HEADER_DEFN:
+        if name not in _VARYING_ATTRIBUTES:
+            value = getattr(field, name)
+            if isinstance(value, SplittableInt):
+                value = int(value)
+            signature.append(value)
+    for name in EXTRA_DATA.itervalues():
+        value = getattr(field, name, None)
+        if isinstance(value, numpy.ndarray):
+            value = value.tostring()
+        signature.append(value)
+    return tuple(signature)
 
 
 def _ensure_load_rules_loaded():
@@ -1429,6 +2001,7 @@ def _ensure_load_rules_loaded():
     if _load_rules is None:
         basepath = iris.config.CONFIG_PATH
         _load_rules = rules.RulesContainer(os.path.join(basepath, 'pp_rules.txt'))
+        _load_rules.memoise(_rule_signature, _VARYING_ATTRIBUTES)
 
     if _cross_reference_rules is None:
         basepath = iris.config.CONFIG_PATH
@@ -1444,17 +2017,22 @@ def add_load_rules(filename):
     the order they were registered.
     
     """
+    # Uses this module-level variable
+    global _user_load_rules
+
     _ensure_load_rules_loaded()
     _load_rules.import_rules(filename)
+    _user_load_rules = True
 
 
 def reset_load_rules():
     """Resets the PP load process to use only the standard conversion rules."""
     
-    # Uses this module-level variable
-    global _load_rules
+    # Uses these module-level variables
+    global _load_rules, _user_load_rules
     
     _load_rules = None
+    _user_load_rules = False
 
 
 def _ensure_save_rules_loaded():
@@ -1490,7 +2068,7 @@ def reset_save_rules():
     _save_rules = None
 
 
-def load_cubes(filenames, callback=None):
+def load_cubes(filenames, callback=None, constraints=None):
     """
     Loads cubes from a list of pp filenames.
     
@@ -1502,22 +2080,151 @@ def load_cubes(filenames, callback=None):
     
     * callback - a function which can be passed on to :func:`iris.io.run_callback`
     
+    * constraints - the load constraints, with which the fields that cannot
+      match any of them are skipped before the load rules are run. Only the
+      STASH attribute, and the time, forecast_period, model_level_number and
+      pressure coordinates, are judged from the field headers, and only when
+      there is no callback and no user load rules. The resultant cubes must
+      still be filtered by the constraints.
+    
     .. note:: 
         The resultant cubes may not be in the order that they are in the file (order 
         is not preserved when there is a field with orography references)
          
     """
-    return _load_cubes_variable_loader(filenames, callback, load)
+    return _load_cubes_variable_loader(filenames, callback, load, constraints)
 
 
-def _load_cubes_variable_loader(filenames, callback, loading_function):
+def _load_cubes_variable_loader(filenames, callback, loading_function,
+                                constraints=None):
     _ensure_load_rules_loaded()
     rules = iris.fileformats.rules
+    # Callbacks and user rules may alter the cubes in ways which cannot be
+    # judged from the field headers.
+    if constraints is not None and callback is None and not _user_load_rules:
+        loading_function = _ConstrainedLoader(loading_function, constraints)
     pp_loader = rules.Loader(loading_function, _load_rules,
                              _cross_reference_rules, 'PP_LOAD')
     return rules.load_cubes(filenames, callback, pp_loader)
 
 
+class _ConstrainedLoader(object):
+    """
+    A field generating function which wraps the given one, skipping
+    the fields from which the standard load rules cannot produce a cube that
+    matches any of the given constraints, as judged from their headers.
+    
+    The fields which are the target of a cross-reference are always kept.
+    
+    """
+    def __init__(self, loading_function, constraints):
+        self.loading_function = loading_function
+        self.constraints = iris._constraints.list_of_constraints(constraints)
+
+    def __call__(self, filename):
+        _ensure_load_rules_loaded()
+        for field in self.loading_function(filename):
+            attributes = _header_attributes(field)
+            coord_cells = _HeaderCells(field)
+            if (any(constraint._may_match(attributes, coord_cells)
+                    for constraint in self.constraints) or
+                    _cross_reference_rules.matching_rules(field)):
+                yield field
+
+
+def _header_attributes(field):
+    """
+    Returns the cube attributes which the standard load rules derive from
+    the header of the given field, so far as they are used to judge load
+    constraints.
+    
+    """
+    attributes = {}
+    lbuser = field.lbuser
+    if lbuser[6] != 0 or (lbuser[3] / 1000) != 0 or (lbuser[3] % 1000) != 0:
+        attributes['STASH'] = field.stash
+    return attributes
+
+
+class _HeaderCells(object):
+    """
+    Provides the cells of the scalar coordinates which the standard load
+    rules derive from the header of a field, by coordinate name, so far as
+    they are used to judge load constraints.
+    
+    Each coordinate mirrors the corresponding load rule, and is only built
+    when it is asked for.
+    
+    """
+    def __init__(self, field):
+        self._field = field
+
+    def get(self, name):
+        """
+        Returns the :class:`iris.coords.Cell` of the named scalar coordinate
+        of the cube loaded from the field, or None if it is not known.
+        
+        """
+        coord = None
+        coord_method = getattr(self, '_' + name, None)
+        if coord_method is not None:
+            coord = coord_method()
+        if coord is not None:
+            coord = coord.cell(0)
+        return coord
+
+    def _cross_section(self, codes):
+        lbcode = self._field.lbcode
+        return len(lbcode) == 5 and (lbcode.ix in codes or lbcode.iy in codes)
+
+    def _time(self):
+        f = self._field
+        coord = None
+        if not self._cross_section([20, 21, 22, 23]):
+            if f.lbtim.ia == 0 and f.lbtim.ib in [0, 1] and f.lbtim.ic in [1, 2, 3]:
+                coord = iris.coords.DimCoord(f.time_unit('hours').date2num(f.t1),
+                                             standard_name='time',
+                                             units=f.time_unit('hours'))
+            elif f.lbtim.ib in [2, 3] and f.lbtim.ic in [1, 2]:
+                coord = iris.coords.DimCoord((f.time_unit('hours').date2num(f.t1) +
+                                              f.time_unit('hours').date2num(f.t2)) / 2.0,
+                                             standard_name='time',
+                                             units=f.time_unit('hours'),
+                                             bounds=f.time_unit('hours').date2num([f.t1, f.t2]))
+        return coord
+
+    def _forecast_period(self):
+        f = self._field
+        coord = None
+        if not self._cross_section([20, 21, 22, 23]):
+            if f.lbtim.ia == 0 and f.lbtim.ib == 1 and f.lbtim.ic in [1, 2, 3]:
+                coord = iris.coords.DimCoord(f.time_unit('hours', f.t2).date2num(f.t1),
+                                             standard_name='forecast_period',
+                                             units='hours')
+            elif f.lbtim.ib in [2, 3] and f.lbtim.ic in [1, 2]:
+                coord = iris.coords.DimCoord(f.lbft, standard_name='forecast_period',
+                                             units='hours')
+        return coord
+
+    def _model_level_number(self):
+        f = self._field
+        coord = None
+        if f.lbvc == 2 and len(f.lbcode) != 5:
+            coord = iris.coords.DimCoord(f.lblev, standard_name='model_level_number',
+                                         attributes={'positive': 'down'})
+        elif f.lbvc == 65:
+            coord = iris.coords.AuxCoord(f.lblev, standard_name='model_level_number',
+                                         attributes={'positive': 'up'})
+        return coord
+
+    def _pressure(self):
+        f = self._field
+        coord = None
+        if f.lbvc == 8 and not self._cross_section([1]):
+            coord = iris.coords.DimCoord(f.blev, long_name='pressure', units='hPa')
+        return coord
+
+
 def save(cube, target, append=False, field_coords=None):
     """
     Use the PP saving rules (and any user rules) to save a cube to a PP file.
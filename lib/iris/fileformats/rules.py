@@ -20,7 +20,9 @@ Processing of simple IF-THEN rules.
 """
 
 import abc
+import ast
 import collections
+import cPickle
 import getpass
 import logging
 import logging.handlers as handlers
@@ -28,6 +30,7 @@ import operator
 import os
 import os.path
 import platform
+import re
 import sys
 import types
 import warnings
@@ -37,6 +40,7 @@ import numpy
 import iris.config as config
 import iris.cube
 import iris.exceptions
+import iris.fileformats.manager
 import iris.fileformats.mosig_cf_map
 import iris.fileformats.um_cf_map
 import iris.unit
@@ -349,9 +353,12 @@ class Rule(object):
         """Simple wrapper onto evaluates_true in the case where cube is None."""
         return self.evaluates_true(None, field)
         
-    def run_actions(self, cube, field):
+    def run_actions(self, cube, field, action_results=None):
         """
         Adds to the given cube based on the return values of all the actions.
+
+        If a list of action_results is given, the return value of each
+        action which was successfully added to the cube is appended to it.
     
         """
         # Deferred import of all the symbols from iris.coords.
@@ -381,6 +388,8 @@ class Rule(object):
                 action_factory = self._process_action_result(obj, cube)
                 if action_factory:
                     factories.append(action_factory)
+                if action_results is not None:
+                    action_results.append(obj)
 
             except iris.exceptions.CoordinateNotFoundError, err:
                 print >> sys.stderr, 'Failed (msg:%(error)s) to find coordinate, perhaps consider running last: %(command)s' % {'command':action, 'error': err}
@@ -455,7 +464,7 @@ class FunctionRule(Rule):
 
 class ObjectReturningRule(FunctionRule):
     """A rule which returns a list of objects when its actions are run.""" 
-    def run_actions(self, cube, field):
+    def run_actions(self, cube, field, action_results=None):
         f = pp = grib = field
         cm = cube
         return [action(field, f, pp, grib, cm) for action in self._exec_actions]
@@ -481,11 +490,231 @@ class ProcedureRule(Rule):
             warnings.warn(warning)
 
 
+# Matches a condition which simply tests a field header key for equality
+# with, or membership of, a literal, e.g. "f.lbuser[3] == 16203" or
+# "grib.edition in [1, 2]".
+_SIMPLE_CONDITION = re.compile(r'^\s*(?:f|pp|grib|field)(?P<key>(?:\.\w+|\[\d+\])+)'
+                               r'\s*(?P<operator>==|in)\s+(?P<literal>.+?)\s*$')
+
+# The types of header value which hash consistently with their equality,
+# and so can be looked up in a rule index.
+_HASHABLE_TYPES = (int, long, float, basestring, numpy.number, numpy.bool_)
+
+
+def _simple_tests(rule):
+    """
+    Return a dictionary mapping each header key, e.g. '.lbuser[3]', which
+    is simply tested by the conditions of the given rule to the list of
+    literal values which it must equal for the conditions to hold.
+
+    """
+    tests = {}
+    for condition in rule._conditions:
+        match = _SIMPLE_CONDITION.match(condition)
+        if match is None:
+            continue
+        try:
+            literal = ast.literal_eval(match.group('literal'))
+        except (ValueError, SyntaxError):
+            continue
+        if match.group('operator') == '==':
+            values = [literal]
+        elif isinstance(literal, (list, tuple)):
+            values = list(literal)
+        else:
+            continue
+        try:
+            map(hash, values)
+        except TypeError:
+            continue
+        if match.group('key') not in tests:
+            tests[match.group('key')] = values
+    return tests
+
+
+class _RuleIndex(object):
+    """
+    A decision tree over an ordered list of rules, on the field header keys
+    which their conditions simply test against literal values.
+
+    Each node of the tree splits its rules on the key most commonly tested
+    amongst them, into a branch for each tested value and a branch for the
+    rules which do not test that key. Given a field, each key is evaluated
+    at most once, and only the rules in the branches which the field
+    follows are candidates for having their full conditions evaluated.
+
+    """
+    # Marks a key which could not be evaluated for a field.
+    _FAILED = object()
+
+    def __init__(self, rules):
+        self._rules = rules
+        self._key_functions = {}
+        entries = [(position, _simple_tests(rule)) for position, rule in enumerate(rules)]
+        self._root = self._node(entries)
+
+    def _node(self, entries):
+        """
+        Return the node of the tree for the given (position, tests) entries,
+        as a tuple of (positions, key, value_nodes, rest_node).
+
+        """
+        positions = [position for position, tests in entries]
+        key_counts = collections.Counter(key for position, tests in entries for key in tests)
+        if not key_counts:
+            return positions, None, None, None
+
+        key = max(sorted(key_counts), key=key_counts.get)
+        if key not in self._key_functions:
+            self._key_functions[key] = eval('lambda f: f' + key)
+        value_entries = collections.defaultdict(list)
+        rest_entries = []
+        for position, tests in entries:
+            if key in tests:
+                remaining_tests = dict(tests)
+                for value in remaining_tests.pop(key):
+                    value_entries[value].append((position, remaining_tests))
+            else:
+                rest_entries.append((position, tests))
+
+        value_nodes = {value: self._node(value_entries[value]) for value in value_entries}
+        rest_node = self._node(rest_entries) if rest_entries else None
+        return positions, key, value_nodes, rest_node
+
+    def candidates(self, field):
+        """Return the rules which may match the given field, in their original order."""
+        positions = set()
+        self._collect(self._root, field, {}, positions)
+        return [self._rules[position] for position in sorted(positions)]
+
+    def _collect(self, node, field, key_values, positions):
+        """Add the positions of the candidate rules of the given node to positions."""
+        node_positions, key, value_nodes, rest_node = node
+        if key is None:
+            positions.update(node_positions)
+            return
+
+        value = key_values.get(key)
+        if value is None:
+            try:
+                value = self._key_functions[key](field)
+            except Exception:
+                value = self._FAILED
+            key_values[key] = value
+
+        if value is self._FAILED:
+            # Leave the rule conditions to decide.
+            positions.update(node_positions)
+            return
+
+        if isinstance(value, _HASHABLE_TYPES):
+            value_node = value_nodes.get(value)
+            if value_node is not None:
+                self._collect(value_node, field, key_values, positions)
+        else:
+            for literal, value_node in value_nodes.iteritems():
+                try:
+                    candidate = bool(value == literal)
+                except Exception:
+                    candidate = True
+                if candidate:
+                    self._collect(value_node, field, key_values, positions)
+
+        if rest_node is not None:
+            self._collect(rest_node, field, key_values, positions)
+
+
+def _shared_result(obj):
+    """
+    Return an equivalent of the given action result which may be added to
+    another cube.
+
+    """
+    if isinstance(obj, CoordAndDims):
+        obj = CoordAndDims(obj.coord._shared_copy(), list(obj.dims))
+    return obj
+
+
+class _RuleMemo(object):
+    """
+    A bounded, least recently used, cache of the outcome of running a list
+    of rules for the fields which share a signature.
+
+    Fields with equal signatures are taken to match the same rules with the
+    same results, apart from the *varying* rules whose conditions or actions
+    refer to one of the named varying field attributes, or to the cube. The
+    plan cached for each signature lists the varying rules, which are run
+    afresh for every field, in order with the results of the other matching
+    rules, which are re-used.
+
+    """
+    def __init__(self, signature, varying_names, size):
+        self.signature = signature
+        self.varying_names = varying_names
+        self.size = size
+        patterns = [r'\bcm\b']
+        if varying_names:
+            patterns.append(r'\.(?:%s)\b' % '|'.join(map(re.escape, varying_names)))
+        self._varying_pattern = re.compile('|'.join(patterns))
+        self._varying = {}
+        self._plans = collections.OrderedDict()
+
+    def clear(self):
+        self._varying.clear()
+        self._plans.clear()
+
+    def is_varying(self, rule):
+        """Return whether the outcome of the given rule may differ between fields with equal signatures."""
+        varying = self._varying.get(rule)
+        if varying is None:
+            text = '\n'.join(list(rule._conditions) + list(rule._actions))
+            varying = bool(self._varying_pattern.search(text))
+            self._varying[rule] = varying
+        return varying
+
+    def plan(self, signature):
+        """Return the cached plan for the given signature, or None."""
+        plan = self._plans.pop(signature, None)
+        if plan is not None:
+            self._plans[signature] = plan
+        return plan
+
+    def add_plan(self, signature, plan):
+        if len(self._plans) >= self.size:
+            self._plans.popitem(last=False)
+        self._plans[signature] = plan
+
+
+# The rule sets unpickled in this process, by their definitions, so that
+# each distinct rule set is compiled at most once per worker process.
+_UNPICKLED_RULES = {}
+
+
+def _unpickle_rules(rule_type, definitions, memo):
+    """Return the :class:`RulesContainer` with the given pickled state."""
+    key = (rule_type, definitions, memo)
+    rules = _UNPICKLED_RULES.get(key)
+    if rules is None:
+        rules = RulesContainer(rule_type=rule_type)
+        rules._rules = [rule_type(list(conditions), list(actions))
+                        for conditions, actions in definitions]
+        if memo is not None:
+            rules.memoise(*memo)
+        _UNPICKLED_RULES[key] = rules
+    return rules
+
+
 class RulesContainer(object):
     """
     A collection of :class:`Rule` instances, with the ability to read rule
     definitions from files and run the rules against given fields.
     
+    The rules are indexed on the field header keys which they simply test,
+    so that only the rules which may match a field are evaluated for it.
+    The actions of a :class:`ProcedureRule` may change the field for the
+    later rules, so those rules are not indexed. The results of the rules
+    may also be memoised, see :meth:`memoise`.
+    
     """
     def __init__(self, filepath=None, rule_type=FunctionRule):
         """Create a new rule set, optionally adding rules from the specified file.
@@ -497,10 +726,24 @@ class RulesContainer(object):
         e.g for PP saving actions that do not return anything, such as *pp.lbuser[3] = 16203* 
         """
         self._rules = []
+        self._rule_index = None
+        self._memo = None
         self.rule_type = rule_type
         if filepath is not None:
             self.import_rules(filepath)
 
+    def __reduce__(self):
+        # The conditions and actions of the rules are compiled to methods,
+        # which cannot be pickled, so the rules are pickled by their
+        # definitions, and compiled afresh when they are unpickled.
+        definitions = tuple((tuple(rule._conditions), tuple(rule._actions))
+                            for rule in self._rules)
+        memo = None
+        if self._memo is not None:
+            memo = (self._memo.signature, self._memo.varying_names,
+                    self._memo.size)
+        return _unpickle_rules, (self.rule_type, definitions, memo)
+
     def import_rules(self, filepath):
         """Extend the rule collection with the rules defined in the specified file."""
         # Define state constants
@@ -509,6 +752,9 @@ class RulesContainer(object):
         
         rule_file = os.path.expanduser(filepath)
         file = open(rule_file, 'r')
+        self._rule_index = None
+        if self._memo is not None:
+            self._memo.clear()
         
         conditions = []
         actions = []
@@ -574,7 +820,44 @@ class RulesContainer(object):
         Returns: list of Rule instances
         
         """
-        return filter(lambda rule: rule._matches_field(field), self._rules)
+        return filter(lambda rule: rule._matches_field(field), self._candidate_rules(field))
+
+    def memoise(self, signature, varying_names=(), size=1000):
+        """
+        Re-use the results of this set of rules for the fields which share
+        a signature.
+
+        The coordinates and metadata produced for the first field with a
+        given signature are shared with the cubes of the later fields with
+        that signature. Only the rules whose conditions or actions refer to
+        one of the varying attributes of the field, such as its validity
+        time, or to the cube itself, are re-run for each field.
+
+        Args:
+
+        * signature:
+            A function which returns a hashable signature for a field. The
+            signature must capture every attribute of the field which the
+            rules may refer to, other than the varying attributes.
+
+        Kwargs:
+
+        * varying_names:
+            The names of the field attributes which may vary between fields
+            with equal signatures.
+        * size:
+            The maximum number of signatures to remember. Defaults to 1000.
+
+        """
+        self._memo = _RuleMemo(signature, tuple(varying_names), size)
+
+    def _candidate_rules(self, field):
+        """Return the rules which may match the given field, in order."""
+        if issubclass(self.rule_type, ProcedureRule):
+            return self._rules
+        if self._rule_index is None:
+            self._rule_index = _RuleIndex(self._rules)
+        return self._rule_index.candidates(field)
         
     def verify(self, cube, field):
         """
@@ -594,9 +877,12 @@ class RulesContainer(object):
         * matching_rules - a list of rules which matched
         
         """
+        if self._memo is not None:
+            return self._memoised_verify(cube, field)
+
         matching_rules = []
         factories = []
-        for rule in self._rules:
+        for rule in self._candidate_rules(field):
             if rule.evaluates_true(cube, field):
                 matching_rules.append(rule)
                 rule_factories = rule.run_actions(cube, field)
@@ -604,6 +890,44 @@ class RulesContainer(object):
                     factories.extend(rule_factories)
         return RuleResult(cube, matching_rules, factories)
 
+    def _memoised_verify(self, cube, field):
+        """As :meth:`verify`, but re-using the plan for the signature of the field."""
+        memo = self._memo
+        signature = memo.signature(field)
+        plan = memo.plan(signature)
+
+        matching_rules = []
+        factories = []
+        if plan is None:
+            # Run the rules in full, recording the plan for later fields.
+            plan = []
+            candidates = set(self._candidate_rules(field))
+            for rule in self._rules:
+                if memo.is_varying(rule):
+                    plan.append((rule, None))
+                    if rule in candidates and rule.evaluates_true(cube, field):
+                        matching_rules.append(rule)
+                        factories.extend(rule.run_actions(cube, field) or [])
+                elif rule in candidates and rule.evaluates_true(cube, field):
+                    matching_rules.append(rule)
+                    results = []
+                    factories.extend(rule.run_actions(cube, field, results) or [])
+                    plan.append((rule, [_shared_result(obj) for obj in results]))
+            memo.add_plan(signature, plan)
+        else:
+            for rule, results in plan:
+                if results is None:
+                    if rule.evaluates_true(cube, field):
+                        matching_rules.append(rule)
+                        factories.extend(rule.run_actions(cube, field) or [])
+                else:
+                    matching_rules.append(rule)
+                    for obj in results:
+                        factory = rule._process_action_result(_shared_result(obj), cube)
+                        if factory:
+                            factories.append(factory)
+        return RuleResult(cube, matching_rules, factories)
+
 
 def scalar_coord(cube, coord_name):
     """Try to find a single-valued coord with the given name."""
@@ -749,6 +1073,77 @@ Loader = collections.namedtuple('Loader',
                                  'log_name'))
 
 
+def _file_results(filename, user_callback, loader):
+    """
+    Generate a (cube, factories, references) triple for each field of the
+    given file which is converted to a cube, where the factories are those
+    of the cube which need references, and the references are those for
+    which the cube is a source.
+
+    """
+    for field in loader.field_generator(filename):
+        # Convert the field to a Cube, logging the rules that were used
+        rules_result = loader.load_rules.result(field)
+        cube = rules_result.cube
+        log(loader.log_name, filename, rules_result.matching_rules)
+
+        cube = iris.io.run_callback(user_callback, cube, field, filename)
+
+        if cube is None:
+            continue
+
+        # Cross referencing
+        references = [rule.run_actions(cube, field)[0] for rule in
+                      loader.cross_ref_rules.matching_rules(field)]
+
+        yield cube, rules_result.factories, references
+
+
+def _load_file(task):
+    """
+    Load a single file within a worker, returning the list of its
+    (cube, factories, references) triples.
+
+    """
+    return list(_file_results(*task))
+
+
+def _picklable(obj):
+    """Return whether the given object can be pickled."""
+    try:
+        cPickle.dumps(obj, cPickle.HIGHEST_PROTOCOL)
+    except Exception:
+        return False
+    return True
+
+
+def _results(filenames, user_callback, loader):
+    """
+    Generate the (cube, factories, references) triples of the fields of the
+    given files, in order, loading the files concurrently when
+    :data:`iris.config.FILE_WORKERS` is two or more.
+
+    """
+    pool = None
+    if len(filenames) > 1:
+        pool = iris.fileformats.manager._file_pool()
+    if pool is not None and not _picklable((user_callback, loader)):
+        warnings.warn('The load callback or constraints cannot be pickled '
+                      'for the process pool, so the files are being loaded '
+                      'serially.')
+        pool = None
+
+    if pool is None:
+        for filename in filenames:
+            for result in _file_results(filename, user_callback, loader):
+                yield result
+    else:
+        tasks = [(filename, user_callback, loader) for filename in filenames]
+        for results in pool.imap(_load_file, tasks):
+            for result in results:
+                yield result
+
+
 def load_cubes(filenames, user_callback, loader):
     concrete_reference_targets = {}
     results_needing_reference = []
@@ -756,40 +1151,26 @@ def load_cubes(filenames, user_callback, loader):
     if isinstance(filenames, basestring):
         filenames = [filenames]
 
-    for filename in filenames:
-        for field in loader.field_generator(filename):
-            # Convert the field to a Cube, logging the rules that were used
-            rules_result = loader.load_rules.result(field)
-            cube = rules_result.cube
-            log(loader.log_name, filename, rules_result.matching_rules)
-
-            cube = iris.io.run_callback(user_callback, cube, field, filename)
-
-            if cube is None:
-                continue
-
-            # Cross referencing
-            rules = loader.cross_ref_rules.matching_rules(field)
-            for rule in rules:
-                reference, = rule.run_actions(cube, field)
-                name = reference.name
-                # Register this cube as a source cube for the named
-                # reference.
-                target = concrete_reference_targets.get(name)
-                if target is None:
-                    target = ConcreteReferenceTarget(name, reference.transform)
-                    concrete_reference_targets[name] = target
-                target.add_cube(cube)
-
-            if rules_result.factories:
-                results_needing_reference.append(rules_result)
-            else:
-                yield cube
+    for cube, factories, references in _results(filenames, user_callback,
+                                                loader):
+        for reference in references:
+            name = reference.name
+            # Register this cube as a source cube for the named
+            # reference.
+            target = concrete_reference_targets.get(name)
+            if target is None:
+                target = ConcreteReferenceTarget(name, reference.transform)
+                concrete_reference_targets[name] = target
+            target.add_cube(cube)
+
+        if factories:
+            results_needing_reference.append((cube, factories))
+        else:
+            yield cube
 
     regrid_cache = {}
-    for result in results_needing_reference:
-        cube = result.cube
-        for factory in result.factories:
+    for cube, factories in results_needing_reference:
+        for factory in factories:
             try:
                 args = _dereference_args(factory, concrete_reference_targets,
                                          regrid_cache, cube)
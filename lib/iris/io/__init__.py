@@ -195,9 +195,12 @@ def decode_uri(uri, default='file'):
     return scheme, part
 
 
-def load_files(filenames, callback):
+def load_files(filenames, callback, constraints=None):
     """
     Takes a list of filenames which may also be globs, and optionally a callback function, and returns a generator of Cubes from the given files.
+
+    Any load constraints are passed on to those format handlers which are able to use them to skip loading
+    cubes which cannot match any of the constraints. The returned cubes must still be filtered by the constraints.
     
     .. note:: 
         Typically, this function should not be called directly; instead, the intended interface for loading is :func:`iris.load`.
@@ -223,7 +226,11 @@ def load_files(filenames, callback):
     
     # Call each iris format handler with the approriate filenames
     for handling_format_spec, fnames in handler_map.iteritems():
-        for cube in handling_format_spec.handler(fnames, callback):
+        if constraints is not None and handling_format_spec.constraint_aware:
+            cubes = handling_format_spec.handler(fnames, callback, constraints)
+        else:
+            cubes = handling_format_spec.handler(fnames, callback)
+        for cube in cubes:
             yield cube
 
 
@@ -335,6 +342,10 @@ def save(source, target, saver=None, **kwargs):
         # Save a cube to netCDF using NETCDF3 file format
         iris.io.save(my_cube, "myfile.nc", netcdf_format="NETCDF3_CLASSIC")
 
+        # Save a cube list to a single netCDF file, sharing the common
+        # dimensions and coordinates of the cubes
+        iris.io.save(my_cube_list, "myfile.nc")
+
     """ 
     # Determine format from filename
     if isinstance(target, basestring) and saver is None:
@@ -351,6 +362,11 @@ def save(source, target, saver=None, **kwargs):
     # CubeList or sequence of cubes?
     elif isinstance(source, iris.cube.CubeList) or \
        (isinstance(source, (list,tuple)) and all([type(i)==iris.cube.Cube for i in source])):
+        # The netCDF saver writes all the cubes to one dataset in a single
+        # call, sharing their common dimensions and coordinates.
+        if saver is iris.fileformats.netcdf.save:
+            saver(source, target, **kwargs)
+            return
         # Make sure the saver accepts an append keyword
         if not "append" in saver.__code__.co_varnames:
             raise ValueError("Cannot append cubes using saver function '%s' in '%s'" % \
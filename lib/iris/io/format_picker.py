@@ -127,7 +127,8 @@ class FormatSpecification(object):
     a FileElement, such as filename extension or 32-bit magic number, with an associated value for format identification.
 
     """
-    def __init__(self, format_name, file_element, file_element_value, handler=None, priority=0):
+    def __init__(self, format_name, file_element, file_element_value, handler=None, priority=0,
+                 constraint_aware=False):
         """
         Constructs a new FormatSpecification given the format_name and particular FileElements
         
@@ -142,6 +143,8 @@ class FormatSpecification(object):
         * handler - function which will be called when the specification has been identified and is required to handler a format.
                             If None, then the file can still be identified but no handling can be done.
         * priority - Integer giving a priority for considering this specification where higher priority means sooner consideration.
+        * constraint_aware - Whether the handler accepts the load constraints as a third argument, with which it may
+                            skip loading cubes which cannot match any of them. Default False.
                 
         """
         if not isinstance(file_element, FileElement):
@@ -153,6 +156,7 @@ class FormatSpecification(object):
         self._format_name = format_name
         self._handler = handler
         self.priority = priority
+        self._constraint_aware = constraint_aware
         
     def __hash__(self):
         # Hashed by specification for consistent ordering in FormatAgent (including self._handler in this hash
@@ -177,6 +181,11 @@ class FormatSpecification(object):
         """The handler function of this FileFormat. (Read only)"""
         return self._handler
 
+    @property
+    def constraint_aware(self):
+        """Whether the handler function of this FileFormat accepts the load constraints. (Read only)"""
+        return self._constraint_aware
+
     def __cmp__(self, other):
         if not isinstance(other, FormatSpecification):
             return NotImplemented
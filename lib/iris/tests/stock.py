@@ -28,6 +28,7 @@ from iris.cube import Cube
 import iris.aux_factory
 import iris.coords
 import iris.coords as icoords
+import iris.fileformats.manager
 import iris.tests as tests
 from iris.coord_systems import GeogCS, RotatedGeogCS
 
@@ -66,6 +67,47 @@ def simple_pp():
     return cube
 
 
+class ArrayProxy(object):
+    """
+    A data proxy for an in-memory payload, which records itself in the
+    given list each time it is loaded.
+
+    """
+    def __init__(self, payload, loads):
+        self.payload = payload
+        self.loads = loads
+
+    def load(self, data_shape, data_type, mdi, deferred_slice):
+        self.loads.append(self)
+        return self.payload[deferred_slice]
+
+
+def deferred_cube(payloads, mdi=None, loads=None, coord_names=('time',)):
+    """
+    Returns a cube called 'thing' whose data is deferred, with an
+    :class:`ArrayProxy` for each of the given in-memory payloads along its
+    first dimension.
+
+    Each load of a payload is recorded in the list ``loads``, if given. A
+    dimension coordinate of indices is added for each of the leading
+    dimensions named in ``coord_names``.
+
+    """
+    if loads is None:
+        loads = []
+    proxies = numpy.empty(len(payloads), dtype=object)
+    for i, payload in enumerate(payloads):
+        proxies[i] = ArrayProxy(payload, loads)
+    data_manager = iris.fileformats.manager.DataManager(payloads[0].shape,
+                                                        payloads[0].dtype, mdi)
+    cube = Cube(proxies, long_name='thing', data_manager=data_manager)
+    for dim, name in enumerate(coord_names):
+        coord = icoords.DimCoord(numpy.arange(cube.shape[dim], dtype=numpy.float64),
+                                 long_name=name)
+        cube.add_dim_coord(coord, dim)
+    return cube
+
+
 def simple_1d(with_bounds=True):
     """
     Returns an abstract, one-dimensional cube.
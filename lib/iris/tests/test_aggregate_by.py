@@ -271,6 +271,57 @@ class TestAggregateBy(tests.IrisTest):
         row = [list(np.sqrt([50., 122., 170., 362.])), [18., 12., 10., 6.]]
         np.testing.assert_almost_equal(aggregateby_cube.data, np.array(row, dtype=np.float32))
 
+    def test_masked(self):
+        data = np.ma.masked_array([[6, 10, 12, 18], [8, 12, 14, 20], [18, 12, 10, 6], [1, 2, 3, 4]],
+                                  mask=[[True, False, False, False], [False, False, False, False],
+                                        [True, True, False, False], [True, False, True, False]],
+                                  dtype=np.float32)
+        cube = iris.cube.Cube(data, long_name='temperature', units='kelvin')
+        cube.add_aux_coord(iris.coords.AuxCoord(np.array([0, 10, 0, 10], dtype=np.float32),
+                                                long_name='level', units='m'), 0)
+
+        #
+        # Groups of non-consecutive rows, with a wholly masked point.
+        #
+        for aggregator, kwargs in [(iris.analysis.MEAN, {}), (iris.analysis.MAX, {}),
+                                   (iris.analysis.MIN, {}), (iris.analysis.SUM, {}),
+                                   (iris.analysis.RMS, {}), (iris.analysis.STD_DEV, {'ddof': 0}),
+                                   (iris.analysis.STD_DEV, {}), (iris.analysis.VARIANCE, {}),
+                                   (iris.analysis.COUNT, {'function': lambda value: value > 9})]:
+            aggregateby_cube = cube.aggregated_by('level', aggregator, **kwargs)
+            for i, rows in enumerate([[0, 2], [1, 3]]):
+                expected = aggregator.aggregate(data[rows], axis=0, **kwargs)
+                np.testing.assert_array_equal(np.ma.getmaskarray(aggregateby_cube.data[i]),
+                                              np.ma.getmaskarray(expected))
+                np.testing.assert_almost_equal(aggregateby_cube.data[i], expected, decimal=5)
+
+    def test_unmasked(self):
+        # Unmasked data gives an unmasked result, with NaN for the variance of a single value,
+        # and the data type of the aggregation of a single group.
+        data = np.array([6, 10, 12, 18, 8], dtype=np.float32)
+        cube = iris.cube.Cube(data, long_name='temperature', units='kelvin')
+        cube.add_aux_coord(iris.coords.AuxCoord(np.array([0, 0, 10, 20, 20], dtype=np.float32),
+                                                long_name='level', units='m'), 0)
+        for aggregator in [iris.analysis.MEAN, iris.analysis.RMS, iris.analysis.STD_DEV,
+                           iris.analysis.SUM, iris.analysis.VARIANCE]:
+            aggregateby_cube = cube.aggregated_by('level', aggregator)
+            expected = [aggregator.aggregate(data[rows], axis=0) for rows in [[0, 1], [2], [3, 4]]]
+            self.assertFalse(np.ma.isMaskedArray(aggregateby_cube.data))
+            self.assertEqual(aggregateby_cube.data.dtype, expected[0].dtype)
+            expected = [np.ma.filled(value, np.nan) for value in expected]
+            np.testing.assert_array_almost_equal(aggregateby_cube.data, expected, decimal=5)
+
+    def test_approx_percentile(self):
+        for percent in [10, 50, 90]:
+            aggregateby_cube = self.cube_multi.aggregated_by(['height', 'level'], iris.analysis.APPROX_PERCENTILE,
+                                                            percent=percent)
+            heights = aggregateby_cube.coord('height').points
+            levels = aggregateby_cube.coord('level').points
+            for i, (height, level) in enumerate(zip(heights, levels)):
+                rows = (self.coord_z1_multi.points == height) & (self.coord_z2_multi.points == level)
+                expected = np.percentile(self.cube_multi.data[rows], percent, axis=0)
+                np.testing.assert_allclose(aggregateby_cube.data[i], expected, rtol=0.01, atol=0.01)
+
     def test_returned_weights(self):
         self.assertRaises(ValueError, self.cube_single.aggregated_by, 'height', iris.analysis.MEAN, returned=True) 
         self.assertRaises(ValueError, self.cube_single.aggregated_by, 'height', iris.analysis.MEAN, weights=[1,2,3,4,5]) 
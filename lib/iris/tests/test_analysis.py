@@ -326,6 +326,44 @@ class TestAggregators(tests.IrisTest):
         numpy.testing.assert_array_almost_equal(first_quartile.data, numpy.array([2.75], dtype=numpy.float32))
         self.assertCML(first_quartile, ('analysis', 'first_quartile_foo_bar_2d.cml'), checksum=False)
 
+    def test_approx_percentile(self):
+        cube = tests.stock.simple_2d()
+        cube.data = numpy.ma.masked_array(cube.data * 10 - 30, mask=cube.data == 2)
+
+        for coords in ['foo', 'bar', ('foo', 'bar')]:
+            for percent in [0, 25, 50, 90, 100]:
+                result = cube.collapsed(coords, iris.analysis.APPROX_PERCENTILE, percent=percent)
+                expected = cube.collapsed(coords, iris.analysis.PERCENTILE, percent=percent)
+                self.assertEqual(result.shape, expected.shape)
+                numpy.testing.assert_allclose(result.data, expected.data, rtol=0.01, atol=0.2)
+
+        median = cube.collapsed('bar', iris.analysis.APPROX_MEDIAN, accuracy=0.001, max_buckets=4096)
+        numpy.testing.assert_allclose(median.data, [10, 20, 50, 40], rtol=0.001)
+        self.assertEqual(median.cell_methods[-1].method, 'median')
+
+        with self.assertRaises(ValueError):
+            cube.collapsed('bar', iris.analysis.APPROX_MEDIAN, accuracy=1)
+
+    def test_approx_percentile_max_buckets(self):
+        # A tiny magnitude does not widen the sketch of every point beyond the most buckets,
+        # and only the values of the smallest magnitudes lose their accuracy.
+        data = numpy.arange(1, 41, dtype=numpy.float64).reshape(10, 4)
+        data[0, 0] = 1e-300
+        state = iris.analysis._sketch_quantile_partial(data, 0, accuracy=0.01, max_buckets=64)
+        self.assertLessEqual(state[2][0].shape[-1], 64)
+        other = iris.analysis._sketch_quantile_partial(data * 1e300, 0, accuracy=0.01, max_buckets=64)
+        combined = iris.analysis._sketch_quantile_combine(state, other)
+        self.assertLessEqual(combined[2][0].shape[-1], 64)
+
+        cube = iris.cube.Cube(data)
+        cube.add_dim_coord(iris.coords.DimCoord(numpy.arange(10, dtype=numpy.float64), long_name='foo'), 0)
+        result = cube.collapsed('foo', iris.analysis.APPROX_PERCENTILE, percent=90, max_buckets=64)
+        expected = numpy.percentile(data, 90, axis=0)
+        numpy.testing.assert_allclose(result.data, expected, rtol=0.01)
+
+        with self.assertRaises(ValueError):
+            cube.collapsed('foo', iris.analysis.APPROX_MEDIAN, max_buckets=0)
+
     def test_proportion(self):
         cube = tests.stock.simple_1d()
         r = cube.data >= 5
@@ -380,6 +418,79 @@ class TestAggregators(tests.IrisTest):
         self.assertCML(gt6, ('analysis', 'count_foo_bar_2d.cml'), checksum=False)
 
 
+class TestChunkedCollapse(tests.IrisTest):
+    def setUp(self):
+        data = numpy.arange(60, dtype=numpy.float32).reshape(5, 3, 4) % 7
+        mask = numpy.zeros(data.shape, dtype=bool)
+        mask[1, 0] = mask[3, 1, 2] = mask[:, 2, 3] = True
+        self.payload = numpy.ma.masked_array(data, mask=mask)
+        self.loads = []
+
+    def _cube(self, deferred=True):
+        cube = iris.tests.stock.deferred_cube(list(self.payload), loads=self.loads,
+                                              coord_names=['time', 'y', 'x'])
+        if not deferred:
+            cube.data
+        return cube
+
+    def _check(self, coords, aggregator, **kwargs):
+        expected = self._cube(deferred=False).collapsed(coords, aggregator, **kwargs)
+        self.loads[:] = []
+        cube = self._cube()
+        result = cube.collapsed(coords, aggregator, **kwargs)
+        self.assertIsNotNone(cube._data_manager)
+        self.assertEqual(len(self.loads), self.payload.shape[0])
+        if kwargs.get('returned'):
+            (result, weights), (expected, expected_weights) = result, expected
+            numpy.testing.assert_array_almost_equal(weights, expected_weights)
+        self.assertEqual(result.summary(), expected.summary())
+        self.assertEqual(result.data.shape, expected.data.shape)
+        numpy.testing.assert_array_equal(numpy.ma.getmaskarray(result.data),
+                                         numpy.ma.getmaskarray(expected.data))
+        numpy.testing.assert_array_almost_equal(numpy.ma.filled(result.data, 0),
+                                                numpy.ma.filled(expected.data, 0), decimal=5)
+
+    def test_aggregators(self):
+        for aggregator in [iris.analysis.APPROX_MEDIAN, iris.analysis.MAX, iris.analysis.MEAN,
+                           iris.analysis.MIN, iris.analysis.RMS, iris.analysis.STD_DEV,
+                           iris.analysis.SUM, iris.analysis.VARIANCE]:
+            for coords in [['time'], ['y'], ['time', 'x'], ['time', 'y', 'x']]:
+                self._check(coords, aggregator)
+
+    def test_kwargs(self):
+        weights = numpy.random.RandomState(0).rand(*self.payload.shape)
+        for coords in [['time'], ['y', 'x']]:
+            self._check(coords, iris.analysis.COUNT, function=lambda value: value > 3)
+            self._check(coords, iris.analysis.VARIANCE, ddof=0)
+            self._check(coords, iris.analysis.APPROX_PERCENTILE, percent=90)
+            self._check(coords, iris.analysis.MEAN, weights=weights)
+            self._check(coords, iris.analysis.MEAN, weights=weights, returned=True)
+
+    def test_broadcast_weights(self):
+        weights = numpy.random.RandomState(0).rand(1, *self.payload.shape[1:])
+        full_weights = numpy.broadcast_arrays(weights, self.payload)[0]
+        for coords in [['time'], ['y', 'x'], ['time', 'x']]:
+            expected = self._cube().collapsed(coords, iris.analysis.MEAN, weights=full_weights)
+            self._check(coords, iris.analysis.MEAN, weights=weights)
+            result = self._cube().collapsed(coords, iris.analysis.MEAN, weights=weights)
+            numpy.testing.assert_array_almost_equal(result.data, expected.data)
+
+    def test_single_value(self):
+        # Too few values for a variance give a NaN or masked result, which may be a scalar.
+        self.payload = self.payload[:1, :1, :1]
+        for aggregator in [iris.analysis.STD_DEV, iris.analysis.VARIANCE]:
+            for coords in [['time'], ['time', 'y', 'x']]:
+                self._check(coords, aggregator)
+        self.payload[0, 0, 0] = numpy.ma.masked
+        for aggregator in [iris.analysis.STD_DEV, iris.analysis.VARIANCE]:
+            self._check(['time', 'y', 'x'], aggregator, ddof=0)
+
+    def test_not_decomposable(self):
+        cube = self._cube()
+        cube.collapsed('time', iris.analysis.MEDIAN)
+        self.assertIsNone(cube._data_manager)
+
+
 @iris.tests.skip_data
 class TestRotatedPole(tests.IrisTest):
     def _check_both_conversions(self, cube):
@@ -469,39 +580,39 @@ class TestAreaWeightGeneration(tests.IrisTest):
     def test_area_weights_std(self):
         # weights for stock 4d data
         weights = iris.analysis.cartography.area_weights(self.cube)
-        self.assertEqual(weights.shape, self.cube.shape)
+        self.assertEqual(weights.shape, (1, 1) + self.cube.shape[2:])
 
     def test_area_weights_order(self):
         # weights for data with dimensions in a different order
         order = [3, 2, 1, 0] # (lon, lat, level, time)
         self.cube.transpose(order)
         weights = iris.analysis.cartography.area_weights(self.cube)
-        self.assertEqual(weights.shape, self.cube.shape)
+        self.assertEqual(weights.shape, self.cube.shape[:2] + (1, 1))
 
     def test_area_weights_non_adjacent(self):
         # weights for cube with non-adjacent latitude/longitude dimensions
         order = [0, 3, 1, 2] # (time, lon, level, lat)
         self.cube.transpose(order)
         weights = iris.analysis.cartography.area_weights(self.cube)
-        self.assertEqual(weights.shape, self.cube.shape)
+        self.assertEqual(weights.shape, (1, self.cube.shape[1], 1, self.cube.shape[3]))
 
     def test_area_weights_scalar_latitude(self):
         # weights for cube with a scalar latitude dimension
         cube = self.cube[:, :, 0, :]
         weights = iris.analysis.cartography.area_weights(cube)
-        self.assertEqual(weights.shape, cube.shape)
+        self.assertEqual(weights.shape, (1, 1, cube.shape[2]))
 
     def test_area_weights_scalar_longitude(self):
         # weights for cube with a scalar longitude dimension
         cube = self.cube[:, :, :, 0]
         weights = iris.analysis.cartography.area_weights(cube)
-        self.assertEqual(weights.shape, cube.shape)
+        self.assertEqual(weights.shape, (1, 1, cube.shape[2]))
 
     def test_area_weights_scalar(self):
         # weights for cube with scalar latitude and longitude dimensions
         cube = self.cube[:, :, 0, 0]
         weights = iris.analysis.cartography.area_weights(cube)
-        self.assertEqual(weights.shape, cube.shape)
+        self.assertEqual(weights.shape, (1, 1))
 
 
 class TestLatitudeWeightGeneration(tests.IrisTest):
@@ -545,7 +656,7 @@ class TestLatitudeWeightGeneration(tests.IrisTest):
     def test_cosine_latitude_weights_std(self):
         # weights for 4d data
         weights = iris.analysis.cartography.cosine_latitude_weights(self.cube)
-        self.assertEqual(weights.shape, self.cube.shape)
+        self.assertEqual(weights.shape, (1, 1, 73, 1))
         self.assertArrayAlmostEqual(weights[0, 0, :, 0],
                                     numpy.cos(numpy.deg2rad(self.lat_coord)))
 
@@ -554,7 +665,7 @@ class TestLatitudeWeightGeneration(tests.IrisTest):
         order = [2, 0, 1, 3] # (lat, time, level, lon)
         self.cube.transpose(order)
         weights = iris.analysis.cartography.cosine_latitude_weights(self.cube)
-        self.assertEqual(weights.shape, self.cube.shape)
+        self.assertEqual(weights.shape, (73, 1, 1, 1))
         self.assertArrayAlmostEqual(weights[:, 0, 0, 0],
                                     numpy.cos(numpy.deg2rad(self.lat_coord)))
 
@@ -563,7 +674,7 @@ class TestLatitudeWeightGeneration(tests.IrisTest):
         order = [0, 1, 3, 2] # (time, level, lon, lat)
         self.cube.transpose(order)
         weights = iris.analysis.cartography.cosine_latitude_weights(self.cube)
-        self.assertEqual(weights.shape, self.cube.shape)
+        self.assertEqual(weights.shape, (1, 1, 1, 73))
         self.assertArrayAlmostEqual(weights[0, 0, 0, :],
                                     numpy.cos(numpy.deg2rad(self.lat_coord)))
 
@@ -571,10 +682,30 @@ class TestLatitudeWeightGeneration(tests.IrisTest):
         # weights for cube with a scalar latitude dimension
         cube = self.cube[:, :, 0, :]
         weights = iris.analysis.cartography.cosine_latitude_weights(cube)
-        self.assertEqual(weights.shape, cube.shape)
+        self.assertEqual(weights.shape, (1, 1, 1))
         self.assertAlmostEqual(weights[0, 0, 0],
                                numpy.cos(numpy.deg2rad(self.lat_coord[0])))
 
+    def test_cosine_latitude_weights_mean(self):
+        # the compact weights give the same mean as the weights in full
+        self.cube.data = numpy.random.RandomState(0).rand(*self.cube.shape)
+        weights = iris.analysis.cartography.cosine_latitude_weights(self.cube)
+        full_weights = numpy.broadcast_arrays(weights, self.cube.data)[0]
+        for coords in [['latitude'], ['time', 'latitude'], ['longitude']]:
+            result, result_weights = self.cube.collapsed(coords, iris.analysis.MEAN,
+                                                         weights=weights, returned=True)
+            expected, expected_weights = self.cube.collapsed(coords, iris.analysis.MEAN,
+                                                             weights=full_weights, returned=True)
+            self.assertArrayAlmostEqual(result.data, expected.data)
+            self.assertArrayAlmostEqual(result_weights, expected_weights)
+
+    def test_invalid_weights(self):
+        weights = iris.analysis.cartography.cosine_latitude_weights(self.cube)
+        self.assertRaises(ValueError, self.cube.collapsed, 'latitude', iris.analysis.MEAN,
+                          weights=weights[0])
+        self.assertRaises(ValueError, self.cube.collapsed, 'latitude', iris.analysis.MEAN,
+                          weights=weights[:, :, :-1])
+
 
 class TestRollingWindow(tests.IrisTest):
     def setUp(self):
@@ -643,6 +774,76 @@ class TestRollingWindow(tests.IrisTest):
         self.assertRaises(ValueError, self.cube.rolling_window, 'longitude', iris.analysis.MEAN, window=2, returned=True)
         self.assertRaises(ValueError, self.cube.rolling_window, 'longitude', iris.analysis.MEAN, window=2, weights=[1, 2, 3, 4, 5])
 
+    def test_weights(self):
+        weights = numpy.array([[1, 1, 2, 0], [1, 3, 1, 1], [0, 1, 1, 2]], dtype=numpy.float64)
+        res_cube = self.cube.rolling_window('longitude', iris.analysis.MEAN, window=2, weights=weights)
+
+        expected_result = numpy.array([[  8., 34 / 3., 12.],
+                                       [ 11., 12.5, 17.],
+                                       [ 12., 11., 22 / 3.]], dtype=numpy.float64)
+
+        numpy.testing.assert_array_almost_equal(expected_result, res_cube.data)
+
+    def test_broadcast_weights(self):
+        weights = numpy.array([[1, 3, 1, 2]], dtype=numpy.float64)
+        res_cube = self.cube.rolling_window('latitude', iris.analysis.MEAN, window=2, weights=weights)
+        expected_cube = self.cube.rolling_window('latitude', iris.analysis.MEAN, window=2,
+                                                 weights=numpy.broadcast_arrays(weights, self.cube.data)[0])
+        numpy.testing.assert_array_almost_equal(expected_cube.data, res_cube.data)
+
+    def test_masked(self):
+        self.cube.data = numpy.ma.masked_array(self.cube.data, mask=[[True, True, False, False],
+                                                                     [False, True, False, False],
+                                                                     [False, False, False, False]])
+
+        res_cube = self.cube.rolling_window('longitude', iris.analysis.MEAN, window=2)
+        expected_result = numpy.ma.masked_array([[0., 12., 15.], [8., 14., 17.], [15., 11., 8.]],
+                                                mask=[[True, False, False], [False, False, False],
+                                                      [False, False, False]])
+        numpy.testing.assert_array_equal(expected_result.mask, res_cube.data.mask)
+        numpy.testing.assert_array_almost_equal(expected_result, res_cube.data)
+
+        res_cube = self.cube.rolling_window('longitude', iris.analysis.MIN, window=3)
+        expected_result = numpy.ma.masked_array([[12, 12], [8, 14], [10, 6]])
+        numpy.testing.assert_array_equal(expected_result, res_cube.data)
+
+    def test_long_window(self):
+        cube = iris.cube.Cube(numpy.random.RandomState(0).rand(400, 2).astype(numpy.float32) + 280,
+                              long_name='temperature', units='kelvin')
+        cube.add_dim_coord(iris.coords.DimCoord(numpy.arange(400, dtype=numpy.float64), long_name='day'), 0)
+
+        for aggregator in [iris.analysis.MEAN, iris.analysis.SUM, iris.analysis.RMS,
+                           iris.analysis.MIN, iris.analysis.MAX]:
+            res_cube = cube.rolling_window('day', aggregator, window=365)
+            expected_result = aggregator.aggregate(iris.util.rolling_window(cube.data, window=365, axis=0), axis=1)
+            self.assertEqual(res_cube.data.dtype, expected_result.dtype)
+            numpy.testing.assert_allclose(res_cube.data, expected_result, rtol=1e-5)
+
+    def _cube_1d(self, values):
+        cube = iris.cube.Cube(numpy.array(values, dtype=numpy.float64), long_name='temperature', units='kelvin')
+        cube.add_dim_coord(iris.coords.DimCoord(numpy.arange(len(values), dtype=numpy.float64), long_name='day'), 0)
+        return cube
+
+    def test_non_finite(self):
+        # Non-finite values only affect the windows which contain them.
+        cube = self._cube_1d([0, 1, numpy.nan, 3, 4, 5, numpy.inf, 1, 1, 1])
+        nan, inf = numpy.nan, numpy.inf
+        res_cube = cube.rolling_window('day', iris.analysis.SUM, window=3)
+        self.assertArrayEqual(res_cube.data, [nan, nan, nan, 12, inf, inf, inf, 3])
+        res_cube = cube.rolling_window('day', iris.analysis.MEAN, window=3)
+        self.assertArrayEqual(res_cube.data, [nan, nan, nan, 4, inf, inf, inf, 1])
+        self.assertFalse(numpy.ma.getmaskarray(res_cube.data).any())
+        res_cube = cube.rolling_window('day', iris.analysis.RMS, window=3)
+        self.assertArrayAlmostEqual(res_cube.data[[3, 7]], [numpy.sqrt(50 / 3.), 1])
+
+    def test_cancellation(self):
+        # A large value does not swamp the sums of the windows after it.
+        cube = self._cube_1d([1e17, 1, 1, 1, 1, 1])
+        res_cube = cube.rolling_window('day', iris.analysis.SUM, window=2)
+        self.assertArrayEqual(res_cube.data, [1e17, 2, 2, 2, 2])
+        res_cube = cube.rolling_window('day', iris.analysis.MEAN, window=2)
+        self.assertArrayEqual(res_cube.data, [5e16, 1, 1, 1, 1])
+
 
 class TestGeometry(tests.IrisTest):
 
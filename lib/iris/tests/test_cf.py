@@ -24,6 +24,7 @@ import iris.tests as tests
 import unittest
 
 import mock
+import netCDF4
 
 import iris
 import iris.fileformats.cf as cf
@@ -60,6 +61,44 @@ class TestCaching(unittest.TestCase):
         self.assertTrue('standard_name' in cf_var.__dict__)
 
 
+class TestCFGroups(tests.IrisTest):
+    def _write(self, filename):
+        dataset = netCDF4.Dataset(filename, mode='w')
+        for name, size in [('time', 2), ('lat', 3), ('lon', 4), ('bnds', 2), ('strlen', 5)]:
+            dataset.createDimension(name, size)
+        time = dataset.createVariable('time', 'f8', ('time',))
+        time[:] = [0, 1]
+        time.bounds = 'time_bnds'
+        dataset.createVariable('time_bnds', 'f8', ('time', 'bnds'))
+        dataset.createVariable('lat', 'f8', ('lat',))[:] = [0, 1, 2]
+        dataset.createVariable('lon', 'f8', ('lon',))[:] = [0, 1, 2, 3]
+        dataset.createVariable('height', 'f8', ())
+        dataset.createVariable('label', 'S1', ('strlen',))
+        dataset.createVariable('crs', 'i4', ()).grid_mapping_name = 'latitude_longitude'
+        dataset.createVariable('cell_area', 'f8', ('lat', 'lon'))
+        dataset.createVariable('tas_flag', 'i1', ('time', 'lat', 'lon'))
+        tas = dataset.createVariable('tas', 'f4', ('time', 'lat', 'lon'))
+        tas.coordinates = 'height label'
+        tas.grid_mapping = 'crs'
+        tas.cell_measures = 'area: cell_area'
+        tas.ancillary_variables = 'tas_flag'
+        dataset.close()
+
+    def test_groups(self):
+        with self.temp_filename(suffix='.nc') as filename:
+            self._write(filename)
+            cfr = cf.CFReader(filename)
+            groups = {name: sorted(cf_var.cf_group.keys())
+                      for name, cf_var in cfr.cf_group.iteritems()}
+            del cfr
+        self.assertEqual(groups['tas'], ['cell_area', 'crs', 'height', 'label',
+                                         'lat', 'lon', 'tas_flag', 'time'])
+        self.assertEqual(groups['time'], ['time_bnds'])
+        for name in ['time_bnds', 'lat', 'lon', 'height', 'label', 'crs',
+                     'cell_area', 'tas_flag']:
+            self.assertEqual(groups[name], [])
+
+
 @iris.tests.skip_data
 class TestCFReader(tests.IrisTest):
     def setUp(self):
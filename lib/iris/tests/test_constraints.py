@@ -341,6 +341,35 @@ class TestConstraints(TestMixin, tests.IrisTest):
         self.assertEqual(len(raw_cubes), 38)
        
 
+class TestMayMatch(tests.IrisTest):
+    def setUp(self):
+        self.attributes = {'STASH': 'm01s16i203'}
+        self.coord_cells = {'forecast_period': iris.coords.Cell(6, None)}
+
+    def _may_match(self, constraint):
+        return constraint._may_match(self.attributes, self.coord_cells)
+
+    def test_coord(self):
+        self.assertTrue(self._may_match(iris.Constraint(forecast_period=6)))
+        self.assertFalse(self._may_match(iris.Constraint(forecast_period=[3, 9])))
+        self.assertTrue(self._may_match(iris.Constraint(forecast_period=lambda cell: cell > 3)))
+
+    def test_unknown(self):
+        self.assertTrue(self._may_match(iris.Constraint('air_temperature')))
+        self.assertTrue(self._may_match(iris.Constraint(model_level_number=1)))
+        self.assertTrue(self._may_match(iris.AttributeConstraint(source='UM')))
+
+    def test_attribute(self):
+        self.assertTrue(self._may_match(iris.AttributeConstraint(STASH='m01s16i203')))
+        self.assertFalse(self._may_match(iris.AttributeConstraint(STASH='m01s16i222')))
+
+    def test_combination(self):
+        constraint = iris.Constraint(forecast_period=6) & iris.AttributeConstraint(STASH='m01s16i222')
+        self.assertFalse(self._may_match(constraint))
+        constraint = iris.Constraint(forecast_period=6) & iris.Constraint(model_level_number=1)
+        self.assertTrue(self._may_match(constraint))
+
+
 class TestBetween(tests.IrisTest):
     def run_test(self, function, numbers, results):
         for number, result in zip(numbers, results):
@@ -518,6 +518,65 @@ class TestGribLoadRules(tests.IrisTest):
         self.assertEqual(cube.units, iris.unit.Unit("???"))
         
 
+class TestGribDataProxy(tests.IrisTest):
+    # A testing class that does not need the test data.
+
+    def test_deferred_values(self):
+        message = FakeGribMessage(Ni=3, Nj=2, values=np.arange(6.0))
+        grib_fh = mock.Mock()
+        grib_fh.name = 'foo.grib'
+        grib_fh.tell.return_value = 100
+        with mock.patch('iris.fileformats.grib.gribapi', _mock_gribapi):
+            with mock.patch.object(_mock_gribapi, 'grib_get_message_size',
+                                   return_value=40):
+                wrapper = iris.fileformats.grib.GribWrapper(message, grib_fh)
+        self.assertIsNotNone(wrapper._data_manager)
+        self.assertEqual(wrapper._data_manager.shape(wrapper._data), (2, 3))
+        proxy = wrapper._data[()]
+        self.assertEqual((proxy.path, proxy.offset), ('foo.grib', 60))
+
+        with mock.patch('iris.fileformats.grib.gribapi', _mock_gribapi):
+            with mock.patch.object(_mock_gribapi, 'grib_new_from_file',
+                                   return_value=message):
+                with mock.patch('iris.fileformats.grib.open',
+                                create=True) as open_mock:
+                    data = wrapper.data
+        open_mock.assert_called_once_with('foo.grib', 'rb')
+        grib_file = open_mock.return_value.__enter__.return_value
+        grib_file.seek.assert_called_once_with(60, os.SEEK_SET)
+        self.assertArrayEqual(data, np.arange(6.0).reshape(2, 3))
+        self.assertIsNone(wrapper._data_manager)
+
+    def test_eager_values(self):
+        message = FakeGribMessage(Ni=3, Nj=2, values=np.arange(6.0))
+        with mock.patch('iris.fileformats.grib.gribapi', _mock_gribapi):
+            wrapper = iris.fileformats.grib.GribWrapper(message)
+        self.assertIsNone(wrapper._data_manager)
+        self.assertArrayEqual(wrapper.data, np.arange(6.0).reshape(2, 3))
+
+
+class TestGribKeyCache(tests.IrisTest):
+    # A testing class that does not need the test data.
+
+    def test_rule_keys_prefetched(self):
+        message = FakeGribMessage(edition=2, time_code=1)
+        with mock.patch('iris.fileformats.grib.gribapi', _mock_gribapi):
+            wrapper = iris.fileformats.grib.GribWrapper(message)
+        rule_keys = iris.fileformats.grib._ensure_rule_keys()
+        self.assertIn('edition', rule_keys)
+        self.assertTrue(set(rule_keys).issubset(wrapper._key_values))
+
+    def test_single_fetch(self):
+        message = FakeGribMessage(edition=2, time_code=1)
+        with mock.patch('iris.fileformats.grib.gribapi', _mock_gribapi):
+            wrapper = iris.fileformats.grib.GribWrapper(message)
+            _mock_gribapi.grib_get_native_type.reset_mock()
+            self.assertEqual(wrapper.Ni, 1)
+            self.assertEqual(wrapper.Ni, 1)
+            self.assertEqual(wrapper.edition, 2)
+        self.assertEqual(_mock_gribapi.grib_get_native_type.call_count, 0)
+
+
 if __name__ == "__main__":
     tests.main()
     print "finished"
@@ -21,7 +21,13 @@ Test the main loading API.
 # import iris tests first so that some things can be initialised before importing anything else
 import iris.tests as tests
 
+import itertools
+import types
+
+import mock
+
 import iris
+import iris.cube
 import iris.tests.stock as stock
 
 
@@ -56,6 +62,55 @@ class TestLoad(tests.IrisTest):
         self.assertEqual(len(cubes), 2)
 
 
+@iris.tests.skip_data
+class TestLoadStream(tests.IrisTest):
+    def setUp(self):
+        self.path = tests.get_data_path(('PP', 'model_comp', 'dec_subset.pp'))
+
+    def _expected(self, key):
+        cubes = iris.load_raw(self.path)
+        groups = itertools.groupby(cubes, key)
+        return [cube for _, group in groups
+                for cube in iris.cube.CubeList(group).merge(unique=False)]
+
+    def _assertCubesEqual(self, cubes, expected):
+        self.assertEqual(len(cubes), len(expected))
+        for cube, expected_cube in zip(cubes, expected):
+            self.assertEqual(cube.metadata, expected_cube.metadata)
+            self.assertEqual(cube.coords(), expected_cube.coords())
+
+    def test_generator(self):
+        cubes = iris.load_stream(self.path, 'time')
+        self.assertIsInstance(cubes, types.GeneratorType)
+
+    def test_coord_key(self):
+        cubes = list(iris.load_stream(self.path, 'time'))
+        self._assertCubesEqual(cubes, self._expected(
+            lambda cube: cube.coord('time').points[0]))
+        self.assertTrue(all(cube.coord('time').shape == (1,) for cube in cubes))
+
+    def test_function_key(self):
+        key = lambda cube: cube.coord('forecast_period').points[0] < 6
+        cubes = list(iris.load_stream(self.path, key))
+        self._assertCubesEqual(cubes, self._expected(key))
+
+    def test_constraints(self):
+        cubes = list(iris.load_stream(self.path, 'time', 'wibble'))
+        self.assertEqual(cubes, [])
+
+
+class TestLoadStreamOrder(tests.IrisTest):
+    def test_file_order(self):
+        def load_files(filenames, callback, constraints=None):
+            for filename in filenames:
+                yield iris.cube.Cube(0, long_name=filename)
+
+        uris = ['b.pp', 'c.pp', 'a.pp']
+        with mock.patch('iris.io.load_files', side_effect=load_files):
+            cubes = list(iris.load_stream(uris, lambda cube: cube.name()))
+        self.assertEqual([cube.name() for cube in cubes], uris)
+
+
 class TestLoadCube(tests.IrisTest):
     def test_normal(self):
         paths = (
@@ -25,8 +25,10 @@ import iris.tests as tests
 import numpy
 
 import iris
+import iris._merge
 import iris.cube
 import iris.exceptions
+import iris.fileformats.pp
 from iris.coords import DimCoord, AuxCoord
 import iris.coords
 import iris.tests.stock
@@ -377,5 +379,68 @@ class TestCubeMergeTheoretical(tests.IrisTest):
         self.assertCML(r, ('cube_merge', 'test_simple_attributes3.cml'))
 
 
+
+class TestIndexes(tests.IrisTest):
+    def setUp(self):
+        # 'a' and 'b' form a grid, and 'c' is a function of 'a' alone.
+        self.positions = [{'a': a, 'b': b, 'c': a * 10}
+                          for b in [5, 6, 7] for a in [2, 1]]
+        self.indexes = iris._merge.build_indexes(self.positions)
+
+    def test_values(self):
+        self.assertEqual(self.indexes['a'], [2, 1])
+        self.assertEqual(self.indexes['b'], [5, 6, 7])
+        self.assertArrayEqual(self.indexes.codes('b'), [0, 0, 1, 1, 2, 2])
+        self.assertEqual(self.indexes.value('c', 3), 10)
+
+    def test_relation_matrix(self):
+        matrix = iris._merge.derive_relation_matrix(self.indexes)
+        self.assertEqual(matrix['a'].separable, set(['b']))
+        self.assertEqual(matrix['a'].inseparable, set(['c']))
+        self.assertEqual(matrix['b'].separable, set(['a', 'c']))
+        self.assertEqual(matrix['c'].inseparable, set(['a']))
+
+    def test_is_dependent(self):
+        mapping = {}
+        self.assertTrue(iris._merge._is_dependent('c', ['a'], self.indexes, mapping))
+        self.assertEqual(mapping, {(2,): 20, (1,): 10})
+        self.assertTrue(iris._merge._is_dependent('c', ['a', 'b'], self.indexes))
+        self.assertFalse(iris._merge._is_dependent('b', ['a'], self.indexes))
+
+
+class TestProtoCubeKeys(tests.IrisTest):
+    def _cube(self, level, **attributes):
+        cube = iris.cube.Cube(numpy.zeros(2))
+        cube.attributes.update(attributes)
+        cube.add_aux_coord(DimCoord(level, long_name='level'))
+        return cube
+
+    def test_distinct_attributes(self):
+        cubes = iris.cube.CubeList(self._cube(level, source=source)
+                                   for level in range(3)
+                                   for source in ['a', 'b', 'c', 'd'])
+        merged = cubes.merge()
+        self.assertEqual([cube.attributes['source'] for cube in merged],
+                         ['a', 'b', 'c', 'd'])
+        self.assertTrue(all(cube.shape == (3, 2) for cube in merged))
+
+    def test_equal_attributes_of_other_types(self):
+        stash = iris.fileformats.pp.STASH(1, 0, 4)
+        cubes = iris.cube.CubeList([self._cube(0, STASH=stash),
+                                    self._cube(1, STASH=str(stash)),
+                                    self._cube(2, STASH=stash)])
+        merged = cubes.merge()
+        self.assertEqual(len(merged), 1)
+        self.assertEqual(merged[0].shape, (3, 2))
+
+    def test_keys(self):
+        first = iris._merge.merge_keys(self._cube(0, source='a'))
+        second = iris._merge.merge_keys(self._cube(1, source='a'))
+        third = iris._merge.merge_keys(self._cube(1, source='b'))
+        self.assertEqual(second, first)
+        self.assertEqual(third[0], first[0])
+        self.assertNotEqual(third[2], first[2])
+
+
 if __name__ == "__main__":
     tests.main()
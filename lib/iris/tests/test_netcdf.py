@@ -25,10 +25,15 @@ import iris.tests as tests
 import os
 import warnings
 
+import mock
 import netCDF4 as nc
 import numpy as np
 
 import iris
+import iris.coord_systems
+import iris.coords
+import iris.cube
+import iris.fileformats.netcdf
 import iris.std_names
 import iris.util
 import stock
@@ -125,6 +130,110 @@ class TestNetCDFLoad(tests.IrisTest):
         self.assertCML(cube1, ('netcdf', 'netcdf_units_1.cml'))
 
 
+class TestDatasetPool(tests.IrisTest):
+    def setUp(self):
+        self.pool = iris.fileformats.netcdf._DATASET_POOL
+        self.pool.clear()
+
+    def tearDown(self):
+        self.pool.clear()
+
+    def _write(self, filename, values):
+        dataset = nc.Dataset(filename, mode='w')
+        dataset.createDimension('x', len(values))
+        dataset.createVariable('v', 'f8', ('x',))[:] = values
+        dataset.close()
+
+    def _load(self, filename):
+        proxy = iris.fileformats.netcdf.NetCDFDataProxy(filename, 'v')
+        return proxy.load((3,), np.dtype('f8'), None, (slice(None),))
+
+    def test_reuse(self):
+        with self.temp_filename(suffix='.nc') as filename:
+            self._write(filename, [1, 2, 3])
+            self.assertArrayEqual(self._load(filename), [1, 2, 3])
+            with self.pool.dataset(filename) as first:
+                pass
+            self.assertArrayEqual(self._load(filename), [1, 2, 3])
+            with self.pool.dataset(filename) as second:
+                self.assertIs(second, first)
+
+    def test_changed_file(self):
+        with self.temp_filename(suffix='.nc') as filename:
+            self._write(filename, [1, 2, 3])
+            self.assertArrayEqual(self._load(filename), [1, 2, 3])
+            # Replace the file, as a new inode.
+            new_filename = iris.util.create_temp_filename(suffix='.nc')
+            self._write(new_filename, [4, 5, 6])
+            os.rename(new_filename, filename)
+            self.assertArrayEqual(self._load(filename), [4, 5, 6])
+
+    def test_max_open(self):
+        with self.temp_filename(suffix='.nc') as filename1:
+            with self.temp_filename(suffix='.nc') as filename2:
+                self._write(filename1, [1, 2, 3])
+                self._write(filename2, [4, 5, 6])
+                with mock.patch('iris.config.NETCDF_MAX_OPEN', 1):
+                    self.assertArrayEqual(self._load(filename1), [1, 2, 3])
+                    self.assertArrayEqual(self._load(filename2), [4, 5, 6])
+                    self.assertEqual(self.pool._datasets.keys(),
+                                     [os.path.abspath(filename2)])
+                with mock.patch('iris.config.NETCDF_MAX_OPEN', 0):
+                    self.assertArrayEqual(self._load(filename1), [1, 2, 3])
+                    self.assertEqual(len(self.pool._datasets), 0)
+
+
+class _FakeEngine(object):
+    # Stands in for the pyke engine, translating just the data variable
+    # names and its dimension coordinates.
+    def reset(self):
+        pass
+
+    def add_case_specific_fact(self, *args):
+        pass
+
+    def activate(self, rule_base):
+        self.cube.standard_name = self.cf_var.standard_name
+        self.provides['coordinates'] = []
+        for dim, name in enumerate(self.cf_var.dimensions):
+            coord = iris.coords.DimCoord(self.cf_var.cf_group[name][:], long_name=name)
+            self.cube.add_dim_coord(coord, dim)
+            self.provides['coordinates'].append((coord, name))
+
+
+class TestTranslationCache(tests.IrisTest):
+    def _write(self, filename):
+        dataset = nc.Dataset(filename, mode='w')
+        dataset.createDimension('x', 3)
+        dataset.createVariable('x', 'f8', ('x',))[:] = [1, 2, 3]
+        for name, standard_name in [('tas0', 'air_temperature'),
+                                    ('tas1', 'air_temperature'),
+                                    ('pr', 'precipitation_flux')]:
+            variable = dataset.createVariable(name, 'f4', ('x',))
+            variable.standard_name = standard_name
+            variable.source = name
+        dataset.close()
+
+    def test_shared_translation(self):
+        engine = _FakeEngine()
+        with self.temp_filename(suffix='.nc') as filename:
+            self._write(filename)
+            with mock.patch('iris.fileformats.netcdf._ENGINE', engine):
+                with mock.patch.object(engine, 'activate',
+                                       wraps=engine.activate) as activate:
+                    cubes = sorted(iris.fileformats.netcdf.load_cubes(filename),
+                                   key=lambda cube: cube.attributes['source'])
+        # Only one of the air temperature variables was translated.
+        self.assertEqual(activate.call_count, 2)
+        pr, tas0, tas1 = cubes
+        self.assertEqual(pr.name(), 'precipitation_flux')
+        self.assertEqual(tas1.name(), 'air_temperature')
+        self.assertEqual(tas1.attributes, {'source': 'tas1'})
+        self.assertEqual(tas1.coord('x'), tas0.coord('x'))
+        self.assertIsNot(tas1.coord('x'), tas0.coord('x'))
+        self.assertEqual(tas1.coord_dims(tas1.coord('x')), (0,))
+
+
 class TestSave(tests.IrisTest):
     def test_hybrid(self):
         cube = stock.realistic_4d()
@@ -157,6 +266,174 @@ class TestSave(tests.IrisTest):
             self.assertCDL(filename, ('netcdf', 'netcdf_save_realistic_0d.cdl'))
 
 
+class TestChunkedSave(tests.IrisTest):
+    def test_deferred(self):
+        payloads = [np.arange(6, dtype='f4').reshape(2, 3) + i
+                    for i in range(4)]
+        loads = []
+        cube = stock.deferred_cube(payloads, mdi=-1e30, loads=loads)
+        with self.temp_filename(suffix='.nc') as filename:
+            iris.fileformats.netcdf.save(cube, filename, zlib=True,
+                                         complevel=2, chunksizes=(1, 2, 3),
+                                         least_significant_digit=2)
+            self.assertIsNotNone(cube._data_manager)
+            self.assertEqual(len(loads), 4)
+            dataset = nc.Dataset(filename)
+            variable = dataset.variables['thing']
+            self.assertArrayEqual(variable[:], np.array(payloads))
+            self.assertEqual(variable.filters()['complevel'], 2)
+            self.assertTrue(variable.filters()['zlib'])
+            self.assertEqual(variable.chunking(), [1, 2, 3])
+            self.assertNotIn('_FillValue', variable.ncattrs())
+            dataset.close()
+
+    def test_deferred_single_payload(self):
+        # A single proxy is loaded once, not once per row of its payload.
+        loads = []
+        cube = stock.deferred_cube([np.arange(12, dtype='f4').reshape(3, 4)],
+                                   loads=loads, coord_names=())[0]
+        self.assertEqual(cube._data.ndim, 0)
+        with self.temp_filename(suffix='.nc') as filename:
+            iris.fileformats.netcdf.save(cube, filename)
+            self.assertIsNotNone(cube._data_manager)
+            self.assertEqual(len(loads), 1)
+            dataset = nc.Dataset(filename)
+            self.assertArrayEqual(dataset.variables['thing'][:],
+                                  np.arange(12).reshape(3, 4))
+            dataset.close()
+
+    def test_deferred_masked(self):
+        payloads = [np.ma.masked_array([1., 2.], mask=[False, i == 1])
+                    for i in range(3)]
+        cube = stock.deferred_cube(payloads, mdi=-1e30)
+        with self.temp_filename(suffix='.nc') as filename:
+            iris.fileformats.netcdf.save(cube, filename)
+            dataset = nc.Dataset(filename)
+            variable = dataset.variables['thing']
+            self.assertEqual(variable._FillValue, -1e30)
+            self.assertEqual(variable[:].mask.tolist(),
+                             [[False, False], [False, True], [False, False]])
+            dataset.close()
+
+
+class TestMultiCubeSave(tests.IrisTest):
+    def _cube(self, name, data):
+        cube = iris.cube.Cube(data, long_name=name, units='K')
+        cube.add_dim_coord(iris.coords.DimCoord(np.arange(data.shape[0], dtype='f4'),
+                                                standard_name='latitude', units='degrees'), 0)
+        cube.add_dim_coord(iris.coords.DimCoord(np.arange(data.shape[1], dtype='f4') * 10,
+                                                standard_name='longitude', units='degrees'), 1)
+        cube.add_aux_coord(iris.coords.AuxCoord(1, long_name='level'))
+        return cube
+
+    def test_shared(self):
+        cubes = iris.cube.CubeList([self._cube('air', np.zeros((2, 3), dtype='f4')),
+                                    self._cube('sea', np.ones((2, 3), dtype='f4'))])
+        with self.temp_filename(suffix='.nc') as filename:
+            iris.save(cubes, filename)
+            dataset = nc.Dataset(filename)
+            self.assertEqual(sorted(dataset.dimensions), ['latitude', 'longitude'])
+            self.assertEqual(sorted(dataset.variables),
+                             ['air', 'latitude', 'level', 'longitude', 'sea'])
+            for name, value in [('air', 0), ('sea', 1)]:
+                variable = dataset.variables[name]
+                self.assertEqual(variable.dimensions, ('latitude', 'longitude'))
+                self.assertEqual(variable.coordinates, 'level')
+                self.assertArrayEqual(variable[:], np.ones((2, 3)) * value)
+            self.assertTrue(dataset.dimensions['latitude'].isunlimited())
+            dataset.close()
+
+    def test_clashes(self):
+        cube_a = self._cube('air', np.zeros((2, 3), dtype='f4'))
+        cube_b = self._cube('air', np.zeros((2, 4), dtype='f4'))
+        cube_b.coord('level').points = 2
+        with self.temp_filename(suffix='.nc') as filename:
+            iris.fileformats.netcdf.save([cube_a, cube_b], filename)
+            dataset = nc.Dataset(filename)
+            self.assertEqual(sorted(dataset.dimensions),
+                             ['latitude', 'longitude', 'longitude_1'])
+            self.assertFalse(dataset.dimensions['longitude_1'].isunlimited())
+            self.assertEqual(dataset.variables['air'].dimensions,
+                             ('latitude', 'longitude'))
+            variable = dataset.variables['air_1']
+            self.assertEqual(variable.dimensions, ('latitude', 'longitude_1'))
+            self.assertEqual(variable.coordinates, 'level_1')
+            self.assertEqual(dataset.variables['level_1'][:], 2)
+            self.assertArrayEqual(dataset.variables['longitude_1'][:],
+                                  np.arange(4) * 10)
+            dataset.close()
+
+    def test_grid_mappings(self):
+        cubes = []
+        for name, pole_lat in [('air', 30), ('sea', 50), ('land', 30)]:
+            cube = self._cube(name, np.zeros((2, 3), dtype='f4'))
+            cs = iris.coord_systems.RotatedGeogCS(pole_lat, 180)
+            cube.coord('latitude').coord_system = cs
+            cube.coord('longitude').coord_system = cs
+            cubes.append(cube)
+        with self.temp_filename(suffix='.nc') as filename:
+            iris.fileformats.netcdf.save(cubes, filename)
+            dataset = nc.Dataset(filename)
+            self.assertEqual(dataset.variables['air'].grid_mapping,
+                             'rotated_latitude_longitude')
+            self.assertEqual(dataset.variables['sea'].grid_mapping,
+                             'rotated_latitude_longitude_1')
+            self.assertEqual(dataset.variables['land'].grid_mapping,
+                             'rotated_latitude_longitude')
+            for name, pole_lat in [('rotated_latitude_longitude', 30),
+                                   ('rotated_latitude_longitude_1', 50)]:
+                variable = dataset.variables[name]
+                self.assertEqual(variable.grid_mapping_name,
+                                 'rotated_latitude_longitude')
+                self.assertEqual(variable.grid_north_pole_latitude, pole_lat)
+            dataset.close()
+
+    def _vertical(self, dataset, name):
+        # The vertical coordinate variable of a data variable.
+        return dataset.variables[dataset.variables[name].dimensions[0]]
+
+    def test_hybrid_height(self):
+        cube_a = stock.hybrid_height()
+        cube_b = stock.hybrid_height()
+        cube_b.rename('air_pressure')
+        cube_c = stock.hybrid_height()
+        cube_c.rename('relative_humidity')
+        cube_c.coord('surface_altitude').points = [1, 2, 3, 4]
+        with self.temp_filename(suffix='.nc') as filename:
+            iris.fileformats.netcdf.save([cube_a, cube_b, cube_c], filename)
+            dataset = nc.Dataset(filename)
+            self.assertEqual(self._vertical(dataset, 'air_temperature').formula_terms,
+                             'a: level_height b: sigma orog: surface_altitude')
+            self.assertEqual(self._vertical(dataset, 'air_pressure').formula_terms,
+                             'a: level_height b: sigma orog: surface_altitude')
+            self.assertEqual(self._vertical(dataset, 'relative_humidity').formula_terms,
+                             'a: level_height_1 b: sigma_1 orog: surface_altitude_1')
+            self.assertArrayEqual(dataset.variables['surface_altitude_1'][:], [1, 2, 3, 4])
+            dataset.close()
+
+    def test_hybrid_height_and_plain(self):
+        cube = stock.hybrid_height()
+        plain = stock.hybrid_height()
+        plain.rename('air_pressure')
+        plain.remove_aux_factory(plain.aux_factories[0])
+        for cubes in [[cube, plain], [plain, cube]]:
+            with self.temp_filename(suffix='.nc') as filename:
+                iris.fileformats.netcdf.save(cubes, filename)
+                dataset = nc.Dataset(filename)
+                self.assertEqual(len(dataset.dimensions['level_height_1']), 3)
+                self.assertIn('formula_terms',
+                              self._vertical(dataset, 'air_temperature').ncattrs())
+                self.assertNotIn('formula_terms',
+                                 self._vertical(dataset, 'air_pressure').ncattrs())
+                dataset.close()
+
+    def test_not_cubes(self):
+        with self.temp_filename(suffix='.nc') as filename:
+            with self.assertRaises(TypeError):
+                iris.fileformats.netcdf.save([self._cube('air', np.zeros((2, 3))), 'air'],
+                                             filename)
+
+
 @iris.tests.skip_data
 class TestNetCDFSave(tests.IrisTest):
     def setUp(self):
@@ -220,8 +497,15 @@ class TestNetCDFSave(tests.IrisTest):
         file_in = tests.get_data_path(('PP', 'cf_processing', 'abcza_pa19591997_daily_29.b.pp'))
         cubes = iris.load(file_in)
         
-        # Cannot currently pass multiple cubes to the saver.
-        self.assertRaises(ValueError, iris.save, cubes, iris.util.create_temp_filename(suffix='.nc'))
+        # Save multiple cubes to a single file.
+        with self.temp_filename(suffix='.nc') as file_out:
+            iris.save(cubes, file_out)
+            dataset = nc.Dataset(file_out)
+            # Each PP cube has auxiliary coordinates, unlike its coordinate variables.
+            data_variables = [variable for variable in dataset.variables.itervalues()
+                              if 'coordinates' in variable.ncattrs()]
+            self.assertEqual(len(data_variables), len(cubes))
+            dataset.close()
 
         # Save multiple cubes to multiple files.
         for index, cube in enumerate(cubes):
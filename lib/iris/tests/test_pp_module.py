@@ -20,11 +20,20 @@
 import iris.tests as tests
 
 from copy import deepcopy
+import glob
+import multiprocessing
+import multiprocessing.pool
 import netcdftime
+import numpy
 import os
+import shutil
+import tempfile
 from types import GeneratorType
 import unittest
 
+import mock
+
+import iris.config
 import iris.fileformats
 import iris.fileformats.pp as pp
 import iris.util
@@ -277,6 +286,385 @@ class TestPPFileWithExtraCharacterData(IrisPPTest):
         os.remove(temp_filename)
     
 
+@iris.tests.skip_data
+class TestPPMemmap(tests.IrisTest):
+    def setUp(self):
+        self.filename = tests.get_data_path(('PP', 'aPPglob1', 'global.pp'))
+        self.memmap = iris.config.PP_MEMMAP
+
+    def tearDown(self):
+        iris.config.PP_MEMMAP = self.memmap
+
+    def _load_data(self, memmap, keys=None):
+        iris.config.PP_MEMMAP = memmap
+        field = pp.load(self.filename).next()
+        if keys is None:
+            return field.data
+        proxy_array, data_manager = field._data_manager.getitem(field._data,
+                                                                keys)
+        return data_manager.load(proxy_array)
+
+    def test_full(self):
+        data = self._load_data(True)
+        self.assertTrue(data.dtype.isnative)
+        self.assertArrayEqual(data, self._load_data(False))
+
+    def test_deferred_slice(self):
+        keys = (slice(10, 20), (0, 5, 7))
+        data = self._load_data(True, keys)
+        self.assertEqual(data.shape, (10, 3))
+        self.assertArrayEqual(data, self._load_data(False, keys))
+
+    def test_shared_memmap(self):
+        iris.config.PP_MEMMAP = True
+        for field in list(pp.load(self.filename))[:2]:
+            field.data
+        self.assertIn(self.filename, pp._MEMMAPS)
+
+
+class TestFileMemmaps(tests.IrisTest):
+    def setUp(self):
+        self.max_memmaps = iris.config.PP_MAX_MEMMAPS
+        self.temp_dir = tempfile.mkdtemp()
+        self.paths = []
+        for i in range(3):
+            path = os.path.join(self.temp_dir, '%d.pp' % i)
+            with open(path, 'wb') as pp_file:
+                pp_file.write(chr(i) * 8)
+            self.paths.append(path)
+        pp._MEMMAPS.clear()
+
+    def tearDown(self):
+        iris.config.PP_MAX_MEMMAPS = self.max_memmaps
+        pp._MEMMAPS.clear()
+        shutil.rmtree(self.temp_dir)
+
+    def test_least_recently_used(self):
+        iris.config.PP_MAX_MEMMAPS = 2
+        first = pp._file_memmap(self.paths[0])
+        pp._file_memmap(self.paths[1])
+        self.assertIs(pp._file_memmap(self.paths[0]), first)
+        pp._file_memmap(self.paths[2])
+        self.assertEqual(list(pp._MEMMAPS), [self.paths[0], self.paths[2]])
+        self.assertEqual(list(pp._file_memmap(self.paths[1])), [1] * 8)
+
+    def test_none(self):
+        iris.config.PP_MAX_MEMMAPS = 0
+        self.assertEqual(list(pp._file_memmap(self.paths[2])), [2] * 8)
+        self.assertEqual(len(pp._MEMMAPS), 0)
+
+
+@iris.tests.skip_data
+class TestPPLoadBatch(tests.IrisTest):
+    def setUp(self):
+        filename = tests.get_data_path(('PP', 'model_comp', 'dec_subset.pp'))
+        # Restrict to the fields which share a missing data indicator.
+        fields = list(pp.load(filename))[:6]
+        loaded_fields = list(pp.load(filename, read_data=True))[:6]
+        pairs = [(field, loaded_field) for field, loaded_field in
+                 zip(fields, loaded_fields) if field.bmdi == fields[0].bmdi]
+        self.fields, self.loaded_fields = zip(*pairs)
+
+    def _check_load_batch(self, pool=None):
+        proxies = [field._data.item() for field in self.fields]
+        data_manager = self.fields[0]._data_manager
+        indexed_proxies = list(enumerate(proxies))
+        # Reverse the order, which will be restored by offset.
+        indexed_proxies.reverse()
+        result = dict(pp.PPDataProxy.load_batch(indexed_proxies,
+                                                data_manager._orig_data_shape,
+                                                data_manager.data_type,
+                                                data_manager.mdi,
+                                                (slice(2, 5), (1, 3)),
+                                                pool=pool))
+        self.assertEqual(sorted(result.keys()), range(len(proxies)))
+        for i, field in enumerate(self.loaded_fields):
+            expected = field.data[2:5, (1, 3)]
+            self.assertArrayEqual(numpy.ma.getmaskarray(result[i]),
+                                  numpy.ma.getmaskarray(expected))
+            self.assertArrayEqual(numpy.ma.filled(result[i], 0),
+                                  numpy.ma.filled(expected, 0))
+
+    def test_load_batch(self):
+        self._check_load_batch()
+
+    def test_thread_pool(self):
+        pool = multiprocessing.pool.ThreadPool(2)
+        try:
+            self._check_load_batch(pool)
+        finally:
+            pool.terminate()
+
+    def test_process_pool(self):
+        pool = multiprocessing.Pool(2)
+        try:
+            self._check_load_batch(pool)
+        finally:
+            pool.terminate()
+
+
+@iris.tests.skip_data
+class TestWorkerPool(tests.IrisTest):
+    def setUp(self):
+        self.workers = iris.config.LOAD_WORKERS
+        self.pool = iris.config.LOAD_POOL
+
+    def tearDown(self):
+        iris.config.LOAD_WORKERS = self.workers
+        iris.config.LOAD_POOL = self.pool
+
+    def _load_cube_data(self, workers, kind='thread'):
+        iris.config.LOAD_WORKERS = workers
+        iris.config.LOAD_POOL = kind
+        filename = tests.get_data_path(('PP', 'model_comp', 'dec_subset.pp'))
+        cube = iris.load(filename)[0]
+        return cube.data
+
+    def test_thread_pool(self):
+        self.assertArrayEqual(self._load_cube_data(4), self._load_cube_data(0))
+
+    def test_process_pool(self):
+        self.assertArrayEqual(self._load_cube_data(2, 'process'),
+                              self._load_cube_data(0))
+
+    def test_unknown_pool(self):
+        with self.assertRaises(ValueError):
+            self._load_cube_data(2, 'unknown')
+
+
+@iris.tests.skip_data
+class TestFileWorkers(tests.IrisTest):
+    def setUp(self):
+        self.workers = iris.config.FILE_WORKERS
+        self.pool = iris.config.LOAD_POOL
+        self.temp_dir = tempfile.mkdtemp()
+        self._copy_files(3)
+
+    def _copy_files(self, count):
+        source = tests.get_data_path(('PP', 'model_comp', 'dec_subset.pp'))
+        self.filenames = []
+        for i in range(count):
+            filename = os.path.join(self.temp_dir, 'fields%d.pp' % i)
+            shutil.copy(source, filename)
+            self.filenames.append(filename)
+
+    def tearDown(self):
+        iris.config.FILE_WORKERS = self.workers
+        iris.config.LOAD_POOL = self.pool
+        shutil.rmtree(self.temp_dir)
+
+    def _load_cubes(self, workers, kind='thread', callback=None):
+        iris.config.FILE_WORKERS = workers
+        iris.config.LOAD_POOL = kind
+        return list(iris.io.load_files(self.filenames, callback))
+
+    def _assertCubesEqual(self, cubes, expected):
+        self.assertEqual(len(cubes), len(expected))
+        for cube, expected_cube in zip(cubes, expected):
+            self.assertEqual(cube.metadata, expected_cube.metadata)
+            self.assertEqual(cube.coords(), expected_cube.coords())
+
+    def test_thread_pool_setting(self):
+        # The load rules are not thread-safe, so files are always loaded
+        # by processes.
+        iris.config.FILE_WORKERS = 3
+        iris.config.LOAD_POOL = 'thread'
+        pool = iris.fileformats.manager._file_pool()
+        self.assertNotIsInstance(pool, multiprocessing.pool.ThreadPool)
+
+    def test_concurrent(self):
+        # Many files, loaded repeatedly by many workers at once.
+        self._copy_files(16)
+        expected = self._load_cubes(0)
+        for _ in range(5):
+            self._assertCubesEqual(self._load_cubes(8), expected)
+
+    def test_process_pool(self):
+        self._assertCubesEqual(self._load_cubes(3, 'process'),
+                               self._load_cubes(0))
+
+    def test_unpicklable_callback(self):
+        def callback(cube, field, filename):
+            cube.attributes['source'] = filename
+        with mock.patch('warnings.warn') as warn:
+            cubes = self._load_cubes(3, 'process', callback)
+        self.assertTrue(warn.called)
+        self._assertCubesEqual(cubes, self._load_cubes(0, callback=callback))
+
+
+@iris.tests.skip_data
+class TestPPHeaderIndex(tests.IrisTest):
+    def setUp(self):
+        self.index_dir = iris.config.PP_INDEX_DIR
+        self.temp_dir = tempfile.mkdtemp()
+        iris.config.PP_INDEX_DIR = self.temp_dir
+        self.filename = os.path.join(self.temp_dir, 'fields.pp')
+        shutil.copy(tests.get_data_path(('PP', 'model_comp', 'dec_subset.pp')),
+                    self.filename)
+        iris.config.PP_INDEX_DIR = None
+        self.expected = list(pp.load(self.filename))
+        iris.config.PP_INDEX_DIR = self.temp_dir
+
+    def tearDown(self):
+        iris.config.PP_INDEX_DIR = self.index_dir
+        shutil.rmtree(self.temp_dir)
+
+    def test_build_and_reuse(self):
+        self.assertEqual(list(pp.load(self.filename)), self.expected)
+        self.assertEqual(len(glob.glob(os.path.join(self.temp_dir, '*.npz'))), 1)
+        with mock.patch('iris.fileformats.pp._scan_records') as scan_records:
+            fields = list(pp.load(self.filename))
+        self.assertFalse(scan_records.called)
+        self.assertEqual(fields, self.expected)
+        self.assertEqual(fields[0]._data.item(), self.expected[0]._data.item())
+
+    def test_stale_index(self):
+        list(pp.load(self.filename))
+        stat = os.stat(self.filename)
+        os.utime(self.filename, (stat.st_atime, stat.st_mtime + 10))
+        with mock.patch('iris.fileformats.pp._scan_records',
+                        wraps=pp._scan_records) as scan_records:
+            fields = list(pp.load(self.filename))
+        self.assertTrue(scan_records.called)
+        self.assertEqual(fields, self.expected)
+
+
+class TestWriteIndex(tests.IrisTest):
+    def setUp(self):
+        self.index_dir = iris.config.PP_INDEX_DIR
+        self.temp_dir = tempfile.mkdtemp()
+        iris.config.PP_INDEX_DIR = self.temp_dir
+
+    def tearDown(self):
+        iris.config.PP_INDEX_DIR = self.index_dir
+        shutil.rmtree(self.temp_dir)
+
+    def test_failure(self):
+        key = (os.path.join(self.temp_dir, 'fields.pp'), 0, 0)
+        with mock.patch('numpy.savez', side_effect=IOError('No space left on device')):
+            with mock.patch('warnings.warn') as warn:
+                pp._write_index(key, [])
+        self.assertTrue(warn.called)
+        self.assertEqual(os.listdir(self.temp_dir), [])
+
+
+@iris.tests.skip_data
+class TestScanChunks(tests.IrisTest):
+    def setUp(self):
+        self.chunk_depth = pp._SCAN_CHUNK_DEPTH
+        self.filename = tests.get_data_path(('PP', 'model_comp', 'dec_subset.pp'))
+
+    def tearDown(self):
+        pp._SCAN_CHUNK_DEPTH = self.chunk_depth
+
+    def test_chunk_boundaries(self):
+        expected = list(pp.load(self.filename))
+        # Force many chunks, with fields straddling their boundaries.
+        pp._SCAN_CHUNK_DEPTH = pp._FIELD_PREAMBLE_DEPTH + 100
+        self.assertEqual(list(pp.load(self.filename)), expected)
+
+    def test_large_fields(self):
+        expected = list(pp.load(self.filename))
+        # Every field is too large to share a chunk, so only its header
+        # should be read.
+        pp._SCAN_CHUNK_DEPTH = pp._FIELD_PREAMBLE_DEPTH + 100
+        with open(self.filename, 'rb') as pp_file:
+            read_sizes = []
+            def read(size):
+                read_sizes.append(size)
+                return pp_file.read(size)
+            wrapper = mock.Mock(read=read, seek=pp_file.seek, tell=pp_file.tell)
+            runs = list(pp._scan_chunks(wrapper))
+        self.assertEqual([len(headers) for headers, _, _, _ in runs], [1] * len(expected))
+        self.assertNotIn(pp._SCAN_CHUNK_DEPTH, read_sizes)
+
+    def test_headers(self):
+        with open(self.filename, 'rb') as pp_file:
+            headers, data_offsets, data_lens, extras = next(pp._scan_chunks(pp_file))
+        self.assertEqual(headers.dtype, pp._HEADER_DTYPE)
+        self.assertEqual(data_offsets[0], pp._FIELD_PREAMBLE_DEPTH)
+        fields = list(pp.load(self.filename))
+        self.assertEqual(list(headers['longs'][:, pp._LBLREC]),
+                         [field.lblrec for field in fields[:len(headers)]])
+
+
+@iris.tests.skip_data
+class TestPPFieldCollection(tests.IrisTest):
+    def setUp(self):
+        self.filename = tests.get_data_path(('PP', 'model_comp', 'dec_subset.pp'))
+        self.fields = list(pp.load(self.filename))
+        self.collection = pp.PPFieldCollection.from_file(self.filename)
+
+    def test_fields(self):
+        self.assertEqual(len(self.collection), len(self.fields))
+        self.assertEqual(list(self.collection), self.fields)
+        self.assertEqual(self.collection[-1], self.fields[-1])
+
+    def test_columns(self):
+        self.assertArrayEqual(self.collection.lbuser3,
+                              [field.lbuser[3] for field in self.fields])
+        self.assertArrayEqual(self.collection.lbuser,
+                              [field.lbuser for field in self.fields])
+        self.assertArrayEqual(self.collection.bmdi,
+                              [field.bmdi for field in self.fields])
+        with self.assertRaises(AttributeError):
+            self.collection.lbuser7
+
+    def test_filter(self):
+        stash_item = self.fields[0].lbuser[3]
+        subset = self.collection[self.collection.lbuser3 == stash_item]
+        self.assertIsInstance(subset, pp.PPFieldCollection)
+        self.assertEqual(list(subset), [field for field in self.fields
+                                        if field.lbuser[3] == stash_item])
+
+    def test_slice(self):
+        self.assertEqual(list(self.collection[1:3]), self.fields[1:3])
+
+
+@iris.tests.skip_data
+class TestConstraintPushdown(tests.IrisTest):
+    def setUp(self):
+        self.filename = tests.get_data_path(('PP', 'model_comp', 'dec_subset.pp'))
+        pp._ensure_load_rules_loaded()
+
+    def test_header_cells(self):
+        names = ['time', 'forecast_period', 'model_level_number', 'pressure']
+        for field, cube in zip(pp.load(self.filename), iris.load_raw(self.filename)):
+            cells = pp._HeaderCells(field)
+            for name in names:
+                cell = cells.get(name)
+                if cell is not None:
+                    self.assertEqual(cube.coord(name).cell(0), cell)
+
+    def test_skipped_fields(self):
+        forecast_period = pp.load(self.filename).next().lbft
+        constraint = iris.Constraint(forecast_period=forecast_period)
+        with mock.patch.object(pp._load_rules, 'result',
+                               wraps=pp._load_rules.result) as result:
+            cubes = list(pp.load_cubes(self.filename, constraints=constraint))
+        expected = [cube for cube in pp.load_cubes(self.filename)
+                    if constraint.extract(cube) is not None]
+        self.assertEqual(result.call_count, len(expected))
+        self.assertEqual([cube.summary() for cube in cubes],
+                         [cube.summary() for cube in expected])
+
+    def test_callback(self):
+        constraint = iris.Constraint(forecast_period=-1)
+        callback = lambda cube, field, filename: None
+        cubes = list(pp.load_cubes(self.filename, callback, constraint))
+        self.assertEqual(len(cubes), len(list(pp.load(self.filename))))
+
+
+class TestCoalesceExtents(unittest.TestCase):
+    def test_coalesce_extents(self):
+        proxies = [(i, pp.PPDataProxy('file', offset, 100, None))
+                   for i, offset in enumerate([0, 120, 1000000, 1000200])]
+        extents = list(pp._coalesce_extents(proxies))
+        self.assertEqual([(start, stop) for start, stop, _ in extents],
+                         [(0, 220), (1000000, 1000300)])
+        self.assertEqual([len(members) for _, _, members in extents], [2, 2])
+
+
 class TestBitwiseInt(unittest.TestCase):
 
     def test_3(self):
@@ -21,13 +21,18 @@ Test metadata translation rules.
 # import iris tests first so that some things can be initialised before importing anything else
 import iris.tests as tests
 
+import cPickle
 import os
 import types
 
+import numpy
+
 from iris.aux_factory import HybridHeightFactory
 from iris.fileformats.rules import ConcreteReferenceTarget, Factory, Loader, \
                                    Reference, ReferenceTarget, RuleResult, \
                                    load_cubes
+import iris.cube
+import iris.fileformats.rules
 import iris.tests.stock as stock
 
 
@@ -183,5 +188,125 @@ class TestLoadCubes(tests.IrisTest):
         self.assertEqual(len(param_cube.coords('surface_altitude')), 1)
 
 
+class TestRuleIndex(tests.IrisTest):
+    def setUp(self):
+        conditions = [['f.a == 1', 'f.b == 2'],
+                      ['f.a in [1, 3]'],
+                      ['f.c > 0'],
+                      ['f.a == 2'],
+                      ['f.b == 2', 'f.c > 0'],
+                      ['f.a == 1 or f.b == 2']]
+        self.rules = [iris.fileformats.rules.FunctionRule(condition, ['None'])
+                      for condition in conditions]
+        self.index = iris.fileformats.rules._RuleIndex(self.rules)
+
+    def _candidates(self, **values):
+        field = Mock()
+        field.__dict__.update(values)
+        return [self.rules.index(rule) for rule in self.index.candidates(field)]
+
+    def test_candidates(self):
+        self.assertEqual(self._candidates(a=1, b=2, c=0), [0, 1, 2, 4, 5])
+        self.assertEqual(self._candidates(a=2, b=5, c=0), [2, 3, 5])
+        self.assertEqual(self._candidates(a=3.0, b=2, c=0), [1, 2, 4, 5])
+
+    def test_unhashable_value(self):
+        self.assertEqual(self._candidates(a=[2], b=2, c=0), [2, 4, 5])
+
+    def test_failed_key(self):
+        self.assertEqual(self._candidates(b=5, c=0), [0, 1, 2, 3, 4, 5])
+
+    def test_matching_rules(self):
+        container = iris.fileformats.rules.RulesContainer()
+        container._rules = self.rules
+        field = Mock()
+        field.__dict__.update(a=1, b=2, c=1)
+        self.assertEqual(container.matching_rules(field),
+                         [rule for rule in self.rules if rule._matches_field(field)])
+
+
+class TestProcedureRules(tests.IrisTest):
+    def test_chained_actions(self):
+        # A later rule may test the field as changed by an earlier action.
+        container = iris.fileformats.rules.RulesContainer(
+            rule_type=iris.fileformats.rules.ProcedureRule)
+        container._rules = [iris.fileformats.rules.ProcedureRule(['True'], ['pp.lbproc = 128']),
+                            iris.fileformats.rules.ProcedureRule(['pp.lbproc == 128'],
+                                                                 ['pp.lbexp = 5'])]
+        field = Mock()
+        field.__dict__.update(lbproc=0, lbexp=0)
+        result = container.verify(None, field)
+        self.assertEqual(result.matching_rules, container._rules)
+        self.assertEqual(field.lbexp, 5)
+
+
+class TestRuleMemo(tests.IrisTest):
+    def setUp(self):
+        rules = [(['f.a == 1'], ['CoordAndDims(DimCoord(f.b, long_name="b"))']),
+                 (['f.a == 1'], ['CoordAndDims(DimCoord(f.t, long_name="t"))']),
+                 (['f.a == 2'], ["CMAttribute('long_name', 'two')"])]
+        self.container = iris.fileformats.rules.RulesContainer()
+        self.container._rules = [iris.fileformats.rules.FunctionRule(conditions, actions)
+                                 for conditions, actions in rules]
+        self.container.memoise(lambda field: (field.a, field.b), ['t'])
+
+    def _verify(self, **values):
+        field = Mock()
+        field.__dict__.update(values)
+        return self.container.verify(iris.cube.Cube(numpy.zeros(2)), field)
+
+    def test_shared_coords(self):
+        first = self._verify(a=1, b=5, t=0)
+        second = self._verify(a=1, b=5, t=3)
+        self.assertEqual(second.matching_rules, first.matching_rules)
+        self.assertEqual(first.cube.coord('t').points, [0])
+        self.assertEqual(second.cube.coord('t').points, [3])
+        first_b = first.cube.coord('b')
+        second_b = second.cube.coord('b')
+        self.assertEqual(second_b, first_b)
+        self.assertIsNot(second_b, first_b)
+        self.assertIs(second_b._points, first_b._points)
+        second_b.attributes['foo'] = 'bar'
+        self.assertEqual(first_b.attributes, {})
+
+    def test_signatures(self):
+        self.assertEqual(self._verify(a=1, b=5, t=0).cube.coord('b').points, [5])
+        self.assertEqual(self._verify(a=1, b=6, t=0).cube.coord('b').points, [6])
+        cube = self._verify(a=2, b=6, t=0).cube
+        self.assertEqual(cube.long_name, 'two')
+        self.assertEqual(cube.coords(), [])
+
+    def test_size(self):
+        self.container.memoise(lambda field: (field.a, field.b), ['t'], size=1)
+        self._verify(a=1, b=5, t=0)
+        self._verify(a=1, b=6, t=0)
+        self.assertEqual(self.container._memo._plans.keys(), [(1, 6)])
+
+    def test_import_rules_clears(self):
+        self._verify(a=1, b=5, t=0)
+        self.container.import_rules(os.devnull)
+        self.assertEqual(len(self.container._memo._plans), 0)
+
+
+class TestRulesPickle(tests.IrisTest):
+    def setUp(self):
+        self.container = iris.fileformats.rules.RulesContainer()
+        self.container._rules = [
+            iris.fileformats.rules.FunctionRule(['f.a == 1'], ["CMAttribute('long_name', 'one')"])]
+
+    def test_round_trip(self):
+        container = cPickle.loads(cPickle.dumps(self.container, 2))
+        self.assertEqual(map(repr, container._rules), map(repr, self.container._rules))
+        field = Mock()
+        field.a = 1
+        cube = container.verify(iris.cube.Cube(numpy.zeros(2)), field).cube
+        self.assertEqual(cube.long_name, 'one')
+
+    def test_compiled_once(self):
+        first = cPickle.loads(cPickle.dumps(self.container, 2))
+        second = cPickle.loads(cPickle.dumps(self.container, 2))
+        self.assertIs(second, first)
+
+
 if __name__ == "__main__":
     tests.main()
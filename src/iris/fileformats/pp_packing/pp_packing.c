@@ -126,7 +126,11 @@ static PyObject *wgdos_unpack_py(PyObject *self, PyObject *args)
 
     function func; // function is defined by wgdosstuff.
     set_function_name(__func__, &func, 0);
-    int status = unpack_ppfield(mdi, 0, bytes_in, LBPACK_WGDOS_PACKED, npts, dataout, &func);
+    int status;
+    /* Release the GIL whilst unpacking, so that other threads may run */
+    Py_BEGIN_ALLOW_THREADS
+    status = unpack_ppfield(mdi, 0, bytes_in, LBPACK_WGDOS_PACKED, npts, dataout, &func);
+    Py_END_ALLOW_THREADS
 
     /* Raise an exception if there was a problem with the WGDOS algorithm */
     if (status != 0) {
@@ -190,7 +194,11 @@ static PyObject *rle_decode_py(PyObject *self, PyObject *args)
 
     function func;  // function is defined by wgdosstuff.
     set_function_name(__func__, &func, 0);
-    int status = unpack_ppfield(mdi, (bytes_in_len/BYTES_PER_INT_UNPACK_PPFIELD), bytes_in, LBPACK_RLE_PACKED, npts, dataout, &func);
+    int status;
+    /* Release the GIL whilst decoding, so that other threads may run */
+    Py_BEGIN_ALLOW_THREADS
+    status = unpack_ppfield(mdi, (bytes_in_len/BYTES_PER_INT_UNPACK_PPFIELD), bytes_in, LBPACK_RLE_PACKED, npts, dataout, &func);
+    Py_END_ALLOW_THREADS
     
     /* Raise an exception if there was a problem with the REL algorithm */
     if (status != 0) {